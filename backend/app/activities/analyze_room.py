@@ -10,7 +10,6 @@ lives in the system prompt (backend/prompts/read_the_room.txt).
 
 from __future__ import annotations
 
-import asyncio
 import os
 from pathlib import Path
 from typing import Any
@@ -319,10 +318,11 @@ async def analyze_room_photos(
         raise ApplicationError("No room photos provided", non_retryable=True)
 
     # Resolve R2 storage keys to presigned URLs (same pattern as generate.py)
-    from app.utils.r2 import resolve_urls
+    from app.utils.r2 import presign_batch
 
-    room_urls = await asyncio.to_thread(resolve_urls, input.room_photo_urls)
-    inspiration_urls = await asyncio.to_thread(resolve_urls, input.inspiration_photo_urls)
+    urls = await presign_batch(input.room_photo_urls + input.inspiration_photo_urls)
+    room_urls = urls[: len(input.room_photo_urls)]
+    inspiration_urls = urls[len(input.room_photo_urls) :]
     resolved_input = AnalyzeRoomPhotosInput(
         room_photo_urls=room_urls,
         inspiration_photo_urls=inspiration_urls,
@@ -23,6 +23,7 @@ import httpx
 import structlog
 
 from app.activities.shopping import _extract_json
+from app.utils.http_pool import get_client
 
 if TYPE_CHECKING:
     from app.models.contracts import DesignBrief
@@ -293,20 +294,19 @@ _SHOPPING_CRITERIA_MAX = {
 
 async def _load_image_base64(url: str) -> tuple[str, str]:
     """Download an image from URL and return (base64-encoded bytes, media_type)."""
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(url, timeout=15.0)
-            resp.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            log.error("eval_image_download_failed", url=url, status=e.response.status_code)
-            raise
-        except httpx.TimeoutException:
-            log.error("eval_image_download_timeout", url=url)
-            raise
-        content_type = resp.headers.get("content-type", "").split(";")[0].strip()
-        if content_type not in ("image/jpeg", "image/png", "image/gif", "image/webp"):
-            content_type = "image/png" if url.lower().endswith(".png") else "image/jpeg"
-        return base64.standard_b64encode(resp.content).decode("ascii"), content_type
+    try:
+        resp = await get_client("downloads").get(url, timeout=15.0)
+        resp.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        log.error("eval_image_download_failed", url=url, status=e.response.status_code)
+        raise
+    except httpx.TimeoutException:
+        log.error("eval_image_download_timeout", url=url)
+        raise
+    content_type = resp.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in ("image/jpeg", "image/png", "image/gif", "image/webp"):
+        content_type = "image/png" if url.lower().endswith(".png") else "image/jpeg"
+    return base64.standard_b64encode(resp.content).decode("ascii"), content_type
 
 
 def _image_content_block(base64_data: str, media_type: str = "image/jpeg") -> dict[str, Any]:
@@ -11,19 +11,20 @@ Subsequent calls: restores chat history from R2, continues the conversation.
 from __future__ import annotations
 
 import asyncio
-import io
 import os
+import time
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, cast
 
 if TYPE_CHECKING:
     from google import genai
+    from PIL import Image
 
 import structlog
-from PIL import Image
 from temporalio import activity
 from temporalio.exceptions import ApplicationError
 
+from app.config import settings
 from app.models.contracts import (
     AnnotationRegion,
     EditDesignInput,
@@ -34,11 +35,13 @@ from app.utils.gemini_chat import (
     continue_chat,
     create_chat,
     extract_image,
+    gemini_call,
     get_client,
     response_to_content,
     restore_from_r2,
     serialize_contents_to_r2,
     serialize_to_r2,
+    to_parts,
 )
 from app.utils.http import download_image, download_images
 from app.utils.prompt_versioning import (
@@ -202,30 +205,39 @@ def _build_changelog(history: list) -> str:
     return f"{header}\n" + "\n".join(edits)
 
 
-def _upload_image(image: Image.Image, project_id: str) -> str:
-    """Upload revised image to R2 and return the storage key.
+async def _upload_image(image: Image.Image, project_id: str) -> str:
+    """Store the revised image in the blob store and return its storage key.
 
+    Encoded as ``settings.output_image_format``. The key is content-addressed
+    (``blobs/{sha256}.{ext}``), so a retried edit that produces the same
+    bytes maps to the stored revision's key.
     Returns the R2 key (not a presigned URL) so the workflow stores a stable
-    reference.  The API layer presigns on every state query, giving iOS
+    reference. The API layer presigns on every state query, giving iOS
     always-fresh URLs.
     """
-    import uuid
+    from app.utils.blob_store import blob_key, put_blob
+    from app.utils.image import encode_output_image
 
-    from app.utils.r2 import upload_object
-
-    revision_id = uuid.uuid4().hex[:8]
-    key = f"projects/{project_id}/revisions/{revision_id}.png"
-    buf = io.BytesIO()
-    image.save(buf, format="PNG")
-    logger.info("r2_upload_start", key=key, size_bytes=buf.tell())
-    upload_object(key, buf.getvalue(), content_type="image/png")
-    return key
+    # Encoding and hashing are CPU-bound; the upload itself is native async
+    start = time.monotonic()
+    encoded = await asyncio.to_thread(
+        encode_output_image, image, settings.output_image_format, settings.output_image_quality
+    )
+    key = await asyncio.to_thread(blob_key, encoded.data, encoded.content_type)
+    logger.info(
+        "r2_upload_start",
+        key=key,
+        size_bytes=len(encoded.data),
+        encode_ms=round((time.monotonic() - start) * 1000),
+    )
+    # A new revision is almost never byte-identical to a stored one: skip the probes
+    return await put_blob(project_id, encoded.data, encoded.content_type, key=key, assume_new=True)
 
 
 async def _bootstrap_chat(
     input: EditDesignInput,
     base_image: Image.Image,
-) -> tuple[genai.chats.Chat, Image.Image | None]:
+) -> tuple[genai.chats.AsyncChat, Image.Image | None]:
     """Bootstrap a new chat session with context images.
 
     Returns (chat object, generated image or None if Gemini returned text-only).
@@ -259,19 +271,17 @@ async def _bootstrap_chat(
             inspiration_kept=len(inspiration_images),
         )
 
-    # Create chat (sync SDK call in thread pool)
-    chat = await asyncio.to_thread(create_chat, client)
+    # Async chat session; each send_message below holds a Gemini slot
+    chat = create_chat(client)
 
-    # Turn 1: Reference images + selected design + context
-    context_parts: list = []
-    for img in room_images:
-        context_parts.append(img)
-    for img in inspiration_images:
-        context_parts.append(img)
-    context_parts.append(base_image)
-    context_parts.append(CONTEXT_PROMPT)
+    # Turn 1: Reference images + selected design + context. Parts are
+    # PNG-encoded off the event loop before the request takes a Gemini slot.
+    context_parts = await asyncio.to_thread(
+        to_parts, [*room_images, *inspiration_images, base_image, CONTEXT_PROMPT]
+    )
 
-    await asyncio.to_thread(chat.send_message, context_parts)
+    async with gemini_call():
+        await chat.send_message(cast("list", context_parts))
     logger.info("edit_bootstrap_context_sent", project_id=input.project_id)
 
     # Turn 2: Send the actual edit (supports annotations, feedback, or both)
@@ -306,7 +316,9 @@ async def _bootstrap_chat(
             non_retryable=True,
         )
 
-    response2 = await asyncio.to_thread(chat.send_message, edit_parts)
+    edit_message = await asyncio.to_thread(to_parts, edit_parts)
+    async with gemini_call():
+        response2 = await chat.send_message(cast("list", edit_message))
     result_image = extract_image(response2)
 
     if result_image is None:
@@ -314,7 +326,8 @@ async def _bootstrap_chat(
             "Please generate the edited room image now. "
             "Output only a clean photorealistic photograph with no overlays or markers."
         )
-        response2 = await asyncio.to_thread(chat.send_message, retry_msg)
+        async with gemini_call():
+            response2 = await chat.send_message(retry_msg)
         result_image = extract_image(response2)
 
     return chat, result_image
@@ -323,10 +336,11 @@ async def _bootstrap_chat(
 async def _continue_chat(
     input: EditDesignInput,
     base_image: Image.Image | None,
-) -> tuple[Image.Image | None, list]:
+) -> tuple[Image.Image | None, list, int]:
     """Continue an existing chat from R2 history.
 
-    Returns (result image, updated history contents).
+    Returns (result image, updated history contents, number of turns that
+    were restored from R2 — the history's persisted prefix).
     """
     from google.genai import types as gtypes
 
@@ -337,8 +351,7 @@ async def _continue_chat(
         )
 
     client = get_client()
-    # Sync R2 download in thread pool
-    history = await asyncio.to_thread(restore_from_r2, input.project_id)
+    history = await restore_from_r2(input.project_id)
 
     # Re-anchor room photos so Gemini retains architectural context across edits.
     # Without these, spatial drift accumulates after several edit turns.
@@ -393,26 +406,13 @@ async def _continue_chat(
         else:
             message_parts.append(feedback_prompt)
 
-    # Sync Gemini call in thread pool
-    response = await asyncio.to_thread(continue_chat, history, message_parts, client)
+    # Encode once, off the event loop: the same parts are sent and persisted
+    user_parts = await asyncio.to_thread(to_parts, message_parts)
+    async with gemini_call():
+        response = await continue_chat(history, user_parts, client)
     result_image = extract_image(response)
 
     # Build updated history: history + user turn + model response
-    # Reconstruct the user Content that continue_chat() built internally
-    user_parts = []
-    for item in message_parts:
-        if isinstance(item, str):
-            user_parts.append(gtypes.Part(text=item))
-        elif isinstance(item, Image.Image):
-            buf = io.BytesIO()
-            item.save(buf, format="PNG")
-            user_parts.append(gtypes.Part.from_bytes(data=buf.getvalue(), mime_type="image/png"))
-        else:
-            logger.warning(
-                "edit_chat_unexpected_part_type",
-                item_type=type(item).__name__,
-            )
-
     updated_history = list(history)
     updated_history.append(gtypes.Content(role="user", parts=user_parts))
 
@@ -433,12 +433,8 @@ async def _continue_chat(
             "Output only a clean photorealistic photograph — no numbered circles, "
             "region markers, colored outlines, text, or any annotation-like shapes."
         )
-        response = await asyncio.to_thread(
-            continue_chat,
-            updated_history,
-            [retry_text],
-            client,
-        )
+        async with gemini_call():
+            response = await continue_chat(updated_history, [retry_text], client)
         result_image = extract_image(response)
 
         # Add retry turns to history
@@ -447,7 +443,7 @@ async def _continue_chat(
         if retry_content:
             updated_history.append(retry_content)
 
-    return result_image, updated_history
+    return result_image, updated_history, len(history)
 
 
 async def _maybe_run_edit_eval(
@@ -478,12 +474,13 @@ async def _maybe_run_edit_eval(
         }
 
         from app.activities.design_eval import evaluate_edit
-        from app.utils.r2 import resolve_url
+        from app.utils.r2 import presign_batch
 
-        revised_presigned = await asyncio.to_thread(resolve_url, revised_url)
+        # The eval model fetches both images itself, so only it needs URLs
+        original_presigned, revised_presigned = await presign_batch([original_url, revised_url])
 
         vlm_result = await evaluate_edit(
-            original_image_url=original_url,
+            original_image_url=original_presigned,
             edited_image_url=revised_presigned,
             edit_instruction=instruction,
             artifact_check=artifact_dict,
@@ -524,28 +521,19 @@ async def edit_design(input: EditDesignInput) -> EditDesignOutput:
             non_retryable=True,
         )
 
-    # Resolve R2 storage keys to presigned URLs (pass through existing URLs)
-    from app.utils.r2 import resolve_url, resolve_urls
+    # Images are read by storage key through the worker's object cache, so a
+    # repeat round on this worker skips the downloads; only the eval presigns
+    from app.utils.image_variants import store_variants
     from app.utils.tracing import trace_thread
 
-    resolved_input = input.model_copy(
-        update={
-            "base_image_url": await asyncio.to_thread(resolve_url, input.base_image_url),
-            "room_photo_urls": await asyncio.to_thread(resolve_urls, input.room_photo_urls),
-            "inspiration_photo_urls": await asyncio.to_thread(
-                resolve_urls, input.inspiration_photo_urls
-            ),
-        }
-    )
-
     try:
         original_image: Image.Image | None = None
-        if resolved_input.chat_history_key is None:
+        if input.chat_history_key is None:
             # First call: bootstrap — always needs the base image
-            base_image = await download_image(resolved_input.base_image_url)
+            base_image = await download_image(input.base_image_url)
             original_image = base_image
             with trace_thread(input.project_id, "edit"):
-                chat, result_image = await _bootstrap_chat(resolved_input, base_image)
+                chat, result_image = await _bootstrap_chat(input, base_image)
 
             if result_image is None:
                 raise ApplicationError(
@@ -553,23 +541,23 @@ async def edit_design(input: EditDesignInput) -> EditDesignOutput:
                     non_retryable=False,
                 )
 
-            # Upload result and serialize history (sync calls in thread pool)
-            revised_url = await asyncio.to_thread(
-                _upload_image, result_image, resolved_input.project_id
+            # Upload result and serialize history
+            revised_url, history_key = await asyncio.gather(
+                _upload_image(result_image, input.project_id),
+                serialize_to_r2(chat, input.project_id),
             )
-            history_key = await asyncio.to_thread(serialize_to_r2, chat, resolved_input.project_id)
 
         else:
             # Subsequent call: continue from R2 history
             # Only download base image if annotations require it
             cont_base: Image.Image | None = (
-                await download_image(resolved_input.base_image_url)
-                if resolved_input.annotations
-                else None
+                await download_image(input.base_image_url) if input.annotations else None
             )
             original_image = cont_base
             with trace_thread(input.project_id, "edit"):
-                result_image, updated_history = await _continue_chat(resolved_input, cont_base)
+                result_image, updated_history, persisted_turns = await _continue_chat(
+                    input, cont_base
+                )
 
             if result_image is None:
                 raise ApplicationError(
@@ -577,26 +565,26 @@ async def edit_design(input: EditDesignInput) -> EditDesignOutput:
                     non_retryable=False,
                 )
 
-            # Upload result (sync call in thread pool)
-            revised_url = await asyncio.to_thread(
-                _upload_image, result_image, resolved_input.project_id
+            # Upload result and append this round's turns to the R2 history
+            revised_url, history_key = await asyncio.gather(
+                _upload_image(result_image, input.project_id),
+                serialize_contents_to_r2(
+                    updated_history, input.project_id, persisted_turns=persisted_turns
+                ),
             )
 
-            # Serialize updated history back to R2 using shared helper
-            history_key = await asyncio.to_thread(
-                serialize_contents_to_r2, updated_history, resolved_input.project_id
-            )
+        revised_variants = await store_variants(revised_url, result_image)
 
         # Download original for eval if not already available (text-only continue path)
         if original_image is None:
-            original_image = await download_image(resolved_input.base_image_url)
+            original_image = await download_image(input.base_image_url)
 
         # Run eval if enabled — fire-and-forget, never blocks the activity
         task = asyncio.create_task(
             _maybe_run_edit_eval(
                 result_image=result_image,
                 original_image=original_image,
-                original_url=resolved_input.base_image_url,
+                original_url=input.base_image_url,
                 revised_url=revised_url,
                 instruction=_build_eval_instruction(input),
             )
@@ -607,10 +595,16 @@ async def edit_design(input: EditDesignInput) -> EditDesignOutput:
         return EditDesignOutput(
             revised_image_url=revised_url,
             chat_history_key=history_key,
+            revised_image_variants=revised_variants,
         )
 
     except ApplicationError:
         raise
+    except TimeoutError as e:
+        raise ApplicationError(
+            f"Gemini API timed out after {settings.gemini_timeout_seconds:g}s",
+            non_retryable=False,
+        ) from e
     except Exception as e:
         error_type = type(e).__name__
         error_msg = str(e)
@@ -8,10 +8,13 @@ results to R2 and returns DesignOption objects.
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import io
 import os
 import re
+import time
 from pathlib import Path
+from typing import cast
 
 import structlog
 from google.genai import types
@@ -19,6 +22,7 @@ from PIL import Image
 from temporalio import activity
 from temporalio.exceptions import ApplicationError
 
+from app.config import settings
 from app.models.contracts import (
     DesignBrief,
     DesignOption,
@@ -33,7 +37,9 @@ from app.utils.gemini_chat import (
     MAX_INPUT_IMAGES,
     extract_image,
     extract_text,
+    gemini_call,
     get_client,
+    to_parts,
 )
 from app.utils.http import download_images
 from app.utils.prompt_versioning import (
@@ -423,20 +429,36 @@ def _extract_project_id(urls: list[str]) -> str:
     )
 
 
-def _upload_image(image: Image.Image, project_id: str, filename: str) -> str:
+async def _upload_image(image: Image.Image, project_id: str, name: str) -> str:
     """Upload a PIL Image to R2 and return the storage key.
 
+    Encoded as ``settings.output_image_format``; the key gets the matching
+    extension and a content hash (``option_0-1f2e3d4c5b6a7988.webp``).
     Returns the R2 key (not a presigned URL) so the workflow stores a stable
-    reference.  The API layer presigns on every state query, giving iOS
+    reference. The API layer presigns on every state query, giving iOS
     always-fresh URLs.
+
+    The hash makes each regeneration a new key: presigned URLs are cached
+    per key (``r2.resolve_url``), and iOS caches images by URL, so
+    overwriting ``option_0`` in place would keep serving the old design.
     """
-    from app.utils.r2 import upload_object
+    from app.utils.image import encode_output_image
+    from app.utils.r2_async import upload_object
 
-    buf = io.BytesIO()
-    image.save(buf, format="PNG")
-    key = f"projects/{project_id}/generated/{filename}"
-    logger.info("r2_upload_start", key=key, size_bytes=buf.tell())
-    upload_object(key, buf.getvalue(), content_type="image/png")
+    # Encoding is CPU-bound; the upload itself is native async
+    start = time.monotonic()
+    encoded = await asyncio.to_thread(
+        encode_output_image, image, settings.output_image_format, settings.output_image_quality
+    )
+    digest = hashlib.sha256(encoded.data).hexdigest()[:16]
+    key = f"projects/{project_id}/generated/{name}-{digest}.{encoded.extension}"
+    logger.info(
+        "r2_upload_start",
+        key=key,
+        size_bytes=len(encoded.data),
+        encode_ms=round((time.monotonic() - start) * 1000),
+    )
+    await upload_object(key, encoded.data, content_type=encoded.content_type)
     return key
 
 
@@ -491,12 +513,14 @@ async def _generate_single_option(
         num_inspiration_images=len(inspiration_images),
     )
 
-    # Run sync Gemini call in thread pool with timeout to prevent hanging
-    async with asyncio.timeout(150):
-        response = await asyncio.to_thread(
-            client.models.generate_content,
+    # PNG-encode the images once, off the event loop; the retry reuses the parts
+    parts = await asyncio.to_thread(to_parts, contents)
+
+    # Async SDK call under the worker's Gemini slot + timeout (cancelled on expiry)
+    async with gemini_call():
+        response = await client.aio.models.generate_content(
             model=GEMINI_MODEL,
-            contents=contents,
+            contents=cast("list", parts),
             config=config,
         )
 
@@ -510,11 +534,11 @@ async def _generate_single_option(
             option=option_index,
             gemini_text=text_response[:300],
         )
-        async with asyncio.timeout(150):
-            response = await asyncio.to_thread(
-                client.models.generate_content,
+        retry_parts = [*parts, types.Part(text="Please generate the room image now.")]
+        async with gemini_call():
+            response = await client.aio.models.generate_content(
                 model=GEMINI_MODEL,
-                contents=contents + ["Please generate the room image now."],
+                contents=cast("list", retry_parts),
                 config=config,
             )
         result_image = extract_image(response)
@@ -570,12 +594,13 @@ async def _maybe_run_eval(
                 if generation_prompts and idx < len(generation_prompts):
                     gen_prompt = generation_prompts[idx]
 
-                from app.utils.r2 import resolve_url
+                from app.utils.r2 import presign_batch
 
-                gen_presigned = await asyncio.to_thread(resolve_url, gen_url)
+                # The eval model fetches both images itself, so only it needs URLs
+                original_presigned, gen_presigned = await presign_batch([original_url, gen_url])
 
                 result = await evaluate_generation(
-                    original_photo_url=original_url,
+                    original_photo_url=original_presigned,
                     generated_image_url=gen_presigned,
                     brief=brief,
                     generation_prompt=gen_prompt,
@@ -632,18 +657,14 @@ async def generate_designs(input: GenerateDesignsInput) -> GenerateDesignsOutput
     # Extract project_id from R2 key/URL path pattern: projects/{id}/...
     project_id = _extract_project_id(input.room_photo_urls)
 
-    # Resolve R2 storage keys to presigned URLs (pass through existing URLs)
-    from app.utils.r2 import resolve_urls
+    from app.utils.image_variants import store_variants
     from app.utils.tracing import trace_thread
 
-    room_urls = await asyncio.to_thread(resolve_urls, input.room_photo_urls)
-    inspiration_urls = await asyncio.to_thread(resolve_urls, input.inspiration_photo_urls)
-
     try:
-        # Download source images
+        # Storage keys are read directly (no presign); external URLs are fetched
         room_images, inspiration_images = await asyncio.gather(
-            download_images(room_urls),
-            download_images(inspiration_urls),
+            download_images(input.room_photo_urls),
+            download_images(input.inspiration_photo_urls),
         )
 
         if not room_images:
@@ -699,9 +720,14 @@ async def generate_designs(input: GenerateDesignsInput) -> GenerateDesignsOutput
                 )
             )
 
-        # Upload to R2 (sync boto3 calls run in thread pool)
-        url_0 = await asyncio.to_thread(_upload_image, option_0, project_id, "option_0.png")
-        url_1 = await asyncio.to_thread(_upload_image, option_1, project_id, "option_1.png")
+        # Upload to R2
+        url_0, url_1 = await asyncio.gather(
+            _upload_image(option_0, project_id, "option_0"),
+            _upload_image(option_1, project_id, "option_1"),
+        )
+        variants_0, variants_1 = await asyncio.gather(
+            store_variants(url_0, option_0), store_variants(url_1, option_1)
+        )
 
         # Run eval if enabled — fire-and-forget, never blocks the activity
         room_context = _format_room_context(input.room_dimensions)
@@ -711,7 +737,7 @@ async def generate_designs(input: GenerateDesignsInput) -> GenerateDesignsOutput
                 original=room_images[0],
                 brief=input.design_brief,
                 generated_urls=[url_0, url_1],
-                original_url=room_urls[0],
+                original_url=input.room_photo_urls[0],
                 generation_prompts=prompts,
                 room_context=room_context,
             )
@@ -721,8 +747,8 @@ async def generate_designs(input: GenerateDesignsInput) -> GenerateDesignsOutput
 
         return GenerateDesignsOutput(
             options=[
-                DesignOption(image_url=url_0, caption="Design Option A"),
-                DesignOption(image_url=url_1, caption="Design Option B"),
+                DesignOption(image_url=url_0, caption="Design Option A", variants=variants_0),
+                DesignOption(image_url=url_1, caption="Design Option B", variants=variants_1),
             ]
         )
 
@@ -730,7 +756,7 @@ async def generate_designs(input: GenerateDesignsInput) -> GenerateDesignsOutput
         raise
     except TimeoutError as e:
         raise ApplicationError(
-            "Gemini API timed out after 150s",
+            f"Gemini API timed out after {settings.gemini_timeout_seconds:g}s",
             non_retryable=False,
         ) from e
     except Exception as e:
@@ -5,13 +5,19 @@ Called by the Temporal workflow on:
 2. 48h abandonment timeout
 3. User-initiated project cancellation
 
-Deletes all R2 objects under the project prefix, then deletes the project
-row from PostgreSQL (children cascade via ON DELETE CASCADE).
+Releases the project's references into the shared blob store (deleting
+blobs no other project references), deletes all R2 objects under the
+project prefix, then deletes the project row from PostgreSQL (children
+cascade via ON DELETE CASCADE).
+
+``purge_projects`` does the same for many projects in one invocation: all
+prefixes are listed and deleted concurrently by the bulk purge engine
+(``r2_async.delete_prefixes``) and the rows go in one statement, so a burst
+of purge timers doesn't turn into a queue of one-project activities.
 """
 
 from __future__ import annotations
 
-import asyncio
 import uuid
 
 import asyncpg
@@ -19,7 +25,9 @@ import structlog
 from temporalio import activity
 
 from app.config import settings
-from app.utils.r2 import delete_prefix
+from app.models.contracts import PurgeProjectsInput, PurgeProjectsOutput
+from app.utils.blob_store import release_project_blobs
+from app.utils.r2_async import delete_prefix, delete_prefixes
 
 logger = structlog.get_logger()
 
@@ -29,28 +37,76 @@ def _pg_dsn() -> str:
     return settings.database_url.replace("postgresql+asyncpg://", "postgresql://")
 
 
+def _r2_prefix(project_id: str) -> str:
+    return f"projects/{project_id}/"
+
+
+async def _delete_project_rows(project_ids: list[str]) -> None:
+    """Delete project rows (children cascade). Failures are logged, not raised.
+
+    R2 cleanup has already succeeded by the time this runs — orphaned DB
+    records are harmless, so a DB failure doesn't fail the activity.
+    """
+    try:
+        conn = await asyncpg.connect(dsn=_pg_dsn())
+        try:
+            result = await conn.execute(
+                "DELETE FROM projects WHERE id = ANY($1::uuid[])",
+                [uuid.UUID(pid) for pid in project_ids],
+            )
+            logger.info("purge_db_complete", project_ids=project_ids, result=result)
+        finally:
+            await conn.close()
+    except Exception:
+        logger.exception("purge_db_failed", project_ids=project_ids)
+
+
 @activity.defn
 async def purge_project_data(project_id: str) -> None:
     """Delete all R2 objects and DB records for a project.
 
-    R2 objects are stored under /projects/{project_id}/.
+    R2 objects are stored under /projects/{project_id}/, plus shared blobs
+    (revisions, chat history images) under /blobs/ that are deleted once no
+    project references them.
     DB row deletion cascades to all child tables (photos, scans, briefs,
     generated images, revisions, shopping list) via ON DELETE CASCADE.
     """
-    r2_prefix = f"projects/{project_id}/"
+    r2_prefix = _r2_prefix(project_id)
 
     logger.info("purge_start", project_id=project_id, r2_prefix=r2_prefix)
-    await asyncio.to_thread(delete_prefix, r2_prefix)
-    logger.info("purge_r2_complete", project_id=project_id)
+    # Before the prefix: the project's blob references are listed under it
+    blobs_deleted = await release_project_blobs([project_id])
+    report = await delete_prefix(r2_prefix)
+    logger.info(
+        "purge_r2_complete",
+        project_id=project_id,
+        deleted=report.deleted,
+        blobs_deleted=blobs_deleted,
+    )
 
-    try:
-        conn = await asyncpg.connect(dsn=_pg_dsn())
-        try:
-            result = await conn.execute("DELETE FROM projects WHERE id = $1", uuid.UUID(project_id))
-            logger.info("purge_db_complete", project_id=project_id, result=result)
-        finally:
-            await conn.close()
-    except Exception:
-        logger.exception("purge_db_failed", project_id=project_id)
-        # R2 cleanup already succeeded — log the DB failure but don't
-        # fail the activity. The DB records are orphaned but harmless.
+    await _delete_project_rows([project_id])
+
+
+@activity.defn
+async def purge_projects(input: PurgeProjectsInput) -> PurgeProjectsOutput:
+    """Bulk variant of purge_project_data for many projects at once."""
+    logger.info("purge_batch_start", projects=len(input.project_ids))
+    blobs_deleted = await release_project_blobs(input.project_ids)
+    report = await delete_prefixes([_r2_prefix(pid) for pid in input.project_ids])
+    logger.info(
+        "purge_batch_r2_complete",
+        projects=len(input.project_ids),
+        deleted=report.deleted,
+        blobs_deleted=blobs_deleted,
+        failed=len(report.failed),
+        objects_per_second=report.objects_per_second,
+    )
+
+    await _delete_project_rows(input.project_ids)
+
+    return PurgeProjectsOutput(
+        projects=len(input.project_ids),
+        objects_deleted=report.deleted + blobs_deleted,
+        objects_failed=len(report.failed),
+        objects_per_second=report.objects_per_second,
+    )
@@ -40,6 +40,7 @@ from app.models.contracts import (
     RoomDimensions,
     UnmatchedItem,
 )
+from app.utils.http_pool import get_client
 from app.utils.tracing import traceable
 
 log = structlog.get_logger("shopping")
@@ -878,18 +879,18 @@ async def search_all_items(
     design_brief: DesignBrief | None = None,
 ) -> list[list[dict[str, Any]]]:
     """Step 2: Search Exa for products for all items (parallelized)."""
-    async with httpx.AsyncClient() as http_client:
-        tasks = [
-            search_products_for_item(
-                http_client,
-                item,
-                exa_api_key,
-                room_dimensions=room_dimensions,
-                design_brief=design_brief,
-            )
-            for item in items
-        ]
-        return list(await asyncio.gather(*tasks))
+    http_client = get_client("exa")
+    tasks = [
+        search_products_for_item(
+            http_client,
+            item,
+            exa_api_key,
+            room_dimensions=room_dimensions,
+            design_brief=design_brief,
+        )
+        for item in items
+    ]
+    return list(await asyncio.gather(*tasks))
 
 
 # === Step 3: Rubric-Based Scoring ===
@@ -1554,6 +1555,21 @@ def _extract_retailer(url: str) -> str:
         return "Unknown"
 
 
+def _trace_project_id(input: GenerateShoppingListInput) -> str:
+    """Project id for trace grouping: the input field, else a room photo key.
+
+    The design image is no help: edited revisions are stored under
+    ``blobs/{sha256}``, outside the project prefix.
+    """
+    if input.project_id:
+        return input.project_id
+    for key in input.original_room_photo_urls:
+        match = re.search(r"projects/([a-zA-Z0-9_-]+)/", key)
+        if match:
+            return match.group(1)
+    return "unknown"
+
+
 # === Main Activity ===
 
 
@@ -1577,15 +1593,14 @@ async def generate_shopping_list(
 
     client = wrap_anthropic(anthropic.AsyncAnthropic(api_key=anthropic_key))
 
-    # Extract project_id from R2 URL pattern for trace grouping
-    _pid_match = re.search(r"projects/([a-zA-Z0-9_-]+)/", input.design_image_url)
-    _project_id = _pid_match.group(1) if _pid_match else "unknown"
+    _project_id = _trace_project_id(input)
 
     # Resolve R2 storage keys to presigned URLs (pass through existing URLs)
-    from app.utils.r2 import resolve_url, resolve_urls
+    from app.utils.r2 import presign_batch
 
-    design_image_url = resolve_url(input.design_image_url)
-    original_room_photo_urls = resolve_urls(input.original_room_photo_urls)
+    design_image_url, *original_room_photo_urls = await presign_batch(
+        [input.design_image_url, *input.original_room_photo_urls]
+    )
 
     has_brief = input.design_brief is not None
     num_revisions = len(input.revision_history)
@@ -1715,14 +1730,14 @@ async def generate_shopping_list_streaming(
 
     client = wrap_anthropic(anthropic.AsyncAnthropic(api_key=anthropic_key))
 
-    _pid_match = re.search(r"projects/([a-zA-Z0-9_-]+)/", input.design_image_url)
-    _project_id = _pid_match.group(1) if _pid_match else "unknown"
+    _project_id = _trace_project_id(input)
 
-    from app.utils.r2 import resolve_url, resolve_urls
+    from app.utils.r2 import presign_batch
 
     try:
-        design_image_url = resolve_url(input.design_image_url)
-        original_room_photo_urls = resolve_urls(input.original_room_photo_urls)
+        design_image_url, *original_room_photo_urls = await presign_batch(
+            [input.design_image_url, *input.original_room_photo_urls]
+        )
     except Exception as e:
         log.error("shopping_stream_url_resolve_error", error=str(e))
         yield f"event: error\ndata: {json.dumps({'error': f'URL resolution failed: {e}'})}\n\n"
@@ -1758,32 +1773,32 @@ async def generate_shopping_list_streaming(
     # Step 2: Search items sequentially for streaming progress
     search_results: list[list[dict[str, Any]]] = []
     with trace_thread(_project_id, "shopping_search"):
-        async with httpx.AsyncClient() as http_client:
-            for item in items:
-                try:
-                    results = await search_products_for_item(
-                        http_client,
-                        item,
-                        exa_key,
-                        room_dimensions=input.room_dimensions,
-                        design_brief=input.design_brief,
-                    )
-                except Exception as e:
-                    log.warning(
-                        "shopping_stream_search_error",
-                        item=item.get("description"),
-                        error=str(e),
-                    )
-                    results = []
-
-                search_results.append(results)
-                payload = json.dumps(
-                    {
-                        "item": item.get("description", ""),
-                        "candidates": len(results),
-                    }
+        http_client = get_client("exa")
+        for item in items:
+            try:
+                results = await search_products_for_item(
+                    http_client,
+                    item,
+                    exa_key,
+                    room_dimensions=input.room_dimensions,
+                    design_brief=input.design_brief,
                 )
-                yield f"event: item_search\ndata: {payload}\n\n"
+            except Exception as e:
+                log.warning(
+                    "shopping_stream_search_error",
+                    item=item.get("description"),
+                    error=str(e),
+                )
+                results = []
+
+            search_results.append(results)
+            payload = json.dumps(
+                {
+                    "item": item.get("description", ""),
+                    "candidates": len(results),
+                }
+            )
+            yield f"event: item_search\ndata: {payload}\n\n"
 
     # Step 3: Score products (batch for quality)
     try:
@@ -1,25 +1,50 @@
 """Photo validation — blur, resolution, and content classification.
 
-Runs synchronously in the FastAPI photo upload handler (not a Temporal activity)
-because it's fast (<3s) and needs immediate user feedback.
+Runs inline in the FastAPI photo upload handler (not a Temporal activity)
+because it's fast (<3s) and needs immediate user feedback. The CPU-bound
+work (decode, blur, thumbnailing) runs in the image process pool
+(app.utils.image_pool) while the content check runs concurrently on the
+event loop; a saturated pool raises ImagePoolSaturatedError.
+
+The upload is decoded twice, both times at reduced resolution where the
+format allows (JPEG draft mode): into a ~1024px grayscale working image for
+the blur check, and into a 512px RGB thumbnail for the content check. The
+two decodes are separate pool tasks so the Haiku call can start without
+waiting for the blur check; each task receives its own copy of the upload
+bytes.
 
 Three checks:
-1. Resolution: min 1024px for room / 400px for inspiration (Pillow) — <10ms
+1. Resolution: min 1024px for room / 400px for inspiration (image header) — <1ms
 2. Blur: Laplacian variance, threshold 60 for room / 25 for inspiration — <50ms
-3. Content: Claude Haiku 4.5 image classification — ~1-2s
+3. Content: Claude Haiku 4.5 classification of a 512px thumbnail — ~1-2s
+
+The working image also yields a 64-bit perceptual hash (dHash) that the
+upload endpoints compare against the project's photos to reject near-duplicates.
 """
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
 import io
+import math
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 import anthropic
+import asyncpg
 import structlog
-from PIL import Image, ImageFilter
+from PIL import Image, ImageFilter, ImageStat
 
 from app.config import settings
 from app.models.contracts import ValidatePhotoInput, ValidatePhotoOutput
+from app.utils.image_pool import ImageWorkPool, get_image_pool
+from app.utils.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from app.models.contracts import PhotoData
 
 logger = structlog.get_logger()
 
@@ -28,60 +53,368 @@ MIN_RESOLUTION_INSPIRATION = 400
 BLUR_THRESHOLD = 60.0
 BLUR_THRESHOLD_INSPIRATION = 25.0
 NORMALIZE_SIZE = 1024
+CLASSIFY_MAX_SIZE = 512  # long side of the image sent to the content check
+CLASSIFY_JPEG_QUALITY = 85
+DHASH_SIZE = 8  # 8x8 gradient bits -> 64-bit hash
+DUPLICATE_MAX_DISTANCE = 6  # max Hamming distance between near-duplicate hashes
+VERDICT_VERSION = "v2"  # bump when the content prompt, model, thresholds or output change
+_LAPLACIAN_KERNEL = ImageFilter.Kernel((3, 3), [0, 1, 0, 1, -4, 1, 0, 1, 0], scale=1)
+
+
+@dataclass
+class _LocalChecks:
+    """Outcome of the CPU-bound checks (decode, resolution, blur)."""
+
+    failures: list[str]
+    messages: list[str]
+    header_size: tuple[int, int]
+    working_size: tuple[int, int]
+    working_image_bytes: int
+    perceptual_hash: str
+    timings_ms: dict[str, float]
+
+
+async def validate_photo(input: ValidatePhotoInput) -> ValidatePhotoOutput:
+    """Run all validation checks on an uploaded photo.
+
+    Content classification is started speculatively alongside the local
+    checks (which run in the image pool) and cancelled as soon as any
+    local check fails, so a passing photo pays max(local, content) rather
+    than local + content. Image-pool slots are held only while a pool task
+    runs, not while Haiku answers; cache hits never take one.
+    """
+    timings_ms: dict[str, float] = {}
+    start = time.perf_counter()
+
+    cache_key = await _verdict_cache_key(input.image_data, input.photo_type)
+    cached = await _get_cached_verdict(cache_key)
+    if cached is not None:
+        timings_ms["total"] = _elapsed_ms(start)
+        logger.info(
+            "photo_validation",
+            photo_type=input.photo_type,
+            passed=cached.passed,
+            failures=cached.failures,
+            cache="hit",
+            timings_ms=timings_ms,
+            **_verdict_cache.stats(),
+        )
+        return cached.model_copy(deep=True)
+
+    # Each pool task is admitted separately; ImagePoolSaturatedError -> 503 in the API
+    output, cacheable = await _run_checks(input, get_image_pool(), timings_ms, start)
+    if cacheable:
+        await _store_verdict(cache_key, output)
+    return output
+
+
+async def _run_checks(
+    input: ValidatePhotoInput,
+    pool: ImageWorkPool,
+    timings_ms: dict[str, float],
+    start: float,
+) -> tuple[ValidatePhotoOutput, bool]:
+    """Run local + content checks. Returns (output, whether it may be cached)."""
+    content_task: asyncio.Task[tuple[bool, str]] | None = None
+    if settings.anthropic_api_key:
+        content_task = asyncio.create_task(
+            _timed_check_content(input.image_data, input.photo_type, timings_ms)
+        )
+    else:
+        logger.warning(
+            "photo_validation_content_check_skipped",
+            reason="anthropic_api_key not configured",
+        )
+
+    try:
+        local = await pool.run(_run_local_checks, input.image_data, input.photo_type)
+    except BaseException:
+        await _cancel_content(content_task)
+        raise
+
+    if local is None:
+        await _cancel_content(content_task)
+        return _invalid_image(), False
+
+    timings_ms.update(local.timings_ms)
+    failures = local.failures
+    messages = local.messages
+    content_cancelled = False
+    # Local failures are deterministic; a pass is only final once Haiku gave a verdict
+    cacheable = bool(failures)
+
+    # Check 3: Content classification (only counts if basic checks pass)
+    if failures:
+        content_cancelled = await _cancel_content(content_task)
+    elif content_task is not None:
+        content_result = await content_task
+        cacheable = content_result is not _FAIL_OPEN
+        content_ok, content_msg = content_result
+        if not content_ok:
+            failures.append("content_rejected")
+            messages.append(content_msg)
 
+    passed = len(failures) == 0
+    if passed:
+        messages.append("Photo looks great!")
 
-def validate_photo(input: ValidatePhotoInput) -> ValidatePhotoOutput:
-    """Run all validation checks on an uploaded photo."""
+    timings_ms["total"] = _elapsed_ms(start)
+    logger.info(
+        "photo_validation",
+        photo_type=input.photo_type,
+        passed=passed,
+        failures=failures,
+        header_size=local.header_size,
+        working_size=local.working_size,
+        working_image_bytes=local.working_image_bytes,
+        content_cancelled=content_cancelled,
+        cache="miss",
+        timings_ms=timings_ms,
+        **_verdict_cache.stats(),
+        **pool.stats(),
+    )
+    output = ValidatePhotoOutput(
+        passed=passed,
+        failures=failures,
+        messages=messages,
+        perceptual_hash=local.perceptual_hash,
+    )
+    return output, cacheable
+
+
+def _run_local_checks(image_data: bytes, photo_type: str) -> _LocalChecks | None:
+    """Decode the photo and run resolution + blur checks. None means undecodable.
+
+    Runs in an image-pool worker process, so everything it returns is pickled.
+    """
+    timings_ms: dict[str, float] = {}
     failures: list[str] = []
     messages: list[str] = []
 
+    start = time.perf_counter()
     try:
-        img = Image.open(io.BytesIO(input.image_data))
-        img.load()  # Force full decode to catch truncated/decompression bombs early
+        img: Image.Image = Image.open(io.BytesIO(image_data))  # header only — no pixel decode
+        header_size = img.size
     except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as exc:
         logger.warning("photo_validation_image_open_failed", error=str(exc))
-        return ValidatePhotoOutput(
-            passed=False,
-            failures=["invalid_image"],
-            messages=["Could not open image. Please upload a valid JPEG or PNG."],
-        )
+        return None
 
     # Check 1: Resolution (lower bar for inspiration — online images are often smaller)
-    res_ok, res_msg = _check_resolution(img, input.photo_type)
+    res_ok, res_msg = _check_resolution(img, photo_type)
+    timings_ms["resolution"] = _elapsed_ms(start)
+
+    start = time.perf_counter()
+    try:
+        img = _decode_working_image(img)
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning("photo_validation_image_decode_failed", error=str(exc))
+        return None
+    timings_ms["decode"] = _elapsed_ms(start)
+
     if not res_ok:
         failures.append("low_resolution")
         messages.append(res_msg)
 
     # Check 2: Blur (lower bar for inspiration — stylized/filtered images are common)
-    blur_ok, blur_msg = _check_blur(img, input.photo_type)
+    start = time.perf_counter()
+    blur_ok, blur_msg = _check_blur(img, photo_type)
+    timings_ms["blur"] = _elapsed_ms(start)
     if not blur_ok:
         failures.append("blurry")
         messages.append(blur_msg)
 
-    # Check 3: Content classification (only if basic checks pass)
-    if not failures:
-        if settings.anthropic_api_key:
-            content_ok, content_msg = _check_content(input.image_data, input.photo_type)
-            if not content_ok:
-                failures.append("content_rejected")
-                messages.append(content_msg)
-        else:
-            logger.warning(
-                "photo_validation_content_check_skipped",
-                reason="anthropic_api_key not configured",
-            )
-
-    passed = len(failures) == 0
-    if passed:
-        messages.append("Photo looks great!")
+    start = time.perf_counter()
+    perceptual_hash = _perceptual_hash(img)
+    timings_ms["phash"] = _elapsed_ms(start)
 
-    logger.info(
-        "photo_validation",
-        photo_type=input.photo_type,
-        passed=passed,
+    return _LocalChecks(
         failures=failures,
+        messages=messages,
+        header_size=header_size,
+        working_size=img.size,
+        working_image_bytes=img.width * img.height * len(img.getbands()),
+        perceptual_hash=perceptual_hash,
+        timings_ms=timings_ms,
     )
-    return ValidatePhotoOutput(passed=passed, failures=failures, messages=messages)
+
+
+async def _timed_check_content(
+    image_data: bytes, photo_type: str, timings_ms: dict[str, float]
+) -> tuple[bool, str]:
+    start = time.perf_counter()
+    try:
+        return await _check_content(image_data, photo_type)
+    finally:
+        timings_ms["content"] = _elapsed_ms(start)
+
+
+async def _cancel_content(task: asyncio.Task[tuple[bool, str]] | None) -> bool:
+    """Cancel a speculative content check. Returns True if it was still in flight."""
+    if task is None:
+        return False
+    in_flight = not task.done()
+    task.cancel()
+    # Await so the cancellation (or an already-raised error) is consumed here
+    await asyncio.gather(task, return_exceptions=True)
+    return in_flight
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+# --- Verdict cache ---------------------------------------------------------
+#
+# Re-uploads of the same bytes (deleted-and-re-added photos, inspiration
+# images reused across projects) skip decoding and the Haiku call. Keyed by
+# content hash + photo_type + VERDICT_VERSION; bump the version whenever the
+# content prompt, model or local thresholds change so stale verdicts are
+# never served. Postgres persistence (validation_cache_persist) lets verdicts
+# survive API restarts and be shared across replicas. That tier is strictly
+# best-effort: connects time out fast, a failed connect is not retried for
+# PG_RETRY_BACKOFF_SECONDS, and expired rows are pruned on write at most once
+# per PG_PRUNE_INTERVAL_SECONDS.
+
+PG_CONNECT_TIMEOUT_SECONDS = 2.0
+PG_COMMAND_TIMEOUT_SECONDS = 2.0
+PG_RETRY_BACKOFF_SECONDS = 30.0
+PG_PRUNE_INTERVAL_SECONDS = 3600.0
+
+_verdict_cache: TTLCache[str, ValidatePhotoOutput] = TTLCache(
+    max_entries=settings.validation_cache_max_entries,
+    ttl_seconds=settings.validation_cache_ttl_seconds,
+)
+_pg_pool: asyncpg.Pool | None = None
+_pg_pool_lock = asyncio.Lock()
+_pg_retry_at = 0.0  # monotonic time before which no new connect is attempted
+_pg_last_prune = 0.0
+
+
+async def _verdict_cache_key(image_data: bytes, photo_type: str) -> str:
+    # hashlib releases the GIL — hash a 20 MB upload off the event loop
+    digest = await asyncio.to_thread(lambda: hashlib.sha256(image_data).hexdigest())
+    return f"{digest}:{photo_type}:{VERDICT_VERSION}"
+
+
+async def _get_cached_verdict(key: str) -> ValidatePhotoOutput | None:
+    cached = _verdict_cache.get(key)
+    if cached is not None or not settings.validation_cache_persist:
+        return cached
+    try:
+        pool = await _get_pg_pool()
+        row = await pool.fetchrow(
+            "SELECT verdict FROM photo_validation_verdicts "
+            "WHERE cache_key = $1 AND created_at > now() - make_interval(secs => $2)",
+            key,
+            float(settings.validation_cache_ttl_seconds),
+        )
+    except Exception as exc:
+        logger.warning("photo_validation_cache_read_failed", error=str(exc))
+        return None
+    if row is None:
+        return None
+    verdict = ValidatePhotoOutput.model_validate_json(row["verdict"])
+    _verdict_cache.set(key, verdict)
+    return verdict
+
+
+async def _store_verdict(key: str, verdict: ValidatePhotoOutput) -> None:
+    _verdict_cache.set(key, verdict.model_copy(deep=True))
+    if not settings.validation_cache_persist:
+        return
+    try:
+        pool = await _get_pg_pool()
+        await pool.execute(
+            "INSERT INTO photo_validation_verdicts (cache_key, verdict) VALUES ($1, $2::jsonb) "
+            "ON CONFLICT (cache_key) DO UPDATE SET verdict = EXCLUDED.verdict, created_at = now()",
+            key,
+            verdict.model_dump_json(),
+        )
+        await _prune_expired_verdicts(pool)
+    except Exception as exc:
+        # Best-effort — the in-process entry is already stored
+        logger.warning("photo_validation_cache_write_failed", error=str(exc))
+
+
+async def _prune_expired_verdicts(pool: asyncpg.Pool) -> None:
+    """Delete expired rows so the persistent tier stays bounded (throttled per process)."""
+    global _pg_last_prune
+    now = time.monotonic()
+    if _pg_last_prune and now - _pg_last_prune < PG_PRUNE_INTERVAL_SECONDS:
+        return
+    _pg_last_prune = now
+    status = await pool.execute(
+        "DELETE FROM photo_validation_verdicts "
+        "WHERE created_at < now() - make_interval(secs => $1)",
+        float(settings.validation_cache_ttl_seconds),
+    )
+    logger.info("photo_validation_cache_pruned", status=status)
+
+
+async def _get_pg_pool() -> asyncpg.Pool:
+    """Lazy asyncpg pool for verdict persistence (API process, single event loop).
+
+    Creation is serialised so concurrent first uploads share one pool. After
+    a failed connect, callers fail immediately until the backoff expires
+    instead of each waiting on a fresh connect attempt.
+    """
+    global _pg_pool, _pg_retry_at
+    if _pg_pool is not None:
+        return _pg_pool
+    async with _pg_pool_lock:
+        if _pg_pool is None:
+            if time.monotonic() < _pg_retry_at:
+                raise ConnectionError("verdict store unreachable, backing off")
+            dsn = settings.database_url.replace("postgresql+asyncpg://", "postgresql://")
+            try:
+                _pg_pool = await asyncpg.create_pool(
+                    dsn=dsn,
+                    min_size=1,
+                    max_size=4,
+                    timeout=PG_CONNECT_TIMEOUT_SECONDS,
+                    command_timeout=PG_COMMAND_TIMEOUT_SECONDS,
+                )
+            except Exception:
+                _pg_retry_at = time.monotonic() + PG_RETRY_BACKOFF_SECONDS
+                raise
+    return _pg_pool
+
+
+async def close_verdict_store() -> None:
+    """Close the Postgres verdict pool, if one was opened (API shutdown)."""
+    global _pg_pool
+    pool, _pg_pool = _pg_pool, None
+    if pool is not None:
+        await pool.close()
+
+
+def _invalid_image() -> ValidatePhotoOutput:
+    return ValidatePhotoOutput(
+        passed=False,
+        failures=["invalid_image"],
+        messages=["Could not open image. Please upload a valid JPEG or PNG."],
+    )
+
+
+def _decode_working_image(img: Image.Image) -> Image.Image:
+    """Decode a lazily-opened image at the smallest size blur detection can use.
+
+    JPEGs are decoded via draft mode: libjpeg's DCT scaling (1/2, 1/4, 1/8)
+    produces a grayscale image whose shortest side is still >= NORMALIZE_SIZE,
+    so a 48 MP photo costs ~3 MB instead of ~144 MB of RGB pixels. Other
+    formats decode at full size.
+
+    The load() doubles as the integrity check: draft decoding still consumes
+    the whole entropy-coded stream, so truncated files raise OSError here.
+    Must be called before any other pixel access on ``img``.
+    """
+    w, h = img.size
+    shortest = min(w, h)
+    if img.format == "JPEG" and shortest > NORMALIZE_SIZE:
+        scale = NORMALIZE_SIZE / shortest
+        img.draft("L", (math.ceil(w * scale), math.ceil(h * scale)))
+    img.load()
+    return img
 
 
 def _check_resolution(img: Image.Image, photo_type: str = "room") -> tuple[bool, str]:
@@ -116,14 +449,10 @@ def _check_blur(img: Image.Image, photo_type: str = "room") -> tuple[bool, str]:
         gray = gray.resize((max(1, int(w * scale)), max(1, int(h * scale))), Image.LANCZOS)
 
     # Laplacian filter (edge detection) — low variance = blurry
-    laplacian = gray.filter(ImageFilter.Kernel((3, 3), [0, 1, 0, 1, -4, 1, 0, 1, 0], scale=1))
-    pixels = list(laplacian.getdata())
-    if not pixels:
+    variance = _laplacian_variance(gray)
+    if variance is None:
         return False, "Could not analyze image for blur."
 
-    mean = sum(pixels) / len(pixels)
-    variance = sum((p - mean) ** 2 for p in pixels) / len(pixels)
-
     threshold = BLUR_THRESHOLD_INSPIRATION if photo_type == "inspiration" else BLUR_THRESHOLD
     if variance < threshold:
         msg = (
@@ -135,16 +464,72 @@ def _check_blur(img: Image.Image, photo_type: str = "room") -> tuple[bool, str]:
     return True, ""
 
 
-_anthropic_client: anthropic.Anthropic | None = None
-
-
-def _get_anthropic_client() -> anthropic.Anthropic:
+def _laplacian_variance(gray: Image.Image) -> float | None:
+    """Population variance of the Laplacian of a grayscale image.
+
+    Pillow clamps the filtered pixels to 0-255, so ImageStat computes the
+    same mean/variance from the 256-bin histogram in C that a per-pixel
+    Python loop would. At 1024x4096 (the largest working image) the whole
+    call takes ~50ms, almost all of it the 3x3 filter; the statistics step
+    is ~5ms where the old loop took ~480ms.
+    Returns None for an empty image.
+    """
+    if gray.width == 0 or gray.height == 0:
+        return None
+    laplacian = gray.filter(_LAPLACIAN_KERNEL)
+    return float(ImageStat.Stat(laplacian).var[0])
+
+
+def _perceptual_hash(img: Image.Image) -> str:
+    """64-bit difference hash (dHash) of the working image, as 16 hex chars.
+
+    Each bit records whether a pixel of the 9x8 grayscale thumbnail is darker
+    than its right neighbour, so re-encodes, resizes and small exposure
+    changes of the same shot land within a few bits of each other.
+    """
+    if img.mode not in ("L", "RGB"):
+        img = img.convert("RGB")
+    small = img.resize((DHASH_SIZE + 1, DHASH_SIZE), Image.LANCZOS, reducing_gap=2.0)
+    px = small.convert("L").tobytes()
+    bits = 0
+    for row in range(DHASH_SIZE):
+        offset = row * (DHASH_SIZE + 1)
+        for col in range(DHASH_SIZE):
+            bits = (bits << 1) | (px[offset + col] < px[offset + col + 1])
+    return f"{bits:0{DHASH_SIZE * DHASH_SIZE // 4}x}"
+
+
+def find_near_duplicate(perceptual_hash: str | None, photos: list[PhotoData]) -> PhotoData | None:
+    """Return the closest photo whose hash is within DUPLICATE_MAX_DISTANCE, if any.
+
+    Photos without a hash (uploaded before hashing, or undecodable) never match.
+    """
+    if perceptual_hash is None:
+        return None
+    target = int(perceptual_hash, 16)
+    best: PhotoData | None = None
+    best_distance = DUPLICATE_MAX_DISTANCE + 1
+    for photo in photos:
+        if photo.perceptual_hash is None:
+            continue
+        distance = (int(photo.perceptual_hash, 16) ^ target).bit_count()
+        if distance < best_distance:
+            best, best_distance = photo, distance
+    return best
+
+
+_anthropic_client: anthropic.AsyncAnthropic | None = None
+
+
+def _get_anthropic_client() -> anthropic.AsyncAnthropic:
     """Lazy singleton for Anthropic client — reuses connection pool across calls."""
     from app.utils.tracing import wrap_anthropic
 
     global _anthropic_client
     if _anthropic_client is None:
-        _anthropic_client = wrap_anthropic(anthropic.Anthropic(api_key=settings.anthropic_api_key))
+        _anthropic_client = wrap_anthropic(
+            anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+        )
     return _anthropic_client
 
 
@@ -157,10 +542,35 @@ def _detect_media_type(image_data: bytes) -> str:
     return f"image/{fmt.lower()}"
 
 
-def _check_content(image_data: bytes, photo_type: str) -> tuple[bool, str]:
+def _build_classification_payload(image_data: bytes) -> tuple[str, str]:
+    """Return (media_type, base64 data) for the content-check request.
+
+    A YES/NO room classification doesn't need the full upload: images larger
+    than CLASSIFY_MAX_SIZE are draft-decoded and re-encoded as a small JPEG
+    (~30-60 KB instead of up to 20 MB). Images already within the limit are
+    sent as-is.
+    """
+    img = Image.open(io.BytesIO(image_data))
+    if max(img.size) <= CLASSIFY_MAX_SIZE:
+        return _detect_media_type(image_data), base64.b64encode(image_data).decode()
+
+    img.draft("RGB", (CLASSIFY_MAX_SIZE, CLASSIFY_MAX_SIZE))
+    thumb = img.convert("RGB")
+    thumb.thumbnail((CLASSIFY_MAX_SIZE, CLASSIFY_MAX_SIZE), Image.LANCZOS)
+    buf = io.BytesIO()
+    thumb.save(buf, format="JPEG", quality=CLASSIFY_JPEG_QUALITY)
+    return "image/jpeg", base64.b64encode(buf.getvalue()).decode()
+
+
+# Returned (by identity) when the content check could not reach a verdict, so
+# validate_photo knows not to cache the resulting pass.
+_FAIL_OPEN: tuple[bool, str] = (True, "")
+
+
+async def _check_content(image_data: bytes, photo_type: str) -> tuple[bool, str]:
     """Classify image content using Claude Haiku 4.5."""
     client = _get_anthropic_client()
-    b64 = base64.b64encode(image_data).decode()
+    media_type, b64 = await get_image_pool().run(_build_classification_payload, image_data)
 
     if photo_type == "room":
         prompt = (
@@ -175,8 +585,7 @@ def _check_content(image_data: bytes, photo_type: str) -> tuple[bool, str]:
         )
 
     try:
-        media_type = _detect_media_type(image_data)
-        response = client.messages.create(
+        response = await client.messages.create(
             model="claude-haiku-4-5-20251001",
             max_tokens=100,
             messages=[
@@ -198,7 +607,7 @@ def _check_content(image_data: bytes, photo_type: str) -> tuple[bool, str]:
                 photo_type=photo_type,
                 content_length=len(response.content) if response.content else 0,
             )
-            return True, ""  # fail open for P1
+            return _FAIL_OPEN  # fail open for P1
 
         answer = response.content[0].text.strip().upper()
         if answer.startswith("NO"):
@@ -220,4 +629,4 @@ def _check_content(image_data: bytes, photo_type: str) -> tuple[bool, str]:
             exc_info=True,
         )
         # Fail open for P1 — content check is best-effort
-        return True, ""
+        return _FAIL_OPEN
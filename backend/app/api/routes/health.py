@@ -78,6 +78,8 @@ async def _check_r2() -> str:
     """Check R2 bucket accessibility via head_bucket."""
     from app.utils.r2 import _get_client
 
+    if settings.storage_backend == "local":
+        return "local"
     try:
 
         def _head_bucket() -> None:
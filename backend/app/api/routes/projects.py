@@ -14,18 +14,19 @@ import time
 import uuid
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Literal
+from typing import Annotated, Literal
 
 import structlog
 from fastapi import APIRouter, Form, Request, UploadFile
 from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, ValidationError
 
-from app.activities.validation import validate_photo
+from app.activities.validation import find_near_duplicate, validate_photo
 from app.config import settings
 from app.models.contracts import (
     ActionResponse,
     AnnotationEditRequest,
+    BatchPhotoUploadResponse,
     ChatMessage,
     CreateProjectRequest,
     CreateProjectResponse,
@@ -34,6 +35,7 @@ from app.models.contracts import (
     ErrorResponse,
     GenerateShoppingListInput,
     GenerateShoppingListOutput,
+    ImageVariants,
     IntakeChatInput,
     IntakeChatOutput,
     IntakeConfirmRequest,
@@ -50,8 +52,10 @@ from app.models.contracts import (
     TextFeedbackRequest,
     UnmatchedItem,
     ValidatePhotoInput,
+    ValidatePhotoOutput,
     WorkflowState,
 )
+from app.utils.image_pool import ImagePoolSaturatedError, get_image_pool
 from app.utils.lidar import LidarParseError, parse_room_dimensions
 
 logger = structlog.get_logger()
@@ -68,10 +72,15 @@ _LIDAR_FIXTURE_PATH = (
     Path(__file__).resolve().parents[3] / "tests" / "fixtures" / "real_lidar_scan.json"
 )
 MAX_INSPIRATION_PHOTOS = 3
+MAX_BATCH_PHOTOS = 5  # 2 room + 3 inspiration — the whole photo step in one request
+# image-pool tasks per photo: local checks + content thumbnail + delivery variants
+POOL_TASKS_PER_PHOTO = 3
 
 
-def _r2_configured() -> bool:
-    """Check if all required R2 credentials are available for photo storage."""
+def _storage_configured() -> bool:
+    """Check whether photos can be stored: the local backend, or full R2 credentials."""
+    if settings.storage_backend == "local":
+        return True
     return bool(
         settings.r2_account_id
         and settings.r2_access_key_id
@@ -264,23 +273,39 @@ async def _resolve_state(request: Request, project_id: str) -> WorkflowState | N
     return _get_state(project_id)
 
 
-def _presign_image_urls(state: WorkflowState) -> None:
+async def _presign_image_urls(state: WorkflowState) -> None:
     """Resolve R2 storage keys → fresh presigned URLs in-place.
 
     Activities store R2 keys (``projects/{id}/generated/option_0.png``).
     This function converts them to presigned URLs before serving to iOS
     so images never expire while the project is still active.  Already-
-    presigned URLs (mock mode, legacy data) pass through unchanged.
+    presigned URLs (mock mode, legacy data) pass through unchanged.  The
+    same URL is returned across polls until it nears expiry (r2 presign
+    cache), so the client's image cache keeps hitting.
     """
-    from app.utils.r2 import resolve_url
+    from app.utils.r2 import presign_batch
 
+    # (model, field) pairs holding a key or URL — presigned together in one batch
+    fields: list[tuple[BaseModel, str]] = []
+
+    def add_variants(variants: ImageVariants | None) -> None:
+        if variants is not None:
+            fields.extend([(variants, "preview_url"), (variants, "thumbnail_url")])
+
+    for photo in state.photos:
+        add_variants(photo.variants)
     for opt in state.generated_options:
-        opt.image_url = resolve_url(opt.image_url)
+        fields.append((opt, "image_url"))
+        add_variants(opt.variants)
     if state.current_image:
-        state.current_image = resolve_url(state.current_image)
+        fields.append((state, "current_image"))
     for rev in state.revision_history:
-        rev.base_image_url = resolve_url(rev.base_image_url)
-        rev.revised_image_url = resolve_url(rev.revised_image_url)
+        fields.extend([(rev, "base_image_url"), (rev, "revised_image_url")])
+        add_variants(rev.variants)
+
+    urls = await presign_batch([getattr(model, name) for model, name in fields])
+    for (model, name), url in zip(fields, urls, strict=True):
+        setattr(model, name, url)
 
 
 # --- Project lifecycle ---
@@ -329,7 +354,7 @@ async def get_project_state(project_id: str, request: Request):
     state = await _resolve_state(request, project_id)
     if state is None:
         return _error(404, *_NOT_FOUND)
-    _presign_image_urls(state)
+    await _presign_image_urls(state)
     return state
 
 
@@ -359,6 +384,254 @@ async def delete_project(project_id: str, request: Request):
 # --- Photo upload ---
 
 
+@dataclass
+class _StagedPhoto:
+    """An uploaded photo whose R2 PUT may still be in flight during validation."""
+
+    photo: PhotoData
+    image_data: bytes
+    content_type: str
+    upload_task: asyncio.Task[str] | None
+    variants_task: asyncio.Task[dict[str, bytes] | None] | None = None
+    duplicate_of: str | None = None
+
+
+async def _read_photo_bytes(file: UploadFile) -> bytes | None:
+    """Read an upload in one bounded call. Returns None if it exceeds MAX_PHOTO_BYTES.
+
+    Starlette has already spooled the multipart body to a temp file, so the
+    recorded size rejects oversize uploads without reading them, and a single
+    read avoids the chunk list + join copy.
+    """
+    if file.size is not None and file.size > MAX_PHOTO_BYTES:
+        return None
+    image_data = await file.read(MAX_PHOTO_BYTES + 1)
+    if len(image_data) > MAX_PHOTO_BYTES:
+        return None
+    return image_data
+
+
+def _image_pool_busy(retry_after_seconds: int) -> JSONResponse:
+    """503 + Retry-After when the image process pool is at its admission limit."""
+    resp = _error(
+        503,
+        "image_pool_busy",
+        "Too many photos are being processed, please retry shortly",
+        retryable=True,
+    )
+    resp.headers["Retry-After"] = str(retry_after_seconds)
+    return resp
+
+
+def _file_too_large() -> JSONResponse:
+    mb = MAX_PHOTO_BYTES // (1024 * 1024)
+    return _error(413, "file_too_large", f"Photo exceeds {mb} MB limit")
+
+
+def _stage_photo(
+    project_id: str,
+    image_data: bytes,
+    photo_type: Literal["room", "inspiration"],
+    content_type: str | None,
+    note: str | None = None,
+) -> _StagedPhoto:
+    """Assign a photo_id/storage key and start the R2 PUT speculatively.
+
+    Most uploads pass validation, so the object is written and its delivery
+    variants are rendered while validation runs; the object is deleted and
+    the render dropped if the photo is rejected.
+    """
+    photo_id = str(uuid.uuid4())
+    photo = PhotoData(
+        photo_id=photo_id,
+        storage_key=f"projects/{project_id}/photos/{photo_type}_{photo_id}.jpg",
+        photo_type=photo_type,
+        note=note,
+    )
+    content_type = content_type or "image/jpeg"
+    staged = _StagedPhoto(photo, image_data, content_type, upload_task=None)
+    if settings.use_temporal and _storage_configured():
+        from app.utils.r2_async import upload_object
+
+        staged.upload_task = asyncio.create_task(
+            upload_object(photo.storage_key, image_data, content_type)
+        )
+        staged.variants_task = asyncio.create_task(_render_photo_variants(staged, project_id))
+    return staged
+
+
+async def _validate_staged(staged: _StagedPhoto, project_id: str) -> ValidatePhotoOutput:
+    """Validate a staged photo; discards its speculative upload if rejected."""
+    try:
+        validation = await validate_photo(
+            ValidatePhotoInput(image_data=staged.image_data, photo_type=staged.photo.photo_type),
+        )
+    except BaseException:
+        await _discard_speculative_upload(staged, project_id)
+        raise
+    staged.photo.perceptual_hash = validation.perceptual_hash
+    if not validation.passed:
+        await _discard_speculative_upload(staged, project_id)
+    return validation
+
+
+async def _reject_if_duplicate(
+    staged: _StagedPhoto,
+    validation: ValidatePhotoOutput,
+    photos: list[PhotoData],
+    project_id: str,
+) -> ValidatePhotoOutput:
+    """Reject a passing photo that nearly matches one of ``photos``.
+
+    Near-duplicates would take an input-image slot and repeat the same
+    pixels in every downstream vision call, so they are never added.
+    """
+    if not validation.passed:
+        return validation
+    duplicate = find_near_duplicate(staged.photo.perceptual_hash, photos)
+    if duplicate is None:
+        return validation
+    staged.duplicate_of = duplicate.photo_id
+    await _discard_speculative_upload(staged, project_id)
+    logger.info(
+        "photo_near_duplicate",
+        project_id=project_id,
+        photo_id=staged.photo.photo_id,
+        duplicate_of=duplicate.photo_id,
+    )
+    message = (
+        "You've already added this inspiration photo. Please choose a different image."
+        if staged.photo.photo_type == "inspiration"
+        else "This photo looks almost identical to one you've already added. "
+        "Please take one from a different angle."
+    )
+    return ValidatePhotoOutput(
+        passed=False,
+        failures=["duplicate_photo"],
+        messages=[message],
+        perceptual_hash=validation.perceptual_hash,
+    )
+
+
+async def _await_stored(staged: _StagedPhoto, project_id: str) -> None:
+    """Wait for the staged photo's R2 PUT; re-raises (and logs) upload failures.
+
+    If the PUT fails (or the wait is cancelled), the variant render started
+    with it is dropped, since it will never be uploaded.
+    """
+    if staged.upload_task is None:
+        logger.warning(
+            "storage_not_configured_skipping_upload",
+            storage_key=staged.photo.storage_key,
+            project_id=project_id,
+        )
+        return
+    stored = False
+    try:
+        await staged.upload_task
+        stored = True
+    except Exception:
+        logger.exception(
+            "r2_upload_failed",
+            storage_key=staged.photo.storage_key,
+            project_id=project_id,
+            content_type=staged.content_type,
+            size_bytes=len(staged.image_data),
+        )
+        raise
+    finally:
+        if not stored:
+            await _drop_variants(staged)
+
+
+async def _render_photo_variants(staged: _StagedPhoto, project_id: str) -> dict[str, bytes] | None:
+    """Render the photo's delivery variants in the image pool; None on failure."""
+    from app.utils.image_variants import render_variants_from_bytes
+
+    try:
+        return await get_image_pool().run(render_variants_from_bytes, staged.image_data)
+    except Exception:
+        logger.warning(
+            "photo_variants_failed",
+            storage_key=staged.photo.storage_key,
+            project_id=project_id,
+            exc_info=True,
+        )
+        return None
+
+
+async def _drop_variants(staged: _StagedPhoto) -> None:
+    """Cancel the staged photo's variant render and wait for it to settle."""
+    if staged.variants_task is not None:
+        staged.variants_task.cancel()
+        await asyncio.wait([staged.variants_task])
+
+
+async def _store_photo_variants(staged: _StagedPhoto, project_id: str) -> None:
+    """Upload the photo's delivery variants once they are rendered; best-effort.
+
+    Runs only after the original landed in R2. The render was started with
+    the upload, so usually only the two small PUTs are left. A saturated pool
+    or a failed upload leaves ``photo.variants`` unset and clients use the
+    original.
+    """
+    if staged.variants_task is None:
+        return
+    from app.utils.image_variants import upload_variants
+
+    rendered = await staged.variants_task
+    if rendered is None:
+        return
+    try:
+        staged.photo.variants = await upload_variants(staged.photo.storage_key, rendered)
+    except Exception:
+        logger.warning(
+            "photo_variants_failed",
+            storage_key=staged.photo.storage_key,
+            project_id=project_id,
+            exc_info=True,
+        )
+
+
+async def _rollback_stored_photo(photo: PhotoData, project_id: str) -> None:
+    """Delete a stored photo and any variants written for it."""
+    keys = [photo.storage_key]
+    if photo.variants is not None:
+        keys += [photo.variants.preview_url, photo.variants.thumbnail_url]
+    await asyncio.gather(*(_delete_r2_object_logged(key, project_id) for key in keys))
+
+
+async def _delete_r2_object_logged(storage_key: str, project_id: str) -> None:
+    """Best-effort R2 delete used for rollbacks; failures are logged, not raised."""
+    from app.utils.r2_async import delete_object
+
+    try:
+        await delete_object(storage_key)
+    except Exception:
+        logger.error(
+            "r2_rollback_failed",
+            storage_key=storage_key,
+            project_id=project_id,
+            exc_info=True,
+        )
+
+
+async def _discard_speculative_upload(staged: _StagedPhoto, project_id: str) -> None:
+    """Wait for a speculative R2 PUT to settle, then delete the object if it landed.
+
+    A PUT already on the wire can land even if the task is cancelled, so it is
+    awaited rather than cancelled — otherwise it could complete after the delete.
+    """
+    await _drop_variants(staged)  # nothing written yet; the render is just dropped
+    if staged.upload_task is None:
+        return
+    try:
+        await asyncio.shield(staged.upload_task)
+    except Exception:
+        return  # nothing was written
+    await _delete_r2_object_logged(staged.photo.storage_key, project_id)
+
+
 @router.post(
     "/projects/{project_id}/photos",
     response_model=PhotoUploadResponse,
@@ -367,6 +640,7 @@ async def delete_project(project_id: str, request: Request):
         409: {"model": ErrorResponse},
         413: {"model": ErrorResponse},
         422: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
     },
 )
 async def upload_photo(
@@ -376,7 +650,7 @@ async def upload_photo(
     photo_type: Literal["room", "inspiration"] = Form("room"),
     note: str | None = Form(None),
 ):
-    """Upload photo -> validate -> store (R2 in Temporal mode) -> add to state."""
+    """Upload photo -> validate + store concurrently (R2 in Temporal mode) -> add to state."""
     state = await _resolve_state(request, project_id)
     if err := _check_step(state, ("photos", "scan"), "upload photos"):
         return err
@@ -400,73 +674,35 @@ async def upload_photo(
                 f"Maximum {MAX_INSPIRATION_PHOTOS} inspiration photos",
             )
 
-    # Stream-read with early termination to avoid buffering unbounded uploads
-    chunks: list[bytes] = []
-    total = 0
-    while chunk := await file.read(65_536):
-        total += len(chunk)
-        if total > MAX_PHOTO_BYTES:
-            mb = MAX_PHOTO_BYTES // (1024 * 1024)
-            return _error(413, "file_too_large", f"Photo exceeds {mb} MB limit")
-        chunks.append(chunk)
-    image_data = b"".join(chunks)
-
-    validation = await asyncio.to_thread(
-        validate_photo,
-        ValidatePhotoInput(image_data=image_data, photo_type=photo_type),
-    )
+    image_data = await _read_photo_bytes(file)
+    if image_data is None:
+        return _file_too_large()
 
-    photo_id = str(uuid.uuid4())
+    # Shed load before any R2 write when validation couldn't be admitted anyway
+    image_pool = get_image_pool()
+    if not image_pool.has_capacity(POOL_TASKS_PER_PHOTO):
+        return _image_pool_busy(image_pool.retry_after_seconds)
 
-    if validation.passed:
-        storage_key = f"projects/{project_id}/photos/{photo_type}_{photo_id}.jpg"
-        photo = PhotoData(
-            photo_id=photo_id,
-            storage_key=storage_key,
-            photo_type=photo_type,
-            note=note,
-        )
+    staged = _stage_photo(project_id, image_data, photo_type, file.content_type, note)
+    photo = staged.photo
+    try:
+        validation = await _validate_staged(staged, project_id)
+    except ImagePoolSaturatedError as exc:
+        return _image_pool_busy(exc.retry_after_seconds)
+    validation = await _reject_if_duplicate(staged, validation, state.photos, project_id)
 
+    if validation.passed:
         if settings.use_temporal:
             from app.workflows.design_project import DesignProjectWorkflow
 
-            if _r2_configured():
-                from app.utils.r2 import delete_object, upload_object
-
-                content_type = file.content_type or "image/jpeg"
-                try:
-                    await asyncio.to_thread(upload_object, storage_key, image_data, content_type)
-                except Exception:
-                    logger.exception(
-                        "r2_upload_failed",
-                        storage_key=storage_key,
-                        project_id=project_id,
-                        content_type=content_type,
-                        size_bytes=len(image_data),
-                    )
-                    raise
-            else:
-                logger.warning(
-                    "r2_not_configured_skipping_upload",
-                    storage_key=storage_key,
-                    project_id=project_id,
-                )
+            await _await_stored(staged, project_id)
+            await _store_photo_variants(staged, project_id)
             if err := await _signal_workflow(
                 request, project_id, DesignProjectWorkflow.add_photo, photo
             ):
-                if _r2_configured():
-                    # Rollback: remove orphaned R2 object if signal failed
-                    from app.utils.r2 import delete_object
-
-                    try:
-                        await asyncio.to_thread(delete_object, storage_key)
-                    except Exception:
-                        logger.error(
-                            "r2_rollback_failed",
-                            storage_key=storage_key,
-                            project_id=project_id,
-                            exc_info=True,
-                        )
+                if staged.upload_task is not None:
+                    # Rollback: remove orphaned R2 objects if signal failed
+                    await _rollback_stored_photo(photo, project_id)
                 return err
         else:
             state.photos.append(photo)
@@ -474,13 +710,150 @@ async def upload_photo(
     logger.info(
         "photo_uploaded",
         project_id=project_id,
-        photo_id=photo_id,
+        photo_id=photo.photo_id,
         photo_type=photo_type,
         passed=validation.passed,
         failures=validation.failures,
         size_bytes=len(image_data),
     )
-    return PhotoUploadResponse(photo_id=photo_id, validation=validation)
+    return PhotoUploadResponse(
+        photo_id=photo.photo_id, validation=validation, duplicate_of=staged.duplicate_of
+    )
+
+
+@router.post(
+    "/projects/{project_id}/photos/batch",
+    response_model=BatchPhotoUploadResponse,
+    responses={
+        404: {"model": ErrorResponse},
+        409: {"model": ErrorResponse},
+        413: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
+)
+async def upload_photos_batch(
+    project_id: str,
+    request: Request,
+    files: list[UploadFile],
+    photo_types: Annotated[list[Literal["room", "inspiration"]], Form()],
+):
+    """Upload several photos in one request -> validate + store in parallel -> one signal.
+
+    ``photo_types`` is a repeated form field aligned with ``files``. Results
+    are returned in upload order; rejected photos are reported but not added.
+    Notes can be attached afterwards via PATCH .../photos/{photo_id}/note.
+    """
+    state = await _resolve_state(request, project_id)
+    if err := _check_step(state, ("photos", "scan"), "upload photos"):
+        return err
+    assert state is not None
+
+    if len(photo_types) != len(files):
+        return _error(422, "photo_types_mismatch", "Provide exactly one photo_types value per file")
+    if len(files) > MAX_BATCH_PHOTOS:
+        return _error(422, "too_many_photos", f"Maximum {MAX_BATCH_PHOTOS} photos per batch upload")
+
+    # PHOTO-10: existing + new inspiration photos must fit the limit
+    inspo_count = sum(1 for p in state.photos if p.photo_type == "inspiration")
+    if inspo_count + photo_types.count("inspiration") > MAX_INSPIRATION_PHOTOS:
+        return _error(
+            422,
+            "too_many_inspiration_photos",
+            f"Maximum {MAX_INSPIRATION_PHOTOS} inspiration photos",
+        )
+
+    # Read everything before staging so an oversize file starts no R2 writes
+    payloads: list[bytes] = []
+    for file in files:
+        image_data = await _read_photo_bytes(file)
+        if image_data is None:
+            return _file_too_large()
+        payloads.append(image_data)
+
+    # The whole batch must fit, or one photo would be shed after the rest did all their work
+    image_pool = get_image_pool()
+    if not image_pool.has_capacity(POOL_TASKS_PER_PHOTO * len(files)):
+        return _image_pool_busy(image_pool.retry_after_seconds)
+
+    staged = [
+        _stage_photo(project_id, data, photo_type, file.content_type)
+        for data, photo_type, file in zip(payloads, photo_types, files, strict=True)
+    ]
+    outcomes = await asyncio.gather(
+        *(_validate_staged(s, project_id) for s in staged), return_exceptions=True
+    )
+    errors = [o for o in outcomes if isinstance(o, BaseException)]
+    if errors:
+        # The batch is all-or-nothing: drop the photos that did pass, too
+        await asyncio.gather(
+            *(
+                _discard_speculative_upload(s, project_id)
+                for s, o in zip(staged, outcomes, strict=True)
+                if isinstance(o, ValidatePhotoOutput) and o.passed
+            )
+        )
+        for exc in errors:
+            if not isinstance(exc, ImagePoolSaturatedError):
+                raise exc
+        return _image_pool_busy(image_pool.retry_after_seconds)
+    # Compare against the project's photos and earlier photos of this batch
+    known = list(state.photos)
+    validations: list[ValidatePhotoOutput] = []
+    for s, o in zip(staged, outcomes, strict=True):
+        assert isinstance(o, ValidatePhotoOutput)
+        v = await _reject_if_duplicate(s, o, known, project_id)
+        if v.passed:
+            known.append(s.photo)
+        validations.append(v)
+    accepted = [s for s, v in zip(staged, validations, strict=True) if v.passed]
+
+    if accepted:
+        if settings.use_temporal:
+            from app.workflows.design_project import DesignProjectWorkflow
+
+            stored = await asyncio.gather(
+                *(_await_stored(s, project_id) for s in accepted), return_exceptions=True
+            )
+            failed = [r for r in stored if isinstance(r, BaseException)]
+            if failed:
+                # All-or-nothing: don't leave the successful PUTs orphaned
+                for s, r in zip(accepted, stored, strict=True):
+                    if not isinstance(r, BaseException) and s.upload_task is not None:
+                        await _drop_variants(s)
+                        await _delete_r2_object_logged(s.photo.storage_key, project_id)
+                raise failed[0]
+            await asyncio.gather(*(_store_photo_variants(s, project_id) for s in accepted))
+            if err := await _signal_workflow(
+                request, project_id, DesignProjectWorkflow.add_photos, [s.photo for s in accepted]
+            ):
+                await asyncio.gather(
+                    *(
+                        _rollback_stored_photo(s.photo, project_id)
+                        for s in accepted
+                        if s.upload_task is not None
+                    )
+                )
+                return err
+        else:
+            state.photos.extend(s.photo for s in accepted)
+
+    logger.info(
+        "photos_uploaded_batch",
+        project_id=project_id,
+        photo_count=len(staged),
+        accepted_count=len(accepted),
+        photo_ids=[s.photo.photo_id for s in staged],
+        size_bytes=sum(len(p) for p in payloads),
+    )
+    return BatchPhotoUploadResponse(
+        photos=[
+            PhotoUploadResponse(
+                photo_id=s.photo.photo_id, validation=v, duplicate_of=s.duplicate_of
+            )
+            for s, v in zip(staged, validations, strict=True)
+        ]
+    )
 
 
 # --- Photo delete ---
@@ -821,15 +1194,15 @@ async def stream_intake_message(project_id: str, body: IntakeMessageRequest, req
         _prepare_intake_call,
         _stream_intake_sse,
     )
-    from app.utils.r2 import generate_presigned_url
+    from app.utils.r2 import presign_batch
 
     inspiration_photos = [p for p in state.photos if p.photo_type == "inspiration"]
     room_keys = [p.storage_key for p in state.photos if p.photo_type == "room"]
     inspo_keys = [p.storage_key for p in inspiration_photos]
 
     try:
-        room_urls = [await asyncio.to_thread(generate_presigned_url, k) for k in room_keys]
-        inspo_urls = [await asyncio.to_thread(generate_presigned_url, k) for k in inspo_keys]
+        urls = await presign_batch(room_keys + inspo_keys)
+        room_urls, inspo_urls = urls[: len(room_keys)], urls[len(room_keys) :]
     except Exception:
         logger.exception("presign_error_stream", project_id=project_id)
         return _error(500, "presign_error", "Failed to prepare photos", retryable=True)
@@ -940,6 +1313,7 @@ async def stream_shopping(project_id: str, request: Request):
         revision_history=state.revision_history,
         room_dimensions=state.scan_data.room_dimensions if state.scan_data else None,
         room_context=state.room_context,
+        project_id=project_id,
     )
 
     from app.activities.shopping import generate_shopping_list_streaming
@@ -1066,15 +1440,15 @@ async def _real_intake_message(
 
     # photo_index must match the index within inspiration_photos (not all photos),
     # since T3's build_messages enumerates inspiration_photo_urls with its own index.
-    from app.utils.r2 import generate_presigned_url
+    from app.utils.r2 import presign_batch
 
     inspiration_photos = [p for p in state.photos if p.photo_type == "inspiration"]
     room_keys = [p.storage_key for p in state.photos if p.photo_type == "room"]
     inspo_keys = [p.storage_key for p in inspiration_photos]
 
     # Convert storage keys to pre-signed HTTPS URLs for the Claude vision API
-    room_urls = [await asyncio.to_thread(generate_presigned_url, k) for k in room_keys]
-    inspo_urls = [await asyncio.to_thread(generate_presigned_url, k) for k in inspo_keys]
+    urls = await presign_batch(room_keys + inspo_keys)
+    room_urls, inspo_urls = urls[: len(room_keys)], urls[len(room_keys) :]
 
     project_context: dict = {
         "room_photos": room_urls,
@@ -0,0 +1,53 @@
+"""Signed object downloads for the local storage backend.
+
+With ``STORAGE_BACKEND=local`` the URLs handed out by ``resolve_url`` point
+here instead of at R2: ``/api/v1/storage/{key}?expires=...&signature=...``.
+The route checks the HMAC and expiry the way R2 checks a presigned URL and
+serves the file with its ETag. With the R2 backend it always answers 404.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+
+from fastapi import APIRouter, Query, Response
+from fastapi.responses import FileResponse, JSONResponse
+
+from app.config import settings
+from app.models.contracts import ErrorResponse
+
+router = APIRouter(tags=["storage"])
+
+
+def _error(status: int, code: str, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content=ErrorResponse(error=code, message=message, retryable=False).model_dump(),
+    )
+
+
+@router.get(
+    "/storage/{key:path}",
+    response_class=FileResponse,
+    responses={403: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+)
+async def get_stored_object(
+    key: str,
+    expires: int = Query(...),
+    signature: str = Query(...),
+) -> Response:
+    """Serve an object from the local storage backend behind a signed URL."""
+    from app.utils.storage import get_local_backend, verify_url_signature
+
+    if settings.storage_backend != "local":
+        return _error(404, "not_found", "Local storage is not enabled")
+    if not verify_url_signature(key, expires, signature):
+        return _error(403, "invalid_signature", "URL signature is invalid or expired")
+    try:
+        path = get_local_backend().path_for(key)
+    except ValueError:
+        return _error(404, "not_found", "Object not found")
+    if not path.is_file():
+        return _error(404, "not_found", "Object not found")
+    media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+    return FileResponse(path, media_type=media_type)
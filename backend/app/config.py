@@ -23,6 +23,30 @@ class Settings(BaseSettings):
     r2_access_key_id: str = ""
     r2_secret_access_key: str = ""
     r2_bucket_name: str = "remo-images"
+    r2_endpoint_url: str = ""  # override, e.g. a local S3-compatible server for benchmarks
+    r2_max_connections: int = 32  # async client keep-alive pool size per process
+    r2_purge_concurrency: int = 8  # in-flight list/delete requests per bulk purge
+
+    # Storage backend: "r2", or "local" (filesystem + API-served signed URLs)
+    storage_backend: str = "r2"
+    local_storage_dir: str = ""  # default: <tmp>/remo-storage
+    local_storage_base_url: str = "http://localhost:8000"  # where iOS/workers reach the API
+    local_storage_signing_key: str = "local-dev-signing-key"
+
+    # Worker read-through cache for R2 objects (photos, chat history)
+    object_cache_dir: str = ""  # default: <tmp>/remo-object-cache
+    object_cache_memory_bytes: int = 64 * 1024 * 1024
+    object_cache_disk_bytes: int = 1024 * 1024 * 1024  # 0 = memory only
+
+    # Shared outbound HTTP clients (image downloads, Exa), per client per process
+    http_max_connections: int = 64
+    http_max_keepalive_connections: int = 32
+    http_keepalive_expiry_seconds: float = 60.0
+    http2_enabled: bool = True  # needs the h2 package (httpx[http2])
+
+    # Activity image reads (app.utils.http)
+    image_read_concurrency: int = 8  # storage-key reads in flight per download_images call
+    image_download_max_bytes: int = 25 * 1024 * 1024
 
     # AI APIs
     anthropic_api_key: str = ""
@@ -30,6 +54,22 @@ class Settings(BaseSettings):
     vertex_ai_api_key: str = ""
     exa_api_key: str = ""
     gemini_model: str = "gemini-3-pro-image-preview"
+    gemini_max_concurrency: int = 8  # in-flight Gemini image requests per worker process
+    gemini_timeout_seconds: float = 150.0
+
+    # Photo validation verdict cache
+    validation_cache_max_entries: int = 2048
+    validation_cache_ttl_seconds: int = 7 * 24 * 3600
+    validation_cache_persist: bool = False  # also store verdicts in Postgres
+
+    # Image work process pool (API process); 0 workers = default thread pool
+    image_pool_workers: int = 2
+    image_pool_max_pending: int = 16  # queued + running image tasks before 503
+    image_pool_retry_after_seconds: int = 2
+
+    # Generated option / revision encoding: "webp", "jpeg" or "png" (lossless)
+    output_image_format: str = "webp"
+    output_image_quality: int = 90  # WebP/JPEG quality, 1-100
 
     # Eval
     eval_mode: str = "off"  # "off", "fast", "full"
@@ -39,6 +79,7 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     log_file: str = ""
     presigned_url_expiry_seconds: int = 3600
+    presign_cache_max_entries: int = 10_000  # resolve_url reuses URLs per storage key
     use_mock_activities: bool = True
     use_temporal: bool = False
 
@@ -8,9 +8,14 @@ from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
-from app.api.routes import health, projects
+from app.activities.validation import close_verdict_store
+from app.api.routes import health, projects, storage
 from app.config import settings
 from app.logging import configure_logging
+from app.utils.http_pool import close_clients as close_http_clients
+from app.utils.http_pool import open_clients as open_http_clients
+from app.utils.image_pool import get_image_pool, shutdown_image_pool
+from app.utils.r2_async import close_client as close_r2_client
 
 configure_logging()
 
@@ -37,7 +42,14 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
             address=settings.temporal_address,
             namespace=settings.temporal_namespace,
         )
+    # Spawn image workers now rather than on the first upload (~1s of spawn + imports)
+    await get_image_pool().warm_up(preload=("app.activities.validation",))
+    open_http_clients()
     yield
+    await close_verdict_store()
+    await close_r2_client()
+    await close_http_clients()
+    shutdown_image_pool()
 
 
 app = FastAPI(
@@ -138,3 +150,4 @@ async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONR
 
 app.include_router(health.router)
 app.include_router(projects.router, prefix="/api/v1")
+app.include_router(storage.router, prefix="/api/v1")
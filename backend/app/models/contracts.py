@@ -148,9 +148,17 @@ class AnnotationRegion(BaseModel):
     constraints: list[str] = []
 
 
+class ImageVariants(BaseModel):
+    """Downscaled JPEG copies of a stored image (storage keys; presigned in responses)."""
+
+    preview_url: str
+    thumbnail_url: str
+
+
 class DesignOption(BaseModel):
     image_url: str
     caption: str
+    variants: ImageVariants | None = None
 
 
 class ProductMatch(BaseModel):
@@ -195,6 +203,7 @@ class RevisionRecord(BaseModel):
     base_image_url: str
     revised_image_url: str
     instructions: list[str] = []
+    variants: ImageVariants | None = None  # of revised_image_url
 
 
 # === Photo Data ===
@@ -205,6 +214,8 @@ class PhotoData(BaseModel):
     storage_key: str
     photo_type: Literal["room", "inspiration"]
     note: str | None = None
+    perceptual_hash: str | None = None  # dHash from upload validation (near-duplicate check)
+    variants: ImageVariants | None = None
 
 
 class ScanData(BaseModel):
@@ -315,6 +326,7 @@ class EditDesignInput(BaseModel):
 class EditDesignOutput(BaseModel):
     revised_image_url: str
     chat_history_key: str
+    revised_image_variants: ImageVariants | None = None
 
 
 class GenerateShoppingListInput(BaseModel):
@@ -324,6 +336,8 @@ class GenerateShoppingListInput(BaseModel):
     revision_history: list[RevisionRecord] = []
     room_dimensions: RoomDimensions | None = None
     room_context: RoomContext | None = None
+    # Trace grouping only; edited designs live under blobs/, not the project prefix
+    project_id: str = ""
 
 
 class GenerateShoppingListOutput(BaseModel):
@@ -387,6 +401,18 @@ class ValidatePhotoOutput(BaseModel):
     passed: bool
     failures: list[str]
     messages: list[str]
+    perceptual_hash: str | None = None
+
+
+class PurgeProjectsInput(BaseModel):
+    project_ids: list[str] = Field(min_length=1)
+
+
+class PurgeProjectsOutput(BaseModel):
+    projects: int
+    objects_deleted: int
+    objects_failed: int
+    objects_per_second: float
 
 
 # === Workflow State (returned by query) ===
@@ -426,6 +452,11 @@ class CreateProjectResponse(BaseModel):
 class PhotoUploadResponse(BaseModel):
     photo_id: str
     validation: ValidatePhotoOutput
+    duplicate_of: str | None = None  # photo_id of the near-identical photo already added
+
+
+class BatchPhotoUploadResponse(BaseModel):
+    photos: list[PhotoUploadResponse]  # same order as the uploaded files
 
 
 class IntakeStartRequest(BaseModel):
@@ -0,0 +1,180 @@
+"""Content-addressed blob store for images shared across projects and turns.
+
+The same image bytes used to be written again and again: every continuation
+turn re-uploaded the room photos inlined (base64) in the chat history JSON,
+and a retried edit uploaded an identical revision under a fresh key. Blobs
+are stored once under the SHA-256 of their bytes and referenced by key
+thereafter; a second ``put_blob`` of the same bytes writes nothing.
+
+Layout:
+
+    blobs/{sha256}.{ext}                        the bytes, written once
+    blobs/{sha256}.{variant}.jpg                delivery variants (r2.variant_key)
+    blob-refs/{sha256}/{project_id}             one empty marker per referencing project
+    projects/{project_id}/blob-refs/{sha256}    the same reference, found at purge
+
+Blobs live outside the project prefix, so purging a project releases its
+references first (``release_project_blobs``): each of its markers is
+removed (both sides), and a blob with no remaining marker is deleted
+together with its variants. ``put_blob`` writes the blob-side marker before checking for the
+bytes and the project-side marker last, so a reference is only recorded
+once the bytes it points to exist. A purge racing a new reference from
+another project to the same bytes can still delete them in between; purges
+only run on finished or abandoned projects, so this is accepted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import mimetypes
+
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+BLOB_PREFIX = "blobs/"
+BLOB_REFS_PREFIX = "blob-refs/"
+
+# (project_id, digest) references this process has already recorded
+_known_refs: set[tuple[str, str]] = set()
+_stats = {"uploads": 0, "dedup_hits": 0, "bytes_uploaded": 0, "bytes_deduplicated": 0}
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def blob_key(data: bytes, content_type: str) -> str:
+    """Storage key the bytes are stored under: ``blobs/{sha256}.{ext}``."""
+    extension = (mimetypes.guess_extension(content_type) or ".bin").lstrip(".")
+    return f"{BLOB_PREFIX}{content_digest(data)}.{extension}"
+
+
+def _digest_of(key: str) -> str:
+    return key.removeprefix(BLOB_PREFIX).split(".", 1)[0]
+
+
+def _project_refs_prefix(project_id: str) -> str:
+    return f"projects/{project_id}/{BLOB_REFS_PREFIX}"
+
+
+async def put_blob(
+    project_id: str,
+    data: bytes,
+    content_type: str,
+    key: str | None = None,
+    *,
+    assume_new: bool = False,
+) -> str:
+    """Store bytes once under their content hash and record the project's reference.
+
+    ``key`` may be passed when the caller already computed ``blob_key``.
+    Returns the blob's storage key. Bytes already stored — by this project
+    or any other — are not uploaded again.
+
+    Deduplicating costs two HEAD probes on top of the three PUTs. Callers
+    whose bytes are almost never stored yet (a freshly generated revision)
+    pass ``assume_new=True`` to skip the probes; a rare duplicate is then
+    rewritten with identical bytes, which is harmless for a content key.
+    """
+    from app.utils import object_cache
+    from app.utils.r2_async import head_object
+    from app.utils.storage import get_backend
+
+    key = key or blob_key(data, content_type)
+    digest = _digest_of(key)
+    project_ref = f"{_project_refs_prefix(project_id)}{digest}"
+    known = (project_id, digest) in _known_refs
+    if known or (not assume_new and await head_object(project_ref)):
+        _known_refs.add((project_id, digest))
+        _count(deduplicated=True, size=len(data))
+        return key
+
+    backend = get_backend()
+    await backend.put_object(f"{BLOB_REFS_PREFIX}{digest}/{project_id}", b"", "text/plain")
+    exists = not assume_new and await head_object(key)
+    if not exists:
+        # Write-through: the next turn's read on this worker is served locally
+        await object_cache.put_object(key, data, content_type)
+    await backend.put_object(project_ref, b"", "text/plain")
+    _known_refs.add((project_id, digest))
+    _count(deduplicated=exists, size=len(data))
+    logger.info("blob_stored", key=key, project_id=project_id, deduplicated=exists)
+    return key
+
+
+async def get_blob(key: str) -> bytes:
+    """Read a blob through the object cache. Raises ClientError ("NoSuchKey") if missing."""
+    from app.utils.object_cache import get_object
+
+    return await get_object(key)
+
+
+async def release_project_blobs(project_ids: list[str]) -> int:
+    """Drop the projects' blob references and delete blobs nothing references.
+
+    Must run before the project prefixes are deleted (the project-side
+    markers are how a project's blobs are found). Returns the number of
+    objects deleted (blobs and their variants).
+    """
+    from app.utils.r2_async import delete_prefixes, task_group
+    from app.utils.storage import get_backend
+
+    backend = get_backend()
+    limit = asyncio.Semaphore(settings.r2_purge_concurrency)
+    orphaned: set[str] = set()
+
+    async def release(project_id: str, digest: str) -> None:
+        async with limit:
+            await backend.delete_object(f"{BLOB_REFS_PREFIX}{digest}/{project_id}")
+            # put_blob skips the write while this marker exists, so it must go too
+            await backend.delete_object(f"{_project_refs_prefix(project_id)}{digest}")
+            remaining, _token = await backend.list_objects(f"{BLOB_REFS_PREFIX}{digest}/")
+        _known_refs.discard((project_id, digest))
+        if not remaining:
+            orphaned.add(digest)
+
+    async def release_all(project_id: str, tasks: asyncio.TaskGroup) -> None:
+        prefix = _project_refs_prefix(project_id)
+        token: str | None = None
+        while True:
+            async with limit:
+                keys, token = await backend.list_objects(prefix, token)
+            for ref in keys:
+                tasks.create_task(release(project_id, ref.removeprefix(prefix)))
+            if token is None:
+                return
+
+    async with task_group() as tasks:
+        for project_id in project_ids:
+            tasks.create_task(release_all(project_id, tasks))
+
+    if not orphaned:
+        return 0
+    report = await delete_prefixes([f"{BLOB_PREFIX}{d}." for d in sorted(orphaned)])
+    logger.info("blobs_released", projects=len(project_ids), orphaned=len(orphaned))
+    return report.deleted
+
+
+def _count(deduplicated: bool, size: int) -> None:
+    if deduplicated:
+        _stats["dedup_hits"] += 1
+        _stats["bytes_deduplicated"] += size
+    else:
+        _stats["uploads"] += 1
+        _stats["bytes_uploaded"] += size
+
+
+def stats() -> dict[str, int]:
+    """Counters suitable for structured log fields."""
+    return dict(_stats)
+
+
+def reset() -> None:
+    """Forget known references and zero the counters (for testing)."""
+    _known_refs.clear()
+    for name in _stats:
+        _stats[name] = 0
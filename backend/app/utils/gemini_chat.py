@@ -9,18 +9,27 @@ persisted R2 state.
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
 import io
 import json
-from typing import Any, cast
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, cast
 
 import structlog
+from botocore.exceptions import ClientError
 from google import genai
 from google.genai import types
 from PIL import Image
 from temporalio.exceptions import ApplicationError
 
 from app.config import settings
+from app.utils.blob_store import blob_key, get_blob, put_blob
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Sequence
 
 logger = structlog.get_logger()
 
@@ -48,25 +57,124 @@ IMAGE_CONFIG = types.GenerateContentConfig(
 
 CHAT_HISTORY_KEY_TEMPLATE = "projects/{project_id}/gemini_chat_history.json"
 
+CHAT_SEGMENT_KEY_TEMPLATE = "projects/{project_id}/gemini_chat_segments/{segment}.json"
+
+# Chat history formats at CHAT_HISTORY_KEY_TEMPLATE (older ones are still read):
+#   legacy  bare JSON list of turns, images inlined as base64
+#   2       {"version": 2, "turns": [...]} manifest; image parts reference
+#           content-addressed binary blobs (app.utils.blob_store) by key
+#   3       {"version": 3, "turns": N, "segments": [{"key", "turns"}, ...]}
+#           append-only index; each segment is {"turns": [...]} as in 2
+HISTORY_FORMAT_VERSION = 3
+# Appends after this many segments rewrite the history as one segment
+CHAT_HISTORY_MAX_SEGMENTS = 8
+
+# Process-wide Gemini clients keyed by API key (see get_client). Each client
+# owns its transport's connection pools, so reusing it keeps connections warm
+# across concurrent options and consecutive edits.
+_clients: dict[str, genai.Client] = {}
+_client_stats = {"created": 0, "reused": 0, "construct_ms": 0}
+
+# Worker-wide cap on in-flight Gemini requests (see gemini_call). Created lazily
+# because an asyncio.Semaphore must be made inside the running event loop.
+_call_slots: asyncio.Semaphore | None = None
+
 
 def get_client() -> genai.Client:
-    """Create a Gemini client using the configured API key."""
+    """Return the shared Gemini client for the configured API key.
+
+    Created (and LangSmith-wrapped) on first use; ``construct_ms`` records how
+    long construction took. That covers building the SDK's transports, not
+    opening connections, which happens lazily on the first request. Do not
+    close it; see close_clients.
+    """
     from app.utils.tracing import wrap_gemini
 
-    if not settings.google_ai_api_key:
+    api_key = settings.google_ai_api_key
+    if not api_key:
         raise ApplicationError("GOOGLE_AI_API_KEY not configured", non_retryable=True)
-    client = genai.Client(api_key=settings.google_ai_api_key)
-    return wrap_gemini(client)  # type: ignore[no-any-return]
+    client = _clients.get(api_key)
+    if client is not None:
+        _client_stats["reused"] += 1
+        return client
+
+    start = time.monotonic()
+    client = cast("genai.Client", wrap_gemini(genai.Client(api_key=api_key)))
+    construct_ms = round((time.monotonic() - start) * 1000)
+    _clients[api_key] = client
+    _client_stats["created"] += 1
+    _client_stats["construct_ms"] += construct_ms
+    logger.info("gemini_client_created", construct_ms=construct_ms, clients=len(_clients))
+    return client
+
+
+def open_client() -> None:
+    """Create the shared client up front (worker startup) if a key is configured."""
+    if settings.google_ai_api_key:
+        get_client()
+
+
+async def close_clients() -> None:
+    """Close the shared clients' connection pools (worker shutdown)."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        # Older google-genai 1.x releases have no explicit close
+        aclose = getattr(client.aio, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    if clients:
+        logger.info("gemini_clients_closed", clients=len(clients), **client_stats())
+
+
+def reset_clients() -> None:
+    """Drop the shared clients without closing them and zero the stats (for testing)."""
+    _clients.clear()
+    _client_stats.update(created=0, reused=0, construct_ms=0)
+
+
+def client_stats() -> dict[str, int]:
+    """Client creations, reuses and total construction time, for structured log fields."""
+    return dict(_client_stats)
+
+
+@asynccontextmanager
+async def gemini_call() -> AsyncIterator[None]:
+    """Hold one of the worker's Gemini slots and bound the call by the timeout.
+
+    Concurrency is ``settings.gemini_max_concurrency`` per process; time spent
+    waiting for a slot does not count against ``settings.gemini_timeout_seconds``.
+    On timeout the in-flight request is cancelled and TimeoutError is raised.
+    """
+    global _call_slots
+    if _call_slots is None:
+        _call_slots = asyncio.Semaphore(settings.gemini_max_concurrency)
+    queued = _call_slots.locked()
+    start = time.monotonic()
+    async with _call_slots:
+        if queued:
+            logger.info("gemini_call_queued", wait_ms=round((time.monotonic() - start) * 1000))
+        async with asyncio.timeout(settings.gemini_timeout_seconds):
+            yield
+
 
+def reset_call_slots() -> None:
+    """Drop the concurrency semaphore so the next call re-reads settings (for testing)."""
+    global _call_slots
+    _call_slots = None
 
-def create_chat(client: genai.Client | None = None) -> genai.chats.Chat:
-    """Create a new Gemini chat session configured for image generation."""
+
+def create_chat(client: genai.Client | None = None) -> genai.chats.AsyncChat:
+    """Create a new async Gemini chat session configured for image generation.
+
+    No request is made until the first ``await chat.send_message(...)``.
+    """
     if client is None:
         client = get_client()
-    return client.chats.create(model=GEMINI_MODEL, config=IMAGE_CONFIG)
+    return client.aio.chats.create(model=GEMINI_MODEL, config=IMAGE_CONFIG)
 
 
-def serialize_history(chat: genai.chats.Chat) -> list[dict[str, Any]]:
+def serialize_history(chat: genai.chats.AsyncChat) -> list[dict[str, Any]]:
     """Serialize a chat's history to a JSON-compatible structure.
 
     Preserves all parts including text, inline images (base64-encoded),
@@ -76,21 +184,30 @@ def serialize_history(chat: genai.chats.Chat) -> list[dict[str, Any]]:
     return _contents_to_serializable(history)
 
 
-def _contents_to_serializable(contents: list[types.Content]) -> list[dict[str, Any]]:
-    """Convert a list of Content objects to JSON-serializable dicts."""
+def _contents_to_serializable(
+    contents: list[types.Content], blobs: dict[str, tuple[bytes, str]] | None = None
+) -> list[dict[str, Any]]:
+    """Convert a list of Content objects to JSON-serializable dicts.
+
+    With ``blobs``, inline images are referenced by blob key instead of
+    inlined as base64, and their bytes are collected into ``blobs``
+    (key -> (data, mime_type)) for the caller to store.
+    """
     serialized = []
     for content in contents:
         turn: dict[str, Any] = {"role": content.role, "parts": []}
         if content.parts:
             for part in content.parts:
-                part_dict = _part_to_dict(part)
+                part_dict = _part_to_dict(part, blobs)
                 if part_dict:
                     turn["parts"].append(part_dict)
         serialized.append(turn)
     return serialized
 
 
-def _part_to_dict(part: types.Part) -> dict[str, Any]:
+def _part_to_dict(
+    part: types.Part, blobs: dict[str, tuple[bytes, str]] | None = None
+) -> dict[str, Any]:
     """Convert a single Part to a JSON-serializable dict."""
     result: dict[str, Any] = {}
 
@@ -98,10 +215,16 @@ def _part_to_dict(part: types.Part) -> dict[str, Any]:
         result["text"] = part.text
 
     if part.inline_data is not None and part.inline_data.data is not None:
-        result["inline_data"] = {
-            "mime_type": part.inline_data.mime_type,
-            "data": base64.b64encode(part.inline_data.data).decode("ascii"),
-        }
+        mime_type = part.inline_data.mime_type
+        if blobs is not None and mime_type:
+            key = blob_key(part.inline_data.data, mime_type)
+            blobs[key] = (part.inline_data.data, mime_type)
+            result["inline_data"] = {"mime_type": mime_type, "blob": key}
+        else:
+            result["inline_data"] = {
+                "mime_type": mime_type,
+                "data": base64.b64encode(part.inline_data.data).decode("ascii"),
+            }
 
     # Preserve thought signatures (critical for Gemini 3 Pro multi-turn)
     if hasattr(part, "thought_signature") and part.thought_signature:
@@ -122,8 +245,14 @@ def _part_to_dict(part: types.Part) -> dict[str, Any]:
     return result
 
 
-def deserialize_to_contents(serialized: list[dict[str, Any]]) -> list[types.Content]:
-    """Reconstruct Content objects from serialized history."""
+def deserialize_to_contents(
+    serialized: list[dict[str, Any]], blobs: dict[str, bytes] | None = None
+) -> list[types.Content]:
+    """Reconstruct Content objects from serialized history.
+
+    ``blobs`` maps the blob keys referenced by image parts to their bytes;
+    histories with base64-inlined images need none.
+    """
     contents = []
     for turn in serialized:
         if not isinstance(turn, dict):
@@ -135,19 +264,30 @@ def deserialize_to_contents(serialized: list[dict[str, Any]]) -> list[types.Cont
             raise ValueError(f"Expected 'parts' to be a list, got {type(turn['parts']).__name__}")
         parts = []
         for p in turn["parts"]:
-            part = _dict_to_part(p)
+            part = _dict_to_part(p, blobs)
             parts.append(part)
         contents.append(types.Content(role=turn["role"], parts=parts))
     return contents
 
 
-def _dict_to_part(data: dict[str, Any]) -> types.Part:
+def _dict_to_part(data: dict[str, Any], blobs: dict[str, bytes] | None = None) -> types.Part:
     """Reconstruct a Part from a serialized dict."""
     if "inline_data" in data:
         inline = data["inline_data"]
-        if not isinstance(inline, dict) or "data" not in inline or "mime_type" not in inline:
-            raise ValueError("Invalid inline_data structure: requires 'data' and 'mime_type'")
-        image_bytes = base64.b64decode(inline["data"])
+        if (
+            not isinstance(inline, dict)
+            or ("data" not in inline and "blob" not in inline)
+            or "mime_type" not in inline
+        ):
+            raise ValueError(
+                "Invalid inline_data structure: requires 'data' or 'blob', and 'mime_type'"
+            )
+        if "blob" in inline:
+            if blobs is None or inline["blob"] not in blobs:
+                raise ValueError(f"Image blob not loaded: {inline['blob']}")
+            image_bytes = blobs[inline["blob"]]
+        else:
+            image_bytes = base64.b64decode(inline["data"])
         part = types.Part.from_bytes(
             data=image_bytes,
             mime_type=inline["mime_type"],
@@ -168,116 +308,269 @@ def _dict_to_part(data: dict[str, Any]) -> types.Part:
     return part
 
 
-def serialize_to_r2(chat: genai.chats.Chat, project_id: str) -> str:
+async def serialize_to_r2(chat: genai.chats.AsyncChat, project_id: str) -> str:
     """Serialize chat history and upload to R2.
 
     Returns the R2 storage key for the history file.
     """
-    from app.utils.r2 import upload_object
-
-    serialized = serialize_history(chat)
-    json_bytes = json.dumps(serialized).encode("utf-8")
-    key = CHAT_HISTORY_KEY_TEMPLATE.format(project_id=project_id)
-    upload_object(key, json_bytes, content_type="application/json")
-
-    logger.info(
-        "gemini_chat_serialized",
-        project_id=project_id,
-        key=key,
-        turns=len(serialized),
-        size_bytes=len(json_bytes),
-    )
-    return key
+    return await serialize_contents_to_r2(chat.get_history(), project_id)
 
 
-def serialize_contents_to_r2(contents: list[types.Content], project_id: str) -> str:
+async def serialize_contents_to_r2(
+    contents: list[types.Content], project_id: str, persisted_turns: int | None = None
+) -> str:
     """Serialize a contents list and upload to R2.
 
     Unlike serialize_to_r2 (which takes a Chat), this takes raw Content objects.
     Useful when updating history from restored contents + new turns.
 
-    Returns the R2 storage key.
+    History is append-only: ``persisted_turns`` is how many leading turns of
+    ``contents`` were restored from R2. When the stored index still ends
+    there, only the turns after it are written, as one new segment, and the
+    index is updated to reference it. Otherwise — first write, a legacy
+    history, a stale index, or ``CHAT_HISTORY_MAX_SEGMENTS`` reached — the
+    whole history is written as a single segment (compaction).
+
+    Inline images go to the content-addressed blob store as binary objects
+    and segments only reference them, so images already stored by an earlier
+    turn (the room photos, every turn) are not uploaded again.
+
+    Returns the R2 storage key of the history index.
     """
-    from app.utils.r2 import upload_object
+    from app.utils.object_cache import put_object
 
-    serialized = _contents_to_serializable(contents)
-    json_bytes = json.dumps(serialized).encode("utf-8")
     key = CHAT_HISTORY_KEY_TEMPLATE.format(project_id=project_id)
-    upload_object(key, json_bytes, content_type="application/json")
+    previous = await _load_index(key) if persisted_turns is not None else None
+    segments: list[dict[str, Any]] = []
+    new_turns = contents
+    if (
+        previous is not None
+        and previous["turns"] == persisted_turns
+        and len(previous["segments"]) < CHAT_HISTORY_MAX_SEGMENTS
+    ):
+        segments = list(previous["segments"])
+        new_turns = contents[persisted_turns:]
+
+    # Hashing images and JSON encoding is CPU work — keep it off the loop
+    segment_bytes, blobs = await asyncio.to_thread(_encode_history, new_turns)
+    await asyncio.gather(
+        *(
+            put_blob(project_id, data, mime_type, key=blob)
+            for blob, (data, mime_type) in blobs.items()
+        )
+    )
+    segment_key = CHAT_SEGMENT_KEY_TEMPLATE.format(
+        project_id=project_id,
+        segment=f"{len(segments):04d}-{hashlib.sha256(segment_bytes).hexdigest()[:16]}",
+    )
+    segments.append({"key": segment_key, "turns": len(new_turns)})
+    index_bytes = json.dumps(
+        {"version": HISTORY_FORMAT_VERSION, "turns": len(contents), "segments": segments},
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    # Segment before index: the index only ever references complete segments.
+    # Write-through: the next round's restore on this worker is served locally
+    await put_object(segment_key, segment_bytes, content_type="application/json")
+    await put_object(key, index_bytes, content_type="application/json")
+
+    # A full write over an existing index (compaction, stale index) orphans its segments
+    rewritten = previous is not None and len(segments) == 1
+    if previous is not None and rewritten:
+        await _delete_segments(previous["segments"], keep=segment_key)
 
     logger.info(
         "gemini_chat_serialized",
         project_id=project_id,
         key=key,
-        turns=len(serialized),
-        size_bytes=len(json_bytes),
+        turns=len(contents),
+        turns_written=len(new_turns),
+        segments=len(segments),
+        rewritten=rewritten,
+        size_bytes=len(segment_bytes) + len(index_bytes),
+        blobs=len(blobs),
     )
     return key
 
 
-def restore_from_r2(project_id: str) -> list[types.Content]:
+def _encode_history(
+    contents: list[types.Content],
+) -> tuple[bytes, dict[str, tuple[bytes, str]]]:
+    blobs: dict[str, tuple[bytes, str]] = {}
+    segment = {"turns": _contents_to_serializable(contents, blobs)}
+    return json.dumps(segment, separators=(",", ":")).encode("utf-8"), blobs
+
+
+def _is_segment_ref(ref: Any) -> bool:
+    return (
+        isinstance(ref, dict)
+        and isinstance(ref.get("key"), str)
+        and isinstance(ref.get("turns"), int)
+    )
+
+
+def _parse_index(document: Any) -> dict[str, Any] | None:
+    """The segment index if ``document`` is one; None for older formats."""
+    if not isinstance(document, dict) or document.get("version") != HISTORY_FORMAT_VERSION:
+        return None
+    segments = document.get("segments")
+    if (
+        not isinstance(segments, list)
+        or not all(_is_segment_ref(s) for s in segments)
+        or sum(s["turns"] for s in segments) != document.get("turns")
+    ):
+        raise ValueError("Chat history index requires 'segments' adding up to 'turns'")
+    return document
+
+
+async def _load_index(key: str) -> dict[str, Any] | None:
+    """Current index for an append, or None to write the history in full."""
+    from app.utils.object_cache import get_object
+
+    try:
+        return _parse_index(json.loads(await get_object(key)))
+    except (ClientError, ValueError) as e:
+        # A full write replaces whatever is there, so it is always safe
+        logger.warning("gemini_chat_index_unreadable", key=key, error=str(e))
+        return None
+
+
+async def _delete_segments(segments: list[dict[str, Any]], keep: str) -> None:
+    """Best-effort removal of segments a compacted index no longer references.
+
+    Leftovers live under the project prefix, so purge removes them anyway.
+    """
+    from app.utils.object_cache import delete_object
+
+    results = await asyncio.gather(
+        *(delete_object(s["key"]) for s in segments if s["key"] != keep),
+        return_exceptions=True,
+    )
+    failed = sum(isinstance(r, Exception) for r in results)
+    if failed:
+        logger.warning("gemini_chat_segment_delete_failed", failed=failed)
+
+
+def _history_turns(document: Any) -> list[Any]:
+    """Turns of a single-document history: a v2 manifest / segment or a legacy list."""
+    if isinstance(document, list):
+        return document
+    version = document.get("version") if isinstance(document, dict) else None
+    if version not in (None, 2):
+        raise ValueError(f"Unsupported chat history format version: {version!r}")
+    turns = document.get("turns") if isinstance(document, dict) else None
+    if not isinstance(turns, list):
+        raise ValueError("Chat history document requires a 'turns' list")
+    return turns
+
+
+def _blob_keys(serialized: list[dict[str, Any]]) -> set[str]:
+    """Blob keys referenced by image parts (malformed turns are left to deserialize)."""
+    keys = set()
+    for turn in serialized:
+        parts = turn.get("parts") if isinstance(turn, dict) else None
+        for part in parts if isinstance(parts, list) else []:
+            inline = part.get("inline_data") if isinstance(part, dict) else None
+            if isinstance(inline, dict) and isinstance(inline.get("blob"), str):
+                keys.add(inline["blob"])
+    return keys
+
+
+def _storage_error(e: ClientError, project_id: str, what: str) -> ApplicationError:
+    error_code = e.response.get("Error", {}).get("Code", "Unknown")
+    if error_code in ("NoSuchKey", "404"):
+        return ApplicationError(f"{what} not found for project {project_id}", non_retryable=True)
+    logger.error("r2_chat_history_fetch_failed", project_id=project_id, error_code=error_code)
+    is_client_error = error_code in ("AccessDenied", "InvalidBucketName", "403")
+    return ApplicationError(
+        f"R2 error fetching {what.lower()}: {error_code}",
+        non_retryable=is_client_error,
+    )
+
+
+def _corrupt(project_id: str, e: Exception) -> ApplicationError:
+    logger.error("gemini_chat_json_corrupt", project_id=project_id, error=str(e))
+    return ApplicationError(f"Chat history JSON corrupted for {project_id}", non_retryable=True)
+
+
+def _invalid(project_id: str, e: Exception) -> ApplicationError:
+    logger.error("gemini_chat_deserialization_failed", project_id=project_id, error=str(e))
+    return ApplicationError(f"Chat history data invalid for {project_id}: {e}", non_retryable=True)
+
+
+async def restore_from_r2(project_id: str) -> list[types.Content]:
     """Download and deserialize chat history from R2.
 
-    Returns the contents array ready for generate_content.
+    Reads the segment index and stitches its segments together in order;
+    v2 manifests and legacy JSON (one document holding every turn) are read
+    as they are. Returns the contents array ready for generate_content.
     Raises ApplicationError (non-retryable) if history is missing or corrupted.
     """
-    from botocore.exceptions import ClientError
-
-    from app.utils.r2 import _get_client as get_r2_client
+    from app.utils.object_cache import get_object
 
     key = CHAT_HISTORY_KEY_TEMPLATE.format(project_id=project_id)
-    r2 = get_r2_client()
 
     try:
-        response = r2.get_object(Bucket=settings.r2_bucket_name, Key=key)
-        json_bytes = response["Body"].read()
+        json_bytes = await get_object(key)
     except ClientError as e:
-        error_code = e.response.get("Error", {}).get("Code", "Unknown")
-        if error_code in ("NoSuchKey", "404"):
-            raise ApplicationError(
-                f"Chat history not found for project {project_id}",
-                non_retryable=True,
-            ) from e
-        logger.error("r2_chat_history_fetch_failed", project_id=project_id, error_code=error_code)
-        is_client_error = error_code in ("AccessDenied", "InvalidBucketName", "403")
-        raise ApplicationError(
-            f"R2 error fetching chat history: {error_code}",
-            non_retryable=is_client_error,
-        ) from e
+        raise _storage_error(e, project_id, "Chat history") from e
 
     try:
-        serialized = json.loads(json_bytes)
+        document = await asyncio.to_thread(json.loads, json_bytes)
     except json.JSONDecodeError as e:
-        logger.error("gemini_chat_json_corrupt", project_id=project_id, error=str(e))
-        raise ApplicationError(
-            f"Chat history JSON corrupted for {project_id}",
-            non_retryable=True,
-        ) from e
+        raise _corrupt(project_id, e) from e
 
     try:
-        contents = deserialize_to_contents(serialized)
+        index = _parse_index(document)
+        segment_keys = [s["key"] for s in index["segments"]] if index else []
+        segment_docs = [document] if index is None else []
+    except ValueError as e:
+        raise _invalid(project_id, e) from e
+
+    try:
+        segment_bytes = await asyncio.gather(*map(get_object, segment_keys))
+    except ClientError as e:
+        raise _storage_error(e, project_id, "Chat history segment") from e
+    try:
+        segment_docs += [await asyncio.to_thread(json.loads, data) for data in segment_bytes]
+    except json.JSONDecodeError as e:
+        raise _corrupt(project_id, e) from e
+
+    try:
+        serialized = [turn for doc in segment_docs for turn in _history_turns(doc)]
+    except ValueError as e:
+        raise _invalid(project_id, e) from e
+
+    keys = sorted(_blob_keys(serialized))
+    try:
+        blobs = dict(zip(keys, await asyncio.gather(*map(get_blob, keys)), strict=True))
+    except ClientError as e:
+        raise _storage_error(e, project_id, "Chat history image") from e
+
+    try:
+        contents = await asyncio.to_thread(deserialize_to_contents, serialized, blobs)
     except (ValueError, TypeError, KeyError) as e:
-        logger.error("gemini_chat_deserialization_failed", project_id=project_id, error=str(e))
-        raise ApplicationError(
-            f"Chat history data invalid for {project_id}: {e}",
-            non_retryable=True,
-        ) from e
+        raise _invalid(project_id, e) from e
 
     logger.info(
         "gemini_chat_restored",
         project_id=project_id,
         key=key,
         turns=len(contents),
+        segments=len(segment_keys),
+        blobs=len(blobs),
+        format_version=document.get("version", 2) if isinstance(document, dict) else "legacy",
+        size_bytes=len(json_bytes) + sum(map(len, segment_bytes)),
     )
     return contents
 
 
-def cleanup(project_id: str) -> None:
+async def cleanup(project_id: str) -> None:
     """Delete chat history from R2."""
-    from app.utils.r2 import delete_object
+    from app.utils.object_cache import delete_object
 
     key = CHAT_HISTORY_KEY_TEMPLATE.format(project_id=project_id)
-    delete_object(key)
+    await delete_object(key)
     logger.info("gemini_chat_cleaned", project_id=project_id)
 
 
@@ -340,9 +633,9 @@ def _prune_history_images(
     return pruned
 
 
-def continue_chat(
+async def continue_chat(
     history: list[types.Content],
-    new_message: list[types.Part | str | Image.Image],
+    new_message: Sequence[types.Part | str | Image.Image],
     client: genai.Client | None = None,
 ) -> types.GenerateContentResponse:
     """Continue a chat by sending history + new message via generate_content.
@@ -351,28 +644,52 @@ def continue_chat(
     the full contents array and call generate_content directly.
 
     new_message items can be strings, types.Part objects, or PIL Images
-    (auto-converted to inline PNG parts).
+    (auto-converted to inline PNG parts). The request runs on the async
+    client; callers bound it with gemini_call().
     """
     if client is None:
         client = get_client()
 
-    # Build new user turn from the message parts
-    user_parts = []
-    new_image_count = 0
-    for item in new_message:
+    # PNG encoding of new images and history pruning are CPU work; keep them
+    # off the event loop.
+    contents = await asyncio.to_thread(_build_contents, history, new_message)
+
+    return await client.aio.models.generate_content(
+        model=GEMINI_MODEL,
+        contents=cast("list", contents),
+        config=IMAGE_CONFIG,
+    )
+
+
+def to_parts(items: Sequence[types.Part | str | Image.Image]) -> list[types.Part]:
+    """Convert message items to Parts; PIL Images become inline PNG parts.
+
+    PNG-encoding a 2K image is CPU-bound, so async callers run this via
+    ``asyncio.to_thread`` instead of handing raw images to the SDK, which
+    would encode them on the event loop.
+    """
+    parts = []
+    for item in items:
         if isinstance(item, str):
-            user_parts.append(types.Part(text=item))
+            parts.append(types.Part(text=item))
         elif isinstance(item, Image.Image):
             buf = io.BytesIO()
             item.save(buf, format="PNG")
-            user_parts.append(types.Part.from_bytes(data=buf.getvalue(), mime_type="image/png"))
-            new_image_count += 1
+            parts.append(types.Part.from_bytes(data=buf.getvalue(), mime_type="image/png"))
         elif isinstance(item, types.Part):
-            user_parts.append(item)
-            if item.inline_data is not None:
-                new_image_count += 1
+            parts.append(item)
         else:
             raise ValueError(f"Unexpected message part type: {type(item).__name__}")
+    return parts
+
+
+def _build_contents(
+    history: list[types.Content],
+    new_message: Sequence[types.Part | str | Image.Image],
+) -> list[types.Content]:
+    """Pruned history plus the new user turn built from message parts."""
+    user_parts = to_parts(new_message)
+    new_image_count = sum(1 for part in user_parts if part.inline_data is not None)
 
     # Prune history images if accumulated turns exceed model ceiling.
     # Single-call inputs are bounded by product (max 6 images), but history
@@ -380,13 +697,7 @@ def continue_chat(
     max_history_images = MAX_INPUT_IMAGES - new_image_count
     pruned_history = _prune_history_images(history, max_history_images)
 
-    contents = pruned_history + [types.Content(role="user", parts=user_parts)]
-
-    return client.models.generate_content(
-        model=GEMINI_MODEL,
-        contents=cast("list", contents),
-        config=IMAGE_CONFIG,
-    )
+    return pruned_history + [types.Content(role="user", parts=user_parts)]
 
 
 def extract_image(response: types.GenerateContentResponse) -> Image.Image | None:
@@ -1,28 +1,51 @@
-"""Shared HTTP image download helpers for Temporal activities.
-
-Used by generate.py and edit.py to download room/inspiration photos
-from R2 presigned URLs. Validates content-type and image integrity.
+"""Shared image download helpers for Temporal activities.
+
+Used by generate.py and edit.py to load room/inspiration photos. Bare R2
+storage keys are read with the authenticated storage client through the
+worker's object cache (``app.utils.object_cache``): no presigning, no
+public-endpoint hop, no URL expiry, and repeat reads skip the download.
+External URLs are streamed over the process-wide pooled client
+(``app.utils.http_pool``), so connections stay open between activities,
+with content-type checked before the body and a byte budget enforced while
+reading. Every image logs ``image_fetched`` with its transfer rate and
+decode time; ``max_side`` optionally decodes at reduced size.
 """
 
 from __future__ import annotations
 
 import asyncio
 import io
+import time
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     import httpx
 
+import structlog
 from PIL import Image
 from temporalio.exceptions import ApplicationError
 
+from app.config import settings
+
+logger = structlog.get_logger()
+
+
+async def fetch_image(
+    client: httpx.AsyncClient, url: str, max_side: int | None = None
+) -> Image.Image:
+    """Stream, validate and decode a single image using the given HTTP client.
 
-async def fetch_image(client: httpx.AsyncClient, url: str) -> Image.Image:
-    """Fetch and validate a single image using the given HTTP client."""
+    Status and content-type are checked before the body is read, and the
+    body is abandoned as soon as it exceeds ``settings.image_download_max_bytes``.
+    With ``max_side``, JPEGs are decoded at reduced size (see ``_decode_image``).
+    """
     import httpx
 
+    start = time.monotonic()
     try:
-        response = await client.get(url, timeout=30)
+        async with client.stream("GET", url, timeout=30) as response:
+            _check_response(response, url)
+            data = await _read_capped(response, url)
     except httpx.TimeoutException as exc:
         raise ApplicationError(
             f"Timeout downloading image: {url[:100]}",
@@ -34,6 +57,10 @@ async def fetch_image(client: httpx.AsyncClient, url: str) -> Image.Image:
             non_retryable=False,
         ) from exc
 
+    return await _decode_timed(data, url, start, max_side)
+
+
+def _check_response(response: httpx.Response, url: str) -> None:
     if response.status_code >= 400:
         # 429 is retryable (throttling); other 4xx are non-retryable client errors
         is_non_retryable = response.status_code < 500 and response.status_code != 429
@@ -49,31 +76,129 @@ async def fetch_image(client: httpx.AsyncClient, url: str) -> Image.Image:
             non_retryable=True,
         )
 
+
+def _too_large(source: str) -> ApplicationError:
+    return ApplicationError(
+        f"Image exceeds {settings.image_download_max_bytes} bytes: {source[:100]}",
+        non_retryable=True,
+    )
+
+
+async def _read_capped(response: httpx.Response, url: str) -> bytes:
+    """Read the body in chunks, stopping as soon as it exceeds the byte budget."""
+    limit = settings.image_download_max_bytes
+    declared = response.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise _too_large(url)
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        body += chunk
+        if len(body) > limit:
+            raise _too_large(url)
+    return bytes(body)
+
+
+async def _decode_timed(
+    data: bytes, source: str, start: float, max_side: int | None
+) -> Image.Image:
+    """Decode off the loop and log transfer rate and decode time for the image."""
+    read_s = time.monotonic() - start
+    decode_start = time.monotonic()
+    img = await asyncio.to_thread(_decode_image, data, source, max_side)
+    logger.info(
+        "image_fetched",
+        source=source[:100],
+        size_bytes=len(data),
+        read_ms=round(read_s * 1000),
+        bytes_per_second=round(len(data) / read_s) if read_s > 0 else None,
+        decode_ms=round((time.monotonic() - decode_start) * 1000),
+        width=img.width,
+        height=img.height,
+    )
+    return img
+
+
+def _decode_image(data: bytes, source: str, max_side: int | None = None) -> Image.Image:
+    """Fully decode ``data``; with ``max_side``, bound the longest edge.
+
+    JPEGs are DCT-scaled in draft mode straight to the nearest size at or
+    above ``max_side``, so the full-resolution pixels are never materialized;
+    other formats decode fully and are then downscaled.
+    """
     try:
-        img = Image.open(io.BytesIO(response.content))
+        img = Image.open(io.BytesIO(data))
+        if max_side:
+            img.draft("RGB", (max_side, max_side))
         img.load()  # Force full decode to catch truncation
     except Exception as exc:
         raise ApplicationError(
-            f"Downloaded image is corrupt: {url[:100]}",
+            f"Downloaded image is corrupt: {source[:100]}",
             non_retryable=True,
         ) from exc
+    if max_side and max(img.size) > max_side:
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
     return img
 
 
-async def download_image(url: str) -> Image.Image:
-    """Download an image from a URL."""
-    import httpx
+def _is_storage_key(url: str) -> bool:
+    return not url.startswith(("http://", "https://"))
+
 
-    async with httpx.AsyncClient() as client:
-        return await fetch_image(client, url)
+async def load_cached_image(key: str, max_side: int | None = None) -> Image.Image:
+    """Read an image by R2 storage key through the worker's object cache.
 
+    The read uses the authenticated storage client, so no presigned URL is
+    needed. Objects over ``settings.image_download_max_bytes`` are rejected
+    from their stored size, before the body is downloaded.
+    """
+    from botocore.exceptions import ClientError
 
-async def download_images(urls: list[str]) -> list[Image.Image]:
-    """Download multiple images concurrently with a shared HTTP client."""
+    from app.utils.object_cache import get_object
+    from app.utils.storage import ObjectTooLargeError
+
+    start = time.monotonic()
+    try:
+        data = await get_object(key, max_bytes=settings.image_download_max_bytes)
+    except ObjectTooLargeError as exc:
+        raise _too_large(key) from exc
+    except ClientError as exc:
+        code = exc.response.get("Error", {}).get("Code", "Unknown")
+        raise ApplicationError(
+            f"R2 error {code} reading image: {key[:100]}",
+            non_retryable=code in ("NoSuchKey", "404", "AccessDenied", "403"),
+        ) from exc
+    if len(data) > settings.image_download_max_bytes:
+        raise _too_large(key)
+    return await _decode_timed(data, key, start, max_side)
+
+
+async def download_image(url: str, max_side: int | None = None) -> Image.Image:
+    """Download an image from a URL, or read it through the cache by storage key."""
+    if _is_storage_key(url):
+        return await load_cached_image(url, max_side)
+    from app.utils.http_pool import get_client
+
+    return await fetch_image(get_client("downloads"), url, max_side)
+
+
+async def download_images(urls: list[str], max_side: int | None = None) -> list[Image.Image]:
+    """Download images concurrently; storage keys are read directly, not presigned.
+
+    At most ``settings.image_read_concurrency`` storage reads are in flight
+    per call. URLs go over the shared download client.
+    """
     if not urls:
         return []
-    import httpx
+    from app.utils.http_pool import get_client
+
+    client = get_client("downloads")
+    limit = asyncio.Semaphore(settings.image_read_concurrency)
+
+    async def load(key: str) -> Image.Image:
+        async with limit:
+            return await load_cached_image(key, max_side)
 
-    async with httpx.AsyncClient() as client:
-        tasks = [fetch_image(client, url) for url in urls]
-        return await asyncio.gather(*tasks)
+    tasks = [
+        load(url) if _is_storage_key(url) else fetch_image(client, url, max_side) for url in urls
+    ]
+    return await asyncio.gather(*tasks)
@@ -0,0 +1,112 @@
+"""Process-wide pooled HTTP clients for outbound requests.
+
+Image downloads (R2 presigned URLs, eval images) and Exa product searches
+used to open a fresh ``httpx.AsyncClient`` per call, so every activity paid
+new TCP + TLS handshakes to hosts it had just talked to. Callers now share
+one long-lived client per purpose:
+
+    get_client("downloads")   presigned R2 / public image GETs
+    get_client("exa")         Exa search API
+
+Each client keeps connections alive between calls (bounded by
+``settings.http_max_connections`` / ``http_max_keepalive_connections``) and
+negotiates HTTP/2 when ``settings.http2_enabled`` and the ``h2`` package is
+installed. Request/response event hooks count traffic per host; ``stats()``
+returns those counters for structured logs. The API lifespan and
+``app.worker.run_worker`` open the clients at startup (``open_clients``)
+and close them on shutdown (``close_clients``). The R2 object client
+(``app.utils.r2_async``) manages its own pool.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+from collections import defaultdict
+
+import httpx
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+CLIENT_NAMES = ("downloads", "exa")
+
+_clients: dict[str, httpx.AsyncClient] = {}
+_host_stats: defaultdict[str, dict[str, int]] = defaultdict(
+    lambda: {"requests": 0, "responses": 0, "http2": 0, "server_errors": 0}
+)
+
+
+async def _on_request(request: httpx.Request) -> None:
+    _host_stats[request.url.host]["requests"] += 1
+
+
+async def _on_response(response: httpx.Response) -> None:
+    counters = _host_stats[response.request.url.host]
+    counters["responses"] += 1
+    if response.http_version == "HTTP/2":
+        counters["http2"] += 1
+    if response.status_code >= 500:
+        counters["server_errors"] += 1
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _build_client(name: str) -> httpx.AsyncClient:
+    http2 = settings.http2_enabled and _http2_available()
+    if settings.http2_enabled and not http2:
+        logger.warning("http_pool_http2_unavailable", client=name, hint="install httpx[http2]")
+    logger.info(
+        "http_pool_client_created",
+        client=name,
+        http2=http2,
+        max_connections=settings.http_max_connections,
+    )
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(30.0, connect=5.0),
+        event_hooks={"request": [_on_request], "response": [_on_response]},
+    )
+
+
+def get_client(name: str = "downloads") -> httpx.AsyncClient:
+    """Lazy-init the shared client for ``name``. Do not close it; see close_clients."""
+    client = _clients.get(name)
+    if client is None:
+        client = _clients[name] = _build_client(name)
+    return client
+
+
+def open_clients(names: tuple[str, ...] = CLIENT_NAMES) -> None:
+    """Create the clients up front (API/worker startup) instead of on first use."""
+    for name in names:
+        get_client(name)
+
+
+async def close_clients() -> None:
+    """Close every pooled client (API/worker shutdown)."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+    if _host_stats:
+        logger.info("http_pool_closed", clients=len(clients), hosts=stats())
+
+
+def reset_clients() -> None:
+    """Drop the clients without closing them and zero the counters (for testing)."""
+    _clients.clear()
+    _host_stats.clear()
+
+
+def stats() -> dict[str, dict[str, int]]:
+    """Per-host request counters suitable for structured log fields."""
+    return {host: dict(counters) for host, counters in _host_stats.items()}
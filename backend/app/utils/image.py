@@ -7,6 +7,7 @@ Gemini uses these visual annotations to identify which areas to modify.
 from __future__ import annotations
 
 import io
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 import structlog
@@ -146,3 +147,40 @@ def image_to_bytes(image: Image.Image, fmt: str = "PNG") -> bytes:
     buf = io.BytesIO()
     image.save(buf, format=fmt)
     return buf.getvalue()
+
+
+# Output encodings for generated options and revisions:
+#   name -> (Pillow format, content type, key extension)
+OUTPUT_FORMATS = {
+    "webp": ("WEBP", "image/webp", "webp"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+    "png": ("PNG", "image/png", "png"),
+}
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    data: bytes
+    content_type: str
+    extension: str
+
+
+def encode_output_image(image: Image.Image, fmt: str, quality: int) -> EncodedImage:
+    """Encode a generated image for storage and delivery.
+
+    WebP (method 4) and JPEG (4:4:4, progressive) at ``quality`` 90 are
+    visually lossless on Gemini's 2K renders at a fraction of PNG's size
+    and encode time; PNG stays available as the lossless option.
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format {fmt!r}; expected {list(OUTPUT_FORMATS)}")
+    pil_format, content_type, extension = OUTPUT_FORMATS[fmt]
+    buf = io.BytesIO()
+    if fmt == "webp":
+        image.save(buf, format=pil_format, quality=quality, method=4)
+    elif fmt == "jpeg":
+        rgb = image.convert("RGB") if image.mode != "RGB" else image
+        rgb.save(buf, format=pil_format, quality=quality, subsampling=0, progressive=True)
+    else:
+        image.save(buf, format=pil_format)
+    return EncodedImage(data=buf.getvalue(), content_type=content_type, extension=extension)
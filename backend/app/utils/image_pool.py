@@ -0,0 +1,178 @@
+"""Bounded process pool for CPU-bound image work in the API process.
+
+Decoding, resizing and blur analysis hold the GIL for most of their runtime;
+run in the default thread pool they stall request handling and SSE streams.
+This pool moves that work into worker processes and applies admission
+control per task: once ``image_pool_max_pending`` tasks are queued or
+running, new ones are rejected with ImagePoolSaturatedError (the API maps it
+to 503 + Retry-After) instead of queueing without bound. Only CPU work counts
+— a request awaiting a network call holds no slot. A slot is held until the
+job itself finishes, so a cancelled caller whose job is already running
+still counts against the limit.
+
+Workers are started with the ``spawn`` method — forking a process that
+already runs uvicorn and asyncio threads is unsafe — and are warmed at API
+startup so the first upload doesn't pay for process spawn and imports. Set
+``image_pool_workers=0`` to run the same work in a thread pool (tests,
+local dev); admission control still applies.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import importlib
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, TypeVar
+
+import structlog
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+
+class ImagePoolSaturatedError(Exception):
+    """Raised when the image pool is at its admission limit."""
+
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__(f"Image pool saturated; retry after {retry_after_seconds}s")
+        self.retry_after_seconds = retry_after_seconds
+
+
+class ImageWorkPool:
+    """ProcessPoolExecutor wrapper with per-task admission control and queue metrics.
+
+    ``run()`` executes a picklable module-level function in a worker, or
+    raises ImagePoolSaturatedError when ``max_pending`` tasks are already
+    queued or running. Not thread-safe: used from the event loop only.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after_seconds: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after_seconds = retry_after_seconds
+        self.in_flight = 0  # tasks submitted and not yet finished
+        self.peak_in_flight = 0
+        self.rejected = 0
+        self._executor: Executor | None = None
+
+    @property
+    def saturated(self) -> bool:
+        return not self.has_capacity(1)
+
+    def has_capacity(self, tasks: int) -> bool:
+        """Whether ``tasks`` more tasks would currently be admitted."""
+        return self.in_flight + tasks <= self.max_pending
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` in a worker process (or a thread when workers=0).
+
+        Raises ImagePoolSaturatedError, without running ``fn``, when the pool
+        is at its admission limit.
+        """
+        if self.saturated:
+            self.rejected += 1
+            logger.warning("image_pool_saturated", **self.stats())
+            raise ImagePoolSaturatedError(self.retry_after_seconds)
+        loop = asyncio.get_running_loop()
+        if self.workers <= 0:
+            job = self._get_executor().submit(contextvars.copy_context().run, fn, *args)
+        else:
+            job = self._get_executor().submit(fn, *args)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        # Registered before wrap_future's callback, so the slot is back by the
+        # time the caller resumes; cancelling the caller cancels a queued job
+        # (which releases at once) but a running one keeps its slot until done.
+        job.add_done_callback(lambda _: _call_soon(loop, self._release))
+        return await asyncio.wrap_future(job, loop=loop)
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+
+    def stats(self) -> dict[str, int]:
+        """Counters suitable for structured log fields."""
+        return {
+            "pool_workers": self.workers,
+            "pool_in_flight": self.in_flight,
+            "pool_queue_depth": max(0, self.in_flight - self.workers),
+            "pool_peak_in_flight": self.peak_in_flight,
+            "pool_rejected": self.rejected,
+        }
+
+    async def warm_up(self, preload: Iterable[str] = ()) -> None:
+        """Spawn every worker now and import ``preload`` modules in each.
+
+        Bypasses admission control; call once at startup before serving.
+        """
+        if self.workers <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        modules = tuple(preload)
+        # One task per worker submitted together makes the executor spawn them all
+        await asyncio.gather(
+            *(loop.run_in_executor(executor, _import_modules, modules) for _ in range(self.workers))
+        )
+        logger.info("image_pool_warmed", workers=self.workers, preload=list(modules))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None and self.workers <= 0:
+            self._executor = ThreadPoolExecutor(thread_name_prefix="image-pool")
+        if self._executor is None:
+            from app.logging import configure_logging
+
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=configure_logging,
+            )
+            logger.info("image_pool_started", workers=self.workers, max_pending=self.max_pending)
+        return self._executor
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable[[], None]) -> None:
+    """Run ``callback`` on ``loop`` from an executor thread; no-op once it is closed."""
+    with contextlib.suppress(RuntimeError):  # loop closed at shutdown
+        loop.call_soon_threadsafe(callback)
+
+
+def _import_modules(modules: tuple[str, ...]) -> None:
+    for name in modules:
+        importlib.import_module(name)
+
+
+_pool: ImageWorkPool | None = None
+
+
+def get_image_pool() -> ImageWorkPool:
+    """Return the process-wide image pool, creating it from settings on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ImageWorkPool(
+            workers=settings.image_pool_workers,
+            max_pending=settings.image_pool_max_pending,
+            retry_after_seconds=settings.image_pool_retry_after_seconds,
+        )
+    return _pool
+
+
+def shutdown_image_pool() -> None:
+    """Stop worker processes and drop the singleton (API shutdown, tests)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
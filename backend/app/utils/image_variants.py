@@ -0,0 +1,84 @@
+"""Downscaled delivery variants for photos, design options and revisions.
+
+Full-size images are 2K PNGs or multi-megabyte camera JPEGs; list views on
+iOS (photo grid, option cards, revision history) only need a fraction of
+that. Every stored image gets two JPEG variants written next to it, keyed by
+``r2.variant_key``:
+
+    preview    1024 px long edge — selection / comparison screens
+    thumbnail   320 px long edge — grids and history rows
+
+Variants are best-effort: a failure is logged and the state simply carries
+no variants for that image, so clients fall back to the full-size URL.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+
+import structlog
+from PIL import Image, ImageOps
+
+from app.models.contracts import ImageVariants
+
+logger = structlog.get_logger()
+
+VARIANT_MAX_EDGE = {"preview": 1024, "thumbnail": 320}
+VARIANT_JPEG_QUALITY = 82
+
+
+def render_variants(image: Image.Image) -> dict[str, bytes]:
+    """Encode each variant of an already-decoded image as JPEG bytes."""
+    rgb = image.convert("RGB") if image.mode != "RGB" else image
+    rendered: dict[str, bytes] = {}
+    for name, edge in VARIANT_MAX_EDGE.items():
+        variant = rgb.copy()
+        # thumbnail() never upscales, so small sources keep their size
+        variant.thumbnail((edge, edge), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        buf = io.BytesIO()
+        variant.save(buf, format="JPEG", quality=VARIANT_JPEG_QUALITY, optimize=True)
+        rendered[name] = buf.getvalue()
+    return rendered
+
+
+def render_variants_from_bytes(data: bytes) -> dict[str, bytes]:
+    """Decode encoded image bytes at reduced size and render the variants.
+
+    Module-level so it can run in the image process pool. Applies the EXIF
+    orientation so camera photos aren't shown sideways.
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        # JPEG draft decode: DCT-scale straight to >= the preview size
+        edge = max(VARIANT_MAX_EDGE.values())
+        img.draft("RGB", (edge, edge))
+        oriented = ImageOps.exif_transpose(img)
+        return render_variants(oriented)
+
+
+async def upload_variants(key: str, rendered: dict[str, bytes]) -> ImageVariants:
+    """Upload rendered variants next to ``key`` and return their storage keys."""
+    from app.utils.r2 import variant_key
+    from app.utils.r2_async import upload_object
+
+    keys = {name: variant_key(key, name) for name in rendered}
+    await asyncio.gather(
+        *(upload_object(keys[name], data, "image/jpeg") for name, data in rendered.items())
+    )
+    return ImageVariants(preview_url=keys["preview"], thumbnail_url=keys["thumbnail"])
+
+
+async def store_variants(key: str, image: Image.Image) -> ImageVariants | None:
+    """Render and upload variants for an image stored at ``key``; never raises.
+
+    Returns None for keys that are already URLs (mock mode, legacy data) and
+    when rendering or uploading fails.
+    """
+    if key.startswith(("http://", "https://")):
+        return None
+    try:
+        rendered = await asyncio.to_thread(render_variants, image)
+        return await upload_variants(key, rendered)
+    except Exception:
+        logger.warning("image_variants_failed", key=key, exc_info=True)
+        return None
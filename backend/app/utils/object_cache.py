@@ -0,0 +1,319 @@
+"""Read-through memory + disk cache for R2 objects in the worker.
+
+Every edit round re-reads the same room/inspiration photos, base image and
+chat history the previous round on this worker just touched. Reads go
+through ``get_object``: a cached copy is revalidated with a conditional GET
+(``If-None-Match: <etag>``), so R2 answers 304 with no body and the bytes
+are served locally, while an object rewritten in place (chat history) is
+still picked up on the next read. Writes through ``put_object`` store the
+uploaded bytes under the ETag R2 returns, so the next round's restore hits.
+
+Two LRU tiers, each bounded by total bytes:
+
+    memory  recently used objects, no I/O
+    disk    larger working set under ``settings.object_cache_dir``; survives
+            memory eviction and worker restarts
+
+A read with ``max_bytes`` streams the GET and rejects an object over the
+cap from its Content-Length, before the body is read; a cached copy over
+the cap is fetched that way instead of being revalidated.
+
+Each disk entry is one file named by the SHA-256 of the key, holding the
+ETag line followed by the object bytes. Disk I/O runs in a worker thread;
+the index and counters are only touched on the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class CachedObject:
+    etag: str
+    data: bytes
+
+
+class ObjectCache:
+    """ETag-validated, byte-bounded LRU cache in front of the storage backend."""
+
+    def __init__(self, memory_bytes: int, disk_bytes: int, directory: Path | None) -> None:
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes if directory is not None else 0
+        self.directory = directory
+        self._memory: OrderedDict[str, CachedObject] = OrderedDict()
+        self._memory_used = 0
+        self._disk: OrderedDict[str, int] | None = None  # digest -> file size, LRU order
+        self._disk_used = 0
+        self._disk_scan_lock = asyncio.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_served_locally = 0
+
+    async def get(self, key: str, max_bytes: int | None = None) -> bytes:
+        """Return the object's bytes, from cache when R2 confirms they are current.
+
+        Raises botocore ``ClientError`` like ``r2_async.get_object`` when the
+        object is missing; a stale cached copy is dropped in that case. With
+        ``max_bytes``, raises ``storage.ObjectTooLargeError`` without reading
+        the body of an object whose Content-Length is over it.
+        """
+        from botocore.exceptions import ClientError
+
+        from app.utils.storage import get_backend
+
+        cached, tier = self._memory.get(key), "memory"
+        if cached is None:
+            cached, tier = await self._disk_get(key), "disk"
+        if cached is not None and max_bytes is not None and len(cached.data) > max_bytes:
+            cached = None  # let the capped GET decide from the current object
+        if cached is None:
+            self.misses += 1
+            data, headers = await get_backend().get_object(key, max_bytes)
+            await self._store(key, headers.get("etag"), data)
+            return data
+
+        try:
+            fresh = await get_backend().get_object_if_none_match(key, cached.etag, max_bytes)
+        except ClientError:
+            await self.evict(key)
+            raise
+        if fresh is not None:  # changed since we cached it
+            self.misses += 1
+            data, headers = fresh
+            await self._store(key, headers.get("etag"), data)
+            return data
+        return self._hit(key, cached, tier)
+
+    async def put(self, key: str, data: bytes, content_type: str) -> None:
+        """Upload to R2 and keep the bytes under the ETag R2 assigned."""
+        from app.utils.storage import get_backend
+
+        headers = await get_backend().put_object(key, data, content_type)
+        await self._store(key, headers.get("etag"), data)
+
+    async def evict(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_used -= len(entry.data)
+        await self._disk_remove(_digest(key))
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+        self._memory_used = 0
+
+    def stats(self) -> dict[str, float]:
+        """Counters suitable for structured log fields."""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "bytes_served_locally": self.bytes_served_locally,
+            "memory_bytes": self._memory_used,
+            "disk_bytes": self._disk_used,
+        }
+
+    def _hit(self, key: str, cached: CachedObject, tier: str) -> bytes:
+        if tier == "memory":
+            self.memory_hits += 1
+            self._memory.move_to_end(key)
+        else:
+            self.disk_hits += 1
+            self._memory_put(key, cached)
+        self.bytes_served_locally += len(cached.data)
+        return cached.data
+
+    # --- memory tier ---
+
+    def _memory_put(self, key: str, entry: CachedObject) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_used -= len(previous.data)
+        if len(entry.data) > self.memory_bytes:
+            return
+        self._memory[key] = entry
+        self._memory_used += len(entry.data)
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted.data)
+
+    # --- disk tier ---
+
+    async def _store(self, key: str, etag: str | None, data: bytes) -> None:
+        if not etag:  # nothing to revalidate against — don't cache
+            await self.evict(key)
+            return
+        entry = CachedObject(etag=etag, data=data)
+        self._memory_put(key, entry)
+        await self._disk_put(key, entry)
+
+    async def _disk_index(self) -> OrderedDict[str, int] | None:
+        if self.directory is None or self.disk_bytes <= 0:
+            return None
+        if self._disk is None:
+            async with self._disk_scan_lock:  # concurrent first reads scan once
+                if self._disk is None:
+                    index = await asyncio.to_thread(_scan_directory, self.directory)
+                    self._disk_used = sum(index.values())
+                    self._disk = index
+        return self._disk
+
+    async def _disk_get(self, key: str) -> CachedObject | None:
+        index = await self._disk_index()
+        digest = _digest(key)
+        if index is None or digest not in index:
+            return None
+        assert self.directory is not None
+        entry = await asyncio.to_thread(_read_entry, self.directory / digest)
+        if entry is None:  # removed or corrupt on disk
+            await self._disk_remove(digest)
+            return None
+        index.move_to_end(digest)
+        return entry
+
+    async def _disk_put(self, key: str, entry: CachedObject) -> None:
+        index = await self._disk_index()
+        if index is None:
+            return
+        assert self.directory is not None
+        digest = _digest(key)
+        size = len(entry.etag) + 1 + len(entry.data)
+        if size > self.disk_bytes:
+            await self._disk_remove(digest)
+            return
+        try:
+            await asyncio.to_thread(_write_entry, self.directory, digest, entry)
+        except OSError:
+            logger.warning("object_cache_write_failed", key=key, exc_info=True)
+            return
+        self._disk_used += size - index.pop(digest, 0)
+        index[digest] = size
+        evict: list[str] = []
+        while self._disk_used > self.disk_bytes:
+            victim, victim_size = index.popitem(last=False)
+            self._disk_used -= victim_size
+            evict.append(victim)
+        if evict:
+            await asyncio.to_thread(_unlink_all, [self.directory / d for d in evict])
+
+    async def _disk_remove(self, digest: str) -> None:
+        index = await self._disk_index()
+        if index is None or digest not in index:
+            return
+        assert self.directory is not None
+        self._disk_used -= index.pop(digest)
+        await asyncio.to_thread(_unlink_all, [self.directory / digest])
+
+
+def _digest(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _scan_directory(directory: Path) -> OrderedDict[str, int]:
+    """Rebuild the disk index, least recently modified first."""
+    directory.mkdir(parents=True, exist_ok=True)
+    files = [p for p in directory.iterdir() if p.is_file() and len(p.name) == 64]
+    stats = [(p, p.stat()) for p in files]
+    stats.sort(key=lambda item: item[1].st_mtime)
+    return OrderedDict((p.name, st.st_size) for p, st in stats)
+
+
+def _read_entry(path: Path) -> CachedObject | None:
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None
+    etag, sep, data = raw.partition(b"\n")
+    if not sep or not etag:
+        return None
+    os.utime(path)  # keep mtime as the LRU order across restarts
+    return CachedObject(etag=etag.decode("utf-8"), data=data)
+
+
+def _write_entry(directory: Path, digest: str, entry: CachedObject) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(entry.etag.encode("utf-8") + b"\n")
+            f.write(entry.data)
+        os.replace(tmp, directory / digest)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _unlink_all(paths: list[Path]) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+_cache: ObjectCache | None = None
+
+
+def _get_cache() -> ObjectCache:
+    """Lazy-init singleton cache sized from settings."""
+    global _cache  # noqa: PLW0603
+    if _cache is None:
+        directory = settings.object_cache_dir or os.path.join(
+            tempfile.gettempdir(), "remo-object-cache"
+        )
+        _cache = ObjectCache(
+            memory_bytes=settings.object_cache_memory_bytes,
+            disk_bytes=settings.object_cache_disk_bytes,
+            directory=Path(directory),
+        )
+    return _cache
+
+
+def reset_cache() -> None:
+    """Drop the singleton (for testing). Files on disk are left alone."""
+    global _cache  # noqa: PLW0603
+    _cache = None
+
+
+def stats() -> dict[str, float]:
+    return _get_cache().stats()
+
+
+async def get_object(key: str, max_bytes: int | None = None) -> bytes:
+    """Read an object through the cache. Raises ClientError ("NoSuchKey") if missing.
+
+    Raises ``storage.ObjectTooLargeError`` without downloading when the
+    object is larger than ``max_bytes``.
+    """
+    cache = _get_cache()
+    data = await cache.get(key, max_bytes)
+    logger.debug("object_cache_get", key=key, size=len(data), **cache.stats())
+    return data
+
+
+async def put_object(key: str, data: bytes, content_type: str) -> str:
+    """Upload an object and cache it for the next read. Returns the storage key."""
+    await _get_cache().put(key, data, content_type)
+    logger.info("r2_upload", key=key, size=len(data), content_type=content_type)
+    return key
+
+
+async def delete_object(key: str) -> None:
+    """Delete an object from R2 and drop any cached copy."""
+    from app.utils.r2_async import delete_object as delete_remote
+
+    await _get_cache().evict(key)
+    await delete_remote(key)
@@ -1,14 +1,17 @@
 """Cloudflare R2 client wrapper — S3-compatible object storage.
 
-Provides upload, download URL generation, existence checks, and deletion
-for project assets. All operations use the storage key convention:
+Provides download URL generation for project assets; object reads and
+writes go through ``app.utils.r2_async``. All keys follow the convention:
     projects/{project_id}/photos/room_0.jpg
-    projects/{project_id}/generated/option_0.png
+    projects/{project_id}/generated/option_0-{sha256[:16]}.webp
+    projects/{project_id}/generated/option_0-{sha256[:16]}.thumbnail.jpg   (delivery variant)
     etc.
 """
 
 from __future__ import annotations
 
+import asyncio
+import threading
 from typing import Any
 
 import boto3
@@ -17,15 +20,26 @@ from botocore.config import Config
 from botocore.exceptions import ClientError
 
 from app.config import settings
+from app.utils.ttl_cache import TTLCache
 
 logger = structlog.get_logger()
 
+# resolve_url hands out the same presigned URL for a key until this long
+# before it expires (capped at half its lifetime), so state polls don't
+# re-sign every image and iOS's URL-keyed image cache actually hits.
+PRESIGN_REFRESH_MARGIN_SECONDS = 900
+
+
+def endpoint_url() -> str:
+    """R2 endpoint, or the ``r2_endpoint_url`` override (e.g. a local S3 stand-in)."""
+    return settings.r2_endpoint_url or f"https://{settings.r2_account_id}.r2.cloudflarestorage.com"
+
 
 def _build_client() -> Any:
     """Create an S3 client pointed at Cloudflare R2."""
     return boto3.client(
         "s3",
-        endpoint_url=f"https://{settings.r2_account_id}.r2.cloudflarestorage.com",
+        endpoint_url=endpoint_url(),
         aws_access_key_id=settings.r2_access_key_id,
         aws_secret_access_key=settings.r2_secret_access_key,
         config=Config(signature_version="s3v4"),
@@ -45,29 +59,38 @@ def _get_client() -> Any:
 
 
 def reset_client() -> None:
-    """Reset the singleton client (for testing)."""
-    global _client  # noqa: PLW0603
+    """Reset the singleton client and the presigned-URL cache (for testing)."""
+    global _client, _presign_cache  # noqa: PLW0603
     _client = None
+    _presign_cache = None
 
 
-def upload_object(key: str, data: bytes, content_type: str = "image/jpeg") -> str:
-    """Upload bytes to R2. Returns the storage key."""
-    client = _get_client()
-    client.put_object(
-        Bucket=settings.r2_bucket_name,
-        Key=key,
-        Body=data,
-        ContentType=content_type,
-    )
-    logger.info("r2_upload", key=key, size=len(data), content_type=content_type)
-    return key
+_presign_cache: TTLCache[str, str] | None = None
+# resolve_url runs on the event loop and in activity worker threads
+_presign_lock = threading.Lock()
+
+
+def _get_presign_cache() -> TTLCache[str, str]:
+    global _presign_cache  # noqa: PLW0603
+    if _presign_cache is None:
+        expiry = settings.presigned_url_expiry_seconds
+        _presign_cache = TTLCache(
+            max_entries=settings.presign_cache_max_entries,
+            ttl_seconds=expiry - min(PRESIGN_REFRESH_MARGIN_SECONDS, expiry / 2),
+        )
+    return _presign_cache
 
 
 def generate_presigned_url(key: str) -> str:
     """Generate a pre-signed GET URL for downloading an object.
 
     URL expires after `settings.presigned_url_expiry_seconds` (default 1 hour).
+    With the local storage backend the URL points at the API's storage route.
     """
+    if settings.storage_backend == "local":
+        from app.utils.storage import get_backend
+
+        return get_backend().presign_get(key, settings.presigned_url_expiry_seconds)
     client = _get_client()
     try:
         url: str = client.generate_presigned_url(
@@ -81,31 +104,33 @@ def generate_presigned_url(key: str) -> str:
     return url
 
 
-def head_object(key: str) -> bool:
-    """Check if an object exists in R2. Returns True if found."""
-    client = _get_client()
-    try:
-        client.head_object(Bucket=settings.r2_bucket_name, Key=key)
-        return True
-    except ClientError as e:
-        if e.response["Error"]["Code"] == "404":
-            return False
-        logger.error("r2_head_failed", key=key, error=str(e))
-        raise
-
+def variant_key(key: str, variant: str) -> str:
+    """Storage key of a downscaled delivery variant, stored next to ``key``.
 
-def delete_object(key: str) -> None:
-    """Delete a single object from R2."""
-    client = _get_client()
-    client.delete_object(Bucket=settings.r2_bucket_name, Key=key)
-    logger.info("r2_delete", key=key)
+    ``projects/p/generated/option_0.png`` + ``"preview"`` →
+    ``projects/p/generated/option_0.preview.jpg``. Variants share the
+    project prefix, so ``delete_prefix`` purges them with the original.
+    """
+    stem, dot, _ext = key.rpartition(".")
+    return f"{stem if dot else key}.{variant}.jpg"
 
 
 def resolve_url(key_or_url: str) -> str:
-    """Convert an R2 storage key to a presigned URL; pass through existing URLs."""
+    """Convert an R2 storage key to a presigned URL; pass through existing URLs.
+
+    Presigned URLs are cached per key (see PRESIGN_REFRESH_MARGIN_SECONDS),
+    so keys must be write-once: a key rewritten with new content keeps
+    resolving to the old URL, which clients cache by URL.
+    """
     if key_or_url.startswith(("http://", "https://")):
         return key_or_url
-    return generate_presigned_url(key_or_url)
+    with _presign_lock:
+        url = _get_presign_cache().get(key_or_url)
+    if url is None:
+        url = generate_presigned_url(key_or_url)
+        with _presign_lock:
+            _get_presign_cache().set(key_or_url, url)
+    return url
 
 
 def resolve_urls(keys_or_urls: list[str]) -> list[str]:
@@ -113,22 +138,35 @@ def resolve_urls(keys_or_urls: list[str]) -> list[str]:
     return [resolve_url(item) for item in keys_or_urls]
 
 
-def delete_prefix(prefix: str) -> None:
-    """Delete all objects under a prefix (e.g., 'projects/{id}/')."""
-    client = _get_client()
-    paginator = client.get_paginator("list_objects_v2")
-    deleted_count = 0
-    for page in paginator.paginate(Bucket=settings.r2_bucket_name, Prefix=prefix):
-        objects = page.get("Contents", [])
-        if not objects:
-            continue
-        delete_keys = [{"Key": obj["Key"]} for obj in objects]
-        response = client.delete_objects(
-            Bucket=settings.r2_bucket_name,
-            Delete={"Objects": delete_keys},
-        )
-        errors = response.get("Errors", [])
-        if errors:
-            logger.warning("r2_delete_partial_failure", prefix=prefix, errors=errors)
-        deleted_count += len(delete_keys) - len(errors)
-    logger.info("r2_delete_prefix", prefix=prefix, deleted_count=deleted_count)
+async def presign_batch(keys_or_urls: list[str]) -> list[str]:
+    """``resolve_urls`` for async callers: at most one executor hop per batch.
+
+    URLs and cached keys are answered inline — a dict lookup, no signing.
+    Only the remaining keys are signed (SigV4 HMACs), together in a single
+    worker-thread call, so a state response or activity never blocks the
+    event loop on signing and never pays a thread round-trip per key.
+    """
+    with _presign_lock:
+        cache = _get_presign_cache()
+        resolved = [
+            item if item.startswith(("http://", "https://")) else cache.get(item)
+            for item in keys_or_urls
+        ]
+    misses = list(
+        dict.fromkeys(k for k, url in zip(keys_or_urls, resolved, strict=True) if url is None)
+    )
+    if not misses:
+        return [url for url in resolved if url is not None]
+    signed = dict(zip(misses, await asyncio.to_thread(_sign_and_cache, misses), strict=True))
+    return [
+        url if url is not None else signed[k] for k, url in zip(keys_or_urls, resolved, strict=True)
+    ]
+
+
+def _sign_and_cache(keys: list[str]) -> list[str]:
+    urls = [generate_presigned_url(key) for key in keys]
+    with _presign_lock:
+        cache = _get_presign_cache()
+        for key, url in zip(keys, urls, strict=True):
+            cache.set(key, url)
+    return urls
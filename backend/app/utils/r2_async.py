@@ -0,0 +1,440 @@
+"""Async R2 client — S3 object operations without a thread hop per call.
+
+boto3 is synchronous, so every PUT/GET/HEAD/DELETE through it has to run
+in the default executor, and under load those calls queue behind
+each other for a thread. This module speaks the S3 REST API directly over a
+shared ``httpx.AsyncClient`` (one keep-alive connection pool per process)
+and signs requests with botocore's SigV4 signer, so the wire format and
+credentials are exactly what boto3 would send.
+
+The module helpers are ``upload_object``, ``get_object``, ``head_object``
+and ``delete_object``. ``delete_prefixes`` is the bulk purge
+engine: it lists and deletes pages of many prefixes concurrently.
+Failures raise botocore ``ClientError``
+with the same ``Error.Code`` boto3 reports ("NoSuchKey", "404", ...), so
+existing error handling carries over unchanged. ``AsyncR2Client`` is the R2
+implementation of ``app.utils.storage.StorageBackend``; the module helpers
+go through ``get_backend()`` so the local filesystem backend can stand in.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import time
+import xml.etree.ElementTree as ET
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+from urllib.parse import quote, urlencode
+
+import httpx
+import structlog
+from botocore.auth import S3SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import Credentials
+from botocore.exceptions import ClientError
+
+from app.config import settings
+from app.utils.r2 import endpoint_url
+from app.utils.storage import ObjectTooLargeError, get_backend
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+logger = structlog.get_logger()
+
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 0.2
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# Bulk purge: keys that come back in DeleteObjects ``Errors`` are retried
+# this many times in total before they are reported as failed
+PURGE_DELETE_ATTEMPTS = 3
+_S3_NS = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+
+
+class AsyncR2Client:
+    """Minimal async S3 client for one bucket, pooled and SigV4-signed."""
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key_id: str,
+        secret_access_key: str,
+        max_connections: int = 32,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self._signer = S3SigV4Auth(Credentials(access_key_id, secret_access_key), "s3", "auto")
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            transport=transport,
+        )
+
+    def object_url(self, key: str) -> str:
+        """Path-style URL of ``key`` (R2 accepts path-style addressing)."""
+        return f"{self.endpoint_url}/{self.bucket}/{quote(key, safe='/~')}"
+
+    async def put_object(self, key: str, data: bytes, content_type: str) -> dict[str, str]:
+        """Upload ``data``; returns the response headers (ETag of the new object)."""
+        response = await self._request(
+            "PutObject", "PUT", key, data, {"Content-Type": content_type}
+        )
+        return dict(response.headers)
+
+    async def get_object(
+        self, key: str, max_bytes: int | None = None
+    ) -> tuple[bytes, dict[str, str]]:
+        """Return the object's bytes and response headers (ETag, Content-Type, ...)."""
+        response = await self._request("GetObject", "GET", key, max_bytes=max_bytes)
+        return response.content, dict(response.headers)
+
+    async def get_object_if_none_match(
+        self, key: str, etag: str, max_bytes: int | None = None
+    ) -> tuple[bytes, dict[str, str]] | None:
+        """Conditional GET: None if the object still has ``etag`` (304, no body)."""
+        response = await self._request(
+            "GetObject", "GET", key, headers={"If-None-Match": etag}, max_bytes=max_bytes
+        )
+        if response.status_code == 304:
+            return None
+        return response.content, dict(response.headers)
+
+    async def head_object(self, key: str) -> dict[str, str]:
+        response = await self._request("HeadObject", "HEAD", key)
+        return dict(response.headers)
+
+    async def delete_object(self, key: str) -> None:
+        await self._request("DeleteObject", "DELETE", key)
+
+    async def list_objects(
+        self, prefix: str, continuation_token: str | None = None
+    ) -> tuple[list[str], str | None]:
+        """One ListObjectsV2 page (up to 1000 keys) and the next continuation token."""
+        params = {"list-type": "2", "prefix": prefix}
+        if continuation_token:
+            params["continuation-token"] = continuation_token
+        response = await self._request(
+            "ListObjectsV2",
+            "GET",
+            None,
+            query=urlencode(sorted(params.items()), safe="~", quote_via=quote),
+        )
+        root = ET.fromstring(response.content)
+        keys = [_findtext(c, "Key") or "" for c in _findall(root, "Contents")]
+        truncated = (_findtext(root, "IsTruncated") or "false").lower() == "true"
+        return keys, _findtext(root, "NextContinuationToken") if truncated else None
+
+    async def delete_objects(self, keys: list[str]) -> list[dict[str, str]]:
+        """DeleteObjects in quiet mode; returns the per-key ``Errors`` entries."""
+        objects = "".join(f"<Object><Key>{_xml_escape(k)}</Key></Object>" for k in keys)
+        body = f"<Delete><Quiet>true</Quiet>{objects}</Delete>".encode()
+        md5 = base64.b64encode(hashlib.md5(body).digest()).decode()  # noqa: S324 - required by S3
+        response = await self._request(
+            "DeleteObjects",
+            "POST",
+            None,
+            body,
+            {"Content-MD5": md5, "Content-Type": "application/xml"},
+            query="delete=",
+        )
+        root = ET.fromstring(response.content) if response.content else None
+        if root is None:
+            return []
+        return [
+            {
+                "Key": _findtext(e, "Key") or "",
+                "Code": _findtext(e, "Code") or "",
+                "Message": _findtext(e, "Message") or "",
+            }
+            for e in _findall(root, "Error")
+        ]
+
+    def presign_get(self, key: str, expires_in: int) -> str:
+        """Presigned GET URL — signed locally by boto3, no request is made."""
+        from app.utils.r2 import _get_client as _get_boto_client
+
+        url: str = _get_boto_client().generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=expires_in
+        )
+        return url
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def _request(
+        self,
+        operation: str,
+        method: str,
+        key: str | None,
+        body: bytes = b"",
+        headers: dict[str, str] | None = None,
+        query: str = "",
+        max_bytes: int | None = None,
+    ) -> httpx.Response:
+        """Signed request for an object, or for the bucket itself when ``key`` is None.
+
+        With ``max_bytes`` the response is streamed, and a successful one whose
+        Content-Length is over it is closed unread (``ObjectTooLargeError``).
+        """
+        url = self.object_url(key) if key is not None else f"{self.endpoint_url}/{self.bucket}"
+        if query:
+            url = f"{url}?{query}"
+        for attempt in range(1, RETRY_ATTEMPTS + 1):
+            # Re-sign each attempt: the signature covers X-Amz-Date
+            request = AWSRequest(method=method, url=url, data=body, headers=headers or {})
+            self._signer.add_auth(request)
+            try:
+                if max_bytes is None:
+                    response = await self._http.request(
+                        method, url, content=body or None, headers=dict(request.headers.items())
+                    )
+                else:
+                    response = await self._send_capped(
+                        method, url, dict(request.headers.items()), key or "", max_bytes
+                    )
+            except httpx.TransportError:
+                if attempt == RETRY_ATTEMPTS:
+                    raise
+                await asyncio.sleep(RETRY_BACKOFF_SECONDS * attempt)
+                continue
+            if response.status_code < 300 or response.status_code == 304:
+                return response  # 304 only answers a conditional request
+            if response.status_code not in _RETRYABLE_STATUS or attempt == RETRY_ATTEMPTS:
+                raise _client_error(operation, response)
+            await asyncio.sleep(RETRY_BACKOFF_SECONDS * attempt)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    async def _send_capped(
+        self, method: str, url: str, headers: dict[str, str], key: str, max_bytes: int
+    ) -> httpx.Response:
+        request = self._http.build_request(method, url, headers=headers)
+        response = await self._http.send(request, stream=True)
+        try:
+            size = int(response.headers.get("content-length", 0))
+            if response.status_code < 300 and size > max_bytes:
+                raise ObjectTooLargeError(key, size)
+            await response.aread()
+        finally:
+            await response.aclose()
+        return response
+
+
+def _findtext(element: ET.Element, tag: str) -> str | None:
+    """findtext for S3 XML, with or without the S3 namespace."""
+    found = element.find(f"{_S3_NS}{tag}")
+    if found is None:
+        found = element.find(tag)
+    return found.text if found is not None else None
+
+
+def _findall(element: ET.Element, tag: str) -> list[ET.Element]:
+    return element.findall(f"{_S3_NS}{tag}") or element.findall(tag)
+
+
+def _xml_escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _client_error(operation: str, response: httpx.Response) -> ClientError:
+    """Build the ClientError boto3 would raise for an S3 error response.
+
+    HEAD responses carry no body, so — like boto3 — the code is the status.
+    """
+    code, message = str(response.status_code), response.reason_phrase
+    if response.content:
+        try:
+            root = ET.fromstring(response.content)
+            code = root.findtext("Code") or code
+            message = root.findtext("Message") or message
+        except ET.ParseError:
+            pass
+    error_response: Any = {
+        "Error": {"Code": code, "Message": message},
+        "ResponseMetadata": {"HTTPStatusCode": response.status_code},
+    }
+    return ClientError(error_response, operation)
+
+
+def _build_client() -> AsyncR2Client:
+    return AsyncR2Client(
+        endpoint_url=endpoint_url(),
+        bucket=settings.r2_bucket_name,
+        access_key_id=settings.r2_access_key_id,
+        secret_access_key=settings.r2_secret_access_key,
+        max_connections=settings.r2_max_connections,
+    )
+
+
+_client: AsyncR2Client | None = None
+
+
+def _get_client() -> AsyncR2Client:
+    """Lazy-init singleton client."""
+    global _client  # noqa: PLW0603
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+async def close_client() -> None:
+    """Close the pooled connections (API/worker shutdown)."""
+    global _client  # noqa: PLW0603
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def reset_client() -> None:
+    """Drop the singleton without closing it (for testing)."""
+    global _client  # noqa: PLW0603
+    _client = None
+
+
+async def upload_object(key: str, data: bytes, content_type: str = "image/jpeg") -> str:
+    """Upload bytes to R2. Returns the storage key."""
+    await get_backend().put_object(key, data, content_type)
+    logger.info("r2_upload", key=key, size=len(data), content_type=content_type)
+    return key
+
+
+async def get_object(key: str) -> bytes:
+    """Download an object's bytes. Raises ClientError ("NoSuchKey") if missing."""
+    data, _headers = await get_backend().get_object(key)
+    return data
+
+
+async def head_object(key: str) -> bool:
+    """Check if an object exists in R2. Returns True if found."""
+    try:
+        await get_backend().head_object(key)
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "404":
+            return False
+        logger.error("r2_head_failed", key=key, error=str(e))
+        raise
+
+
+async def delete_object(key: str) -> None:
+    """Delete a single object from R2."""
+    await get_backend().delete_object(key)
+    logger.info("r2_delete", key=key)
+
+
+@dataclass
+class PurgeReport:
+    """Outcome of a bulk prefix purge."""
+
+    prefixes: int
+    deleted: int = 0
+    failed: list[dict[str, str]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def objects_per_second(self) -> float:
+        return round(self.deleted / self.seconds, 1) if self.seconds > 0 else 0.0
+
+
+@asynccontextmanager
+async def task_group() -> AsyncIterator[asyncio.TaskGroup]:
+    """``asyncio.TaskGroup`` that re-raises the first failure itself.
+
+    A bare TaskGroup wraps even a single failure in an ExceptionGroup;
+    callers of the purge helpers handle ``ClientError`` and must keep
+    seeing it. Further concurrent failures are logged.
+    """
+    try:
+        async with asyncio.TaskGroup() as tasks:
+            yield tasks
+    except BaseExceptionGroup as group:
+        errors = _leaf_errors(group)
+        if len(errors) > 1:
+            logger.warning(
+                "task_group_multiple_failures",
+                count=len(errors),
+                errors=[repr(e) for e in errors[1:10]],
+            )
+        raise errors[0] from None
+
+
+def _leaf_errors(group: BaseExceptionGroup) -> list[BaseException]:
+    errors: list[BaseException] = []
+    for error in group.exceptions:
+        errors.extend(_leaf_errors(error) if isinstance(error, BaseExceptionGroup) else [error])
+    return errors
+
+
+async def delete_prefixes(prefixes: list[str], max_concurrency: int | None = None) -> PurgeReport:
+    """Delete every object under each prefix, listing and deleting concurrently.
+
+    Each prefix is walked page by page (continuation tokens make listing
+    sequential per prefix), and each page's DeleteObjects batch is handed
+    off as soon as it is listed, so page N+1 is listed while page N is being
+    deleted and many prefixes progress at once. All list and delete requests
+    share one bound of ``max_concurrency`` (default
+    ``settings.r2_purge_concurrency``). Keys reported in ``Errors`` are
+    retried; any still failing are returned in ``PurgeReport.failed``.
+    """
+    client = get_backend()
+    limit = asyncio.Semaphore(max_concurrency or settings.r2_purge_concurrency)
+    report = PurgeReport(prefixes=len(prefixes))
+    start = time.perf_counter()
+
+    async def delete_batch(keys: list[str]) -> None:
+        for attempt in range(1, PURGE_DELETE_ATTEMPTS + 1):
+            async with limit:
+                errors = await client.delete_objects(keys)
+            report.deleted += len(keys) - len(errors)
+            if not errors:
+                return
+            if attempt == PURGE_DELETE_ATTEMPTS:
+                report.failed.extend(errors)
+                return
+            keys = [e["Key"] for e in errors]
+            await asyncio.sleep(RETRY_BACKOFF_SECONDS * attempt)
+
+    async def walk(prefix: str, tasks: asyncio.TaskGroup) -> None:
+        token: str | None = None
+        while True:
+            async with limit:
+                keys, token = await client.list_objects(prefix, token)
+            if keys:
+                tasks.create_task(delete_batch(keys))
+            if token is None:
+                return
+
+    async with task_group() as tasks:
+        for prefix in prefixes:
+            tasks.create_task(walk(prefix, tasks))
+
+    report.seconds = time.perf_counter() - start
+    if report.failed:
+        logger.warning(
+            "r2_delete_partial_failure",
+            prefixes=prefixes[:10],
+            failed_count=len(report.failed),
+            errors=report.failed[:20],
+        )
+    logger.info(
+        "r2_purge_complete",
+        prefixes=report.prefixes,
+        deleted_count=report.deleted,
+        failed_count=len(report.failed),
+        seconds=round(report.seconds, 3),
+        objects_per_second=report.objects_per_second,
+    )
+    return report
+
+
+async def delete_prefix(prefix: str) -> PurgeReport:
+    """Delete all objects under a prefix (e.g., 'projects/{id}/')."""
+    return await delete_prefixes([prefix])
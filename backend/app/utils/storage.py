@@ -0,0 +1,239 @@
+"""Storage backend interface — R2 in production, local filesystem for benchmarks.
+
+Object I/O (``r2_async``, ``object_cache``, the bulk purge) and presigning
+(``r2.generate_presigned_url``) go through ``get_backend()``, selected by
+``settings.storage_backend``:
+
+    r2     ``r2_async.AsyncR2Client`` — SigV4-signed S3 API against the bucket
+    local  ``LocalStorageBackend`` — files under ``settings.local_storage_dir``
+
+The local backend's "presigned" URLs point at the API's own
+``GET /api/v1/storage/{key}`` route with an HMAC-signed expiry, so iOS,
+the activities' image downloads and the eval judges fetch images exactly as
+they would from R2. With it the generate/edit/shopping pipelines and their
+benchmarks run on one machine with no bucket. Both backends raise botocore
+``ClientError`` with boto3's error codes, so callers don't care which is live.
+Reads with ``max_bytes`` raise ``ObjectTooLargeError`` from the object's
+stored size, before its body is transferred.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import mimetypes
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Protocol
+from urllib.parse import quote, urlencode
+
+from botocore.exceptions import ClientError
+
+from app.config import settings
+
+LIST_PAGE_SIZE = 1000
+
+
+class ObjectTooLargeError(Exception):
+    """Raised when an object's stored size exceeds the caller's ``max_bytes``."""
+
+    def __init__(self, key: str, size: int) -> None:
+        super().__init__(f"Object {key[:100]} is {size} bytes")
+        self.key = key
+        self.size = size
+
+
+class StorageBackend(Protocol):
+    """Async object store for one bucket, with presigned GET URLs."""
+
+    async def put_object(self, key: str, data: bytes, content_type: str) -> dict[str, str]: ...
+
+    async def get_object(
+        self, key: str, max_bytes: int | None = None
+    ) -> tuple[bytes, dict[str, str]]: ...
+
+    async def get_object_if_none_match(
+        self, key: str, etag: str, max_bytes: int | None = None
+    ) -> tuple[bytes, dict[str, str]] | None: ...
+
+    async def head_object(self, key: str) -> dict[str, str]: ...
+
+    async def delete_object(self, key: str) -> None: ...
+
+    async def list_objects(
+        self, prefix: str, continuation_token: str | None = None
+    ) -> tuple[list[str], str | None]: ...
+
+    async def delete_objects(self, keys: list[str]) -> list[dict[str, str]]: ...
+
+    def presign_get(self, key: str, expires_in: int) -> str: ...
+
+    async def aclose(self) -> None: ...
+
+
+def _not_found(operation: str, head: bool = False) -> ClientError:
+    # Like boto3: HEAD has no error body, so its code is the bare status
+    error: Any = {
+        "Error": {"Code": "404" if head else "NoSuchKey", "Message": "Not Found"},
+        "ResponseMetadata": {"HTTPStatusCode": 404},
+    }
+    return ClientError(error, operation)
+
+
+def _etag(data: bytes) -> str:
+    return f'"{hashlib.md5(data).hexdigest()}"'  # noqa: S324 - S3-style ETag, not security
+
+
+def _headers(data: bytes, key: str) -> dict[str, str]:
+    return {
+        "etag": _etag(data),
+        "content-type": mimetypes.guess_type(key)[0] or "application/octet-stream",
+        "content-length": str(len(data)),
+    }
+
+
+def url_signature(key: str, expires: int) -> str:
+    """HMAC of key + expiry for local presigned URLs (shared by API and worker)."""
+    message = f"{key}\n{expires}".encode()
+    secret = settings.local_storage_signing_key.encode()
+    return hmac.new(secret, message, hashlib.sha256).hexdigest()
+
+
+def verify_url_signature(key: str, expires: int, signature: str) -> bool:
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(url_signature(key, expires), signature)
+
+
+class LocalStorageBackend:
+    """Objects as files under ``root``; one file per key, directories per prefix."""
+
+    def __init__(self, root: Path, base_url: str) -> None:
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def path_for(self, key: str) -> Path:
+        """File path of ``key``; rejects keys that would escape the root."""
+        parts = key.split("/")
+        if not key or key.startswith("/") or any(p in ("", ".", "..") for p in parts):
+            raise ValueError(f"Invalid storage key: {key!r}")
+        return self.root.joinpath(*parts)
+
+    async def put_object(self, key: str, data: bytes, content_type: str) -> dict[str, str]:
+        await asyncio.to_thread(self._write, self.path_for(key), data)
+        return {"etag": _etag(data)}
+
+    async def get_object(
+        self, key: str, max_bytes: int | None = None
+    ) -> tuple[bytes, dict[str, str]]:
+        path = self.path_for(key)
+        if max_bytes is not None:
+            size = await asyncio.to_thread(self._size, path)
+            if size is not None and size > max_bytes:
+                raise ObjectTooLargeError(key, size)
+        data = await asyncio.to_thread(self._read, path)
+        if data is None:
+            raise _not_found("GetObject")
+        return data, _headers(data, key)
+
+    async def get_object_if_none_match(
+        self, key: str, etag: str, max_bytes: int | None = None
+    ) -> tuple[bytes, dict[str, str]] | None:
+        data, headers = await self.get_object(key, max_bytes)
+        return None if headers["etag"] == etag else (data, headers)
+
+    async def head_object(self, key: str) -> dict[str, str]:
+        data = await asyncio.to_thread(self._read, self.path_for(key))
+        if data is None:
+            raise _not_found("HeadObject", head=True)
+        return _headers(data, key)
+
+    async def delete_object(self, key: str) -> None:
+        await asyncio.to_thread(self.path_for(key).unlink, missing_ok=True)
+
+    async def list_objects(
+        self, prefix: str, continuation_token: str | None = None
+    ) -> tuple[list[str], str | None]:
+        keys = await asyncio.to_thread(self._keys_under, prefix)
+        after = [k for k in keys if continuation_token is None or k > continuation_token]
+        page = after[:LIST_PAGE_SIZE]
+        return page, (page[-1] if len(after) > LIST_PAGE_SIZE else None)
+
+    async def delete_objects(self, keys: list[str]) -> list[dict[str, str]]:
+        await asyncio.to_thread(self._unlink_all, [self.path_for(k) for k in keys])
+        return []
+
+    def presign_get(self, key: str, expires_in: int) -> str:
+        expires = int(time.time()) + expires_in
+        query = urlencode({"expires": expires, "signature": url_signature(key, expires)})
+        return f"{self.base_url}/api/v1/storage/{quote(key, safe='/~')}?{query}"
+
+    async def aclose(self) -> None:
+        pass
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)  # readers never see a partial object
+
+    @staticmethod
+    def _unlink_all(paths: list[Path]) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _size(path: Path) -> int | None:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _read(path: Path) -> bytes | None:
+        try:
+            return path.read_bytes()
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+
+    def _keys_under(self, prefix: str) -> list[str]:
+        if not self.root.is_dir():
+            return []
+        keys = (
+            p.relative_to(self.root).as_posix()
+            for p in self.root.rglob("*")
+            if p.is_file() and not p.name.startswith(".tmp-")
+        )
+        return sorted(k for k in keys if k.startswith(prefix))
+
+
+_local: LocalStorageBackend | None = None
+
+
+def get_local_backend() -> LocalStorageBackend:
+    """Lazy-init singleton local backend."""
+    global _local  # noqa: PLW0603
+    if _local is None:
+        root = settings.local_storage_dir or os.path.join(tempfile.gettempdir(), "remo-storage")
+        _local = LocalStorageBackend(Path(root), settings.local_storage_base_url)
+    return _local
+
+
+def get_backend() -> StorageBackend:
+    """The configured storage backend (process-wide singleton)."""
+    if settings.storage_backend == "local":
+        return get_local_backend()
+    from app.utils.r2_async import _get_client
+
+    return _get_client()
+
+
+def reset_backend() -> None:
+    """Drop the local backend singleton (for testing)."""
+    global _local  # noqa: PLW0603
+    _local = None
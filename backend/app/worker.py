@@ -16,9 +16,16 @@ from temporalio.client import Client
 from temporalio.contrib.pydantic import pydantic_data_converter
 from temporalio.worker import Worker
 
-from app.activities.purge import purge_project_data
+from app.activities.purge import purge_project_data, purge_projects
 from app.config import settings
 from app.logging import configure_logging
+from app.utils.blob_store import stats as blob_store_stats
+from app.utils.gemini_chat import close_clients as close_gemini_clients
+from app.utils.gemini_chat import open_client as open_gemini_client
+from app.utils.http_pool import close_clients as close_http_clients
+from app.utils.http_pool import open_clients as open_http_clients
+from app.utils.object_cache import stats as object_cache_stats
+from app.utils.r2_async import close_client as close_r2_client
 from app.workflows.design_project import DesignProjectWorkflow
 
 logger = structlog.get_logger()
@@ -56,6 +63,7 @@ def _load_activities() -> list:
         analyze_room_photos,
         load_style_skill,
         purge_project_data,
+        purge_projects,
     ]
 
 
@@ -124,8 +132,15 @@ async def run_worker() -> None:
         activity_count=len(ACTIVITIES),
     )
 
-    await worker.run()
-    logger.info("worker_stopped")
+    open_http_clients()
+    open_gemini_client()
+    try:
+        await worker.run()
+    finally:
+        await close_r2_client()
+        await close_http_clients()
+        await close_gemini_clients()
+    logger.info("worker_stopped", object_cache=object_cache_stats(), blob_store=blob_store_stats())
 
 
 def main() -> None:
@@ -221,6 +221,7 @@ class DesignProjectWorkflow:
                             base_image_url=self.current_image or "",
                             revised_image_url=result.revised_image_url,
                             instructions=self._extract_instructions(action_type, payload),
+                            variants=result.revised_image_variants,
                         )
                     )
                     self.current_image = result.revised_image_url
@@ -365,6 +366,11 @@ class DesignProjectWorkflow:
     async def add_photo(self, photo: PhotoData) -> None:
         self.photos.append(photo)
 
+    @workflow.signal
+    async def add_photos(self, photos: list[PhotoData]) -> None:
+        """Batch variant of add_photo — one signal for a multi-file upload."""
+        self.photos.extend(photos)
+
     @workflow.signal
     async def update_photo_note(self, photo_id: str, note: str | None) -> None:
         for photo in self.photos:
@@ -604,6 +610,7 @@ class DesignProjectWorkflow:
             revision_history=self.revision_history,
             room_dimensions=self.scan_data.room_dimensions if self.scan_data else None,
             room_context=self.room_context,
+            project_id=self._project_id,
         )
 
     # --- Eager analysis (Designer Brain) ---
@@ -0,0 +1,50 @@
+"""Add photo_validation_verdicts cache table.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16
+
+Persistent tier of the photo validation verdict cache (enabled with
+VALIDATION_CACHE_PERSIST). Keyed by content hash + photo_type + verdict
+version; not tied to a project, so purge leaves it alone — rows hold only
+pass/fail flags and user-facing messages. Expiry is enforced at read time
+from created_at, and the API prunes expired rows on write
+(DELETE ... WHERE created_at < now() - ttl); the created_at index keeps
+that a range scan instead of a full table scan.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "photo_validation_verdicts",
+        sa.Column("cache_key", sa.String(128), primary_key=True),
+        sa.Column("verdict", JSONB, nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "idx_photo_validation_verdicts_created_at",
+        "photo_validation_verdicts",
+        ["created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "idx_photo_validation_verdicts_created_at",
+        table_name="photo_validation_verdicts",
+    )
+    op.drop_table("photo_validation_verdicts")
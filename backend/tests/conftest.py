@@ -9,3 +9,70 @@ async def client():
     """Async test client for FastAPI integration tests."""
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
+
+
+@pytest.fixture(autouse=True)
+def _fresh_presign_cache():
+    """Presigned URLs are cached per key; don't let one test's URLs leak into the next."""
+    from app.utils import r2
+
+    r2._presign_cache = None
+    yield
+    r2._presign_cache = None
+
+
+@pytest.fixture(autouse=True)
+def _fresh_object_cache(tmp_path, monkeypatch):
+    """Each test gets an empty R2 object cache on its own disk directory."""
+    from app.config import settings
+    from app.utils import object_cache
+
+    monkeypatch.setattr(settings, "object_cache_dir", str(tmp_path / "object-cache"))
+    object_cache.reset_cache()
+    yield
+    object_cache.reset_cache()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_http_pool():
+    """Pooled HTTP clients are created per test, so ``patch("httpx.AsyncClient")`` applies."""
+    from app.utils import http_pool
+
+    http_pool.reset_clients()
+    yield
+    http_pool.reset_clients()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_gemini_state():
+    """Gemini clients and the concurrency semaphore are loop-bound; rebuild them per test."""
+    from app.utils import gemini_chat
+
+    gemini_chat.reset_clients()
+    gemini_chat.reset_call_slots()
+    yield
+    gemini_chat.reset_clients()
+    gemini_chat.reset_call_slots()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_blob_store():
+    """Blob references recorded by one test must not short-circuit the next."""
+    from app.utils import blob_store
+
+    blob_store.reset()
+    yield
+    blob_store.reset()
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    """Select the local filesystem storage backend, rooted in a temp directory."""
+    from app.config import settings
+    from app.utils import storage
+
+    monkeypatch.setattr(settings, "storage_backend", "local")
+    monkeypatch.setattr(settings, "local_storage_dir", str(tmp_path / "storage"))
+    storage.reset_backend()
+    yield storage.get_local_backend()
+    storage.reset_backend()
@@ -692,19 +692,19 @@ class TestPromptAB:
                 print("Editing...", end=" ", flush=True)
                 client = get_client()
                 try:
-                    chat = await asyncio.to_thread(create_chat, client)
+                    chat = create_chat(client)
                     # Turn 1: context (room photo + base design)
                     context_parts = [room_image, base_design, CONTEXT_PROMPT]
-                    await asyncio.to_thread(chat.send_message, context_parts)
+                    await chat.send_message(context_parts)
                     # Turn 2: edit with CLEAN base image + text coordinates
                     edit_parts = [base_design, edit_prompt]
-                    response = await asyncio.to_thread(chat.send_message, edit_parts)
+                    response = await chat.send_message(edit_parts)
                     result_image = extract_image(response)
 
                     if result_image is None:
                         # Retry
                         retry = "Please generate the edited room image now. Output only a clean photograph."
-                        response = await asyncio.to_thread(chat.send_message, retry)
+                        response = await chat.send_message(retry)
                         result_image = extract_image(response)
 
                 except Exception as e:
@@ -321,14 +321,14 @@ class TestAnalyzeRoomPhotosActivity:
         mock_client = MagicMock()
         mock_client.messages.create = AsyncMock(return_value=mock_response)
 
-        mock_resolve = MagicMock(
+        mock_resolve = AsyncMock(
             side_effect=lambda urls: [f"https://presigned.r2/{u}" for u in urls]
         )
 
         with (
             patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test-key"}),
             patch("app.activities.analyze_room.anthropic.AsyncAnthropic", return_value=mock_client),
-            patch("app.utils.r2.resolve_urls", mock_resolve),
+            patch("app.utils.r2.presign_batch", mock_resolve),
         ):
             from app.activities.analyze_room import analyze_room_photos
 
@@ -338,10 +338,10 @@ class TestAnalyzeRoomPhotosActivity:
             )
             await analyze_room_photos(input)
 
-        # resolve_urls should be called twice: once for room, once for inspiration
-        assert mock_resolve.call_count == 2
-        mock_resolve.assert_any_call(["projects/p1/photos/room.jpg"])
-        mock_resolve.assert_any_call(["projects/p1/photos/inspo.jpg"])
+        # Room and inspiration keys are presigned together in one batch
+        mock_resolve.assert_awaited_once_with(
+            ["projects/p1/photos/room.jpg", "projects/p1/photos/inspo.jpg"]
+        )
 
         # The API call should receive resolved URLs, not raw keys
         call_args = mock_client.messages.create.call_args
@@ -448,11 +448,11 @@ class TestAnalyzeRoomPhotosActivity:
     @pytest.mark.asyncio
     async def test_r2_resolve_failure_propagates(self):
         """R2 URL resolution failure should propagate as an unhandled exception."""
-        mock_resolve = MagicMock(side_effect=Exception("R2 service unavailable"))
+        mock_resolve = AsyncMock(side_effect=Exception("R2 service unavailable"))
 
         with (
             patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test-key"}),
-            patch("app.utils.r2.resolve_urls", mock_resolve),
+            patch("app.utils.r2.presign_batch", mock_resolve),
             pytest.raises(Exception, match="R2 service unavailable"),
         ):
             from app.activities.analyze_room import analyze_room_photos
@@ -5,6 +5,7 @@ intake -> select -> iterate -> approve. Verifies status codes, response
 shapes, and step transition logic.
 """
 
+import asyncio
 import io
 import time
 from unittest.mock import AsyncMock, patch
@@ -29,6 +30,7 @@ from app.models.contracts import (
     RoomContext,
     ValidatePhotoOutput,
 )
+from app.utils.image_pool import ImagePoolSaturatedError, ImageWorkPool
 
 # Reusable mock validation results
 _VALID = ValidatePhotoOutput(passed=True, failures=[], messages=["Photo looks great!"])
@@ -100,6 +102,61 @@ class TestGetProjectState:
         assert body["iteration_count"] == 0
         assert body["approved"] is False
 
+    @pytest.mark.asyncio
+    async def test_presigns_image_variants(self, client, project_id):
+        """Preview/thumbnail keys on photos, options and revisions are presigned."""
+        from app.models.contracts import DesignOption, ImageVariants, RevisionRecord
+
+        def variants(stem: str) -> ImageVariants:
+            return ImageVariants(
+                preview_url=f"projects/p/{stem}.preview.jpg",
+                thumbnail_url=f"projects/p/{stem}.thumbnail.jpg",
+            )
+
+        state = _mock_states[project_id]
+        state.photos = [
+            PhotoData(
+                photo_id="r1",
+                storage_key="projects/p/photos/r1.jpg",
+                photo_type="room",
+                variants=variants("photos/r1"),
+            )
+        ]
+        state.generated_options = [
+            DesignOption(image_url="projects/p/generated/option_0.png", caption="A"),
+            DesignOption(
+                image_url="projects/p/generated/option_1.png",
+                caption="B",
+                variants=variants("generated/option_1"),
+            ),
+        ]
+        state.revision_history = [
+            RevisionRecord(
+                revision_number=1,
+                type="feedback",
+                base_image_url="projects/p/generated/option_1.png",
+                revised_image_url="projects/p/revisions/abc.png",
+                variants=variants("revisions/abc"),
+            )
+        ]
+
+        with patch(
+            "app.utils.r2.generate_presigned_url",
+            side_effect=lambda key: f"https://signed.example.com/{key}",
+        ):
+            body = (await client.get(f"/api/v1/projects/{project_id}")).json()
+
+        signed = "https://signed.example.com/projects/p"
+        assert body["photos"][0]["variants"]["thumbnail_url"] == f"{signed}/photos/r1.thumbnail.jpg"
+        assert body["generated_options"][0]["variants"] is None
+        assert body["generated_options"][1]["variants"] == {
+            "preview_url": f"{signed}/generated/option_1.preview.jpg",
+            "thumbnail_url": f"{signed}/generated/option_1.thumbnail.jpg",
+        }
+        assert body["revision_history"][0]["variants"]["preview_url"] == (
+            f"{signed}/revisions/abc.preview.jpg"
+        )
+
     @pytest.mark.asyncio
     async def test_not_found_returns_404(self, client):
         """Nonexistent project returns 404 with ErrorResponse shape."""
@@ -437,6 +494,270 @@ class TestPhotoUpload:
         assert resp.json()["error"] == "wrong_step"
 
 
+def _batch_files(*names: str) -> list[tuple[str, tuple[str, io.BytesIO, str]]]:
+    return [("files", (name, io.BytesIO(b"img"), "image/jpeg")) for name in names]
+
+
+class TestBatchPhotoUpload:
+    """POST /api/v1/projects/{id}/photos/batch"""
+
+    @pytest.mark.asyncio
+    @patch("app.api.routes.projects.validate_photo", return_value=_VALID)
+    async def test_batch_adds_all_valid_photos(self, _mock_val, client, project_id):
+        """All passing photos are added, results returned in upload order."""
+        resp = await client.post(
+            f"/api/v1/projects/{project_id}/photos/batch",
+            files=_batch_files("r1.jpg", "r2.jpg", "i1.jpg"),
+            data={"photo_types": ["room", "room", "inspiration"]},
+        )
+        assert resp.status_code == 200
+        results = resp.json()["photos"]
+        assert len(results) == 3
+        photos = _mock_states[project_id].photos
+        assert [p.photo_id for p in photos] == [r["photo_id"] for r in results]
+        assert [p.photo_type for p in photos] == ["room", "room", "inspiration"]
+
+    @pytest.mark.asyncio
+    async def test_batch_validates_concurrently(self, client, project_id):
+        """Validations overlap instead of running one after another."""
+        in_flight = 0
+        peak = 0
+
+        async def _validate(_inp):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _VALID
+
+        with patch("app.api.routes.projects.validate_photo", side_effect=_validate):
+            resp = await client.post(
+                f"/api/v1/projects/{project_id}/photos/batch",
+                files=_batch_files("r1.jpg", "r2.jpg"),
+                data={"photo_types": ["room", "room"]},
+            )
+        assert resp.status_code == 200
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    @patch("app.api.routes.projects.validate_photo", side_effect=[_VALID, _INVALID])
+    async def test_batch_partial_rejection(self, _mock_val, client, project_id):
+        """Rejected photos are reported but only passing ones are added."""
+        resp = await client.post(
+            f"/api/v1/projects/{project_id}/photos/batch",
+            files=_batch_files("r1.jpg", "blurry.jpg"),
+            data={"photo_types": ["room", "room"]},
+        )
+        assert resp.status_code == 200
+        results = resp.json()["photos"]
+        assert [r["validation"]["passed"] for r in results] == [True, False]
+        photos = _mock_states[project_id].photos
+        assert [p.photo_id for p in photos] == [results[0]["photo_id"]]
+
+    @pytest.mark.asyncio
+    async def test_batch_photo_types_mismatch_returns_422(self, client, project_id):
+        """Each file needs exactly one photo_types entry."""
+        resp = await client.post(
+            f"/api/v1/projects/{project_id}/photos/batch",
+            files=_batch_files("r1.jpg", "r2.jpg"),
+            data={"photo_types": ["room"]},
+        )
+        assert resp.status_code == 422
+        assert resp.json()["error"] == "photo_types_mismatch"
+
+    @pytest.mark.asyncio
+    async def test_batch_too_many_photos_returns_422(self, client, project_id):
+        """Batches above MAX_BATCH_PHOTOS are rejected."""
+        names = [f"r{i}.jpg" for i in range(6)]
+        resp = await client.post(
+            f"/api/v1/projects/{project_id}/photos/batch",
+            files=_batch_files(*names),
+            data={"photo_types": ["room"] * 6},
+        )
+        assert resp.status_code == 422
+        assert resp.json()["error"] == "too_many_photos"
+
+    @pytest.mark.asyncio
+    @patch("app.api.routes.projects.validate_photo", return_value=_VALID)
+    async def test_batch_inspiration_limit_counts_existing(self, mock_val, client, project_id):
+        """PHOTO-10: existing + batch inspiration photos must not exceed the max."""
+        _mock_states[project_id].photos = [
+            PhotoData(photo_id="i0", storage_key="s3://i0.jpg", photo_type="inspiration"),
+            PhotoData(photo_id="i1", storage_key="s3://i1.jpg", photo_type="inspiration"),
+        ]
+        resp = await client.post(
+            f"/api/v1/projects/{project_id}/photos/batch",
+            files=_batch_files("i2.jpg", "i3.jpg"),
+            data={"photo_types": ["inspiration", "inspiration"]},
+        )
+        assert resp.status_code == 422
+        assert resp.json()["error"] == "too_many_inspiration_photos"
+        mock_val.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.api.routes.projects.validate_photo", return_value=_VALID)
+    async def test_batch_file_too_large_returns_413(self, mock_val, client, project_id):
+        """One oversize file rejects the whole batch before any validation."""
+        big = io.BytesIO(b"\x00" * (20 * 1024 * 1024 + 1))
+        resp = await client.post(
+            f"/api/v1/projects/{project_id}/photos/batch",
+            files=[
+                ("files", ("r1.jpg", io.BytesIO(b"img"), "image/jpeg")),
+                ("files", ("big.jpg", big, "image/jpeg")),
+            ],
+            data={"photo_types": ["room", "room"]},
+        )
+        assert resp.status_code == 413
+        mock_val.assert_not_called()
+        assert _mock_states[project_id].photos == []
+
+    @pytest.mark.asyncio
+    async def test_batch_blocked_during_intake_step(self, client, project_id):
+        """Batch uploads follow the same step gate as single uploads."""
+        _mock_states[project_id].step = "intake"
+        resp = await client.post(
+            f"/api/v1/projects/{project_id}/photos/batch",
+            files=_batch_files("late.jpg"),
+            data={"photo_types": ["room"]},
+        )
+        assert resp.status_code == 409
+
+
+def _hashed(perceptual_hash: str) -> ValidatePhotoOutput:
+    return _VALID.model_copy(update={"perceptual_hash": perceptual_hash})
+
+
+class TestPhotoNearDuplicates:
+    """Near-duplicate photos (perceptual hash match) are rejected at upload."""
+
+    @pytest.mark.asyncio
+    @patch("app.api.routes.projects.validate_photo")
+    async def test_duplicate_of_existing_photo_rejected(self, mock_val, client, project_id):
+        """A photo within the hash distance of an existing one is not added."""
+        _mock_states[project_id].photos = [
+            PhotoData(
+                photo_id="r0",
+                storage_key="s3://r0.jpg",
+                photo_type="room",
+                perceptual_hash="00000000000000ff",
+            ),
+        ]
+        mock_val.return_value = _hashed("00000000000000fe")
+        resp = await client.post(
+            f"/api/v1/projects/{project_id}/photos",
+            files={"file": ("room.jpg", io.BytesIO(b"img"), "image/jpeg")},
+        )
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["duplicate_of"] == "r0"
+        assert body["validation"]["passed"] is False
+        assert body["validation"]["failures"] == ["duplicate_photo"]
+        assert [p.photo_id for p in _mock_states[project_id].photos] == ["r0"]
+
+    @pytest.mark.asyncio
+    @patch("app.api.routes.projects.validate_photo")
+    async def test_distinct_photo_stored_with_hash(self, mock_val, client, project_id):
+        """A non-duplicate is added and keeps its hash for later comparisons."""
+        mock_val.return_value = _hashed("ffffffffffffffff")
+        resp = await client.post(
+            f"/api/v1/projects/{project_id}/photos",
+            files={"file": ("room.jpg", io.BytesIO(b"img"), "image/jpeg")},
+        )
+        assert resp.json()["duplicate_of"] is None
+        assert _mock_states[project_id].photos[0].perceptual_hash == "ffffffffffffffff"
+
+    @pytest.mark.asyncio
+    @patch("app.api.routes.projects.validate_photo")
+    async def test_duplicate_within_batch_rejected(self, mock_val, client, project_id):
+        """The second of two near-identical photos in one batch is rejected."""
+        mock_val.side_effect = [_hashed("0f0f0f0f0f0f0f0f"), _hashed("0f0f0f0f0f0f0f0e")]
+        resp = await client.post(
+            f"/api/v1/projects/{project_id}/photos/batch",
+            files=_batch_files("r1.jpg", "r1_again.jpg"),
+            data={"photo_types": ["room", "room"]},
+        )
+        assert resp.status_code == 200
+        results = resp.json()["photos"]
+        assert [r["validation"]["passed"] for r in results] == [True, False]
+        assert results[1]["duplicate_of"] == results[0]["photo_id"]
+        photos = _mock_states[project_id].photos
+        assert [p.photo_id for p in photos] == [results[0]["photo_id"]]
+
+
+class TestPhotoUploadBackpressure:
+    """Image pool saturation -> 503 + Retry-After on photo uploads."""
+
+    @pytest.fixture
+    def saturated_pool(self):
+        pool = ImageWorkPool(workers=0, max_pending=0, retry_after_seconds=4)
+        with patch("app.api.routes.projects.get_image_pool", return_value=pool):
+            yield pool
+
+    @pytest.mark.asyncio
+    @patch("app.api.routes.projects.validate_photo", return_value=_VALID)
+    async def test_saturated_pool_returns_503(self, mock_val, saturated_pool, client, project_id):
+        """Upload is shed before validation when no pool slot is free."""
+        resp = await client.post(
+            f"/api/v1/projects/{project_id}/photos",
+            files={"file": ("room.jpg", io.BytesIO(b"img"), "image/jpeg")},
+        )
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "4"
+        body = resp.json()
+        assert body["error"] == "image_pool_busy"
+        assert body["retryable"] is True
+        mock_val.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch(
+        "app.api.routes.projects.validate_photo",
+        side_effect=ImagePoolSaturatedError(retry_after_seconds=7),
+    )
+    async def test_admission_race_returns_503(self, _mock_val, client, project_id):
+        """Saturation detected inside validate_photo also maps to 503."""
+        resp = await client.post(
+            f"/api/v1/projects/{project_id}/photos",
+            files={"file": ("room.jpg", io.BytesIO(b"img"), "image/jpeg")},
+        )
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "7"
+        assert _mock_states[project_id].photos == []
+
+    @pytest.mark.asyncio
+    @patch(
+        "app.api.routes.projects.validate_photo",
+        side_effect=[_VALID, ImagePoolSaturatedError(retry_after_seconds=2)],
+    )
+    async def test_batch_partial_saturation_rejects_whole_batch(
+        self, _mock_val, client, project_id
+    ):
+        """One rejected admission fails the batch; nothing is added."""
+        resp = await client.post(
+            f"/api/v1/projects/{project_id}/photos/batch",
+            files=_batch_files("r1.jpg", "r2.jpg"),
+            data={"photo_types": ["room", "room"]},
+        )
+        assert resp.status_code == 503
+        assert "Retry-After" in resp.headers
+        assert _mock_states[project_id].photos == []
+
+    @pytest.mark.asyncio
+    @patch("app.api.routes.projects.validate_photo", return_value=_VALID)
+    async def test_batch_larger_than_free_capacity_shed_upfront(self, mock_val, client, project_id):
+        """A batch that can't fit in the pool is rejected before any validation starts."""
+        pool = ImageWorkPool(workers=0, max_pending=4, retry_after_seconds=3)
+        with patch("app.api.routes.projects.get_image_pool", return_value=pool):
+            resp = await client.post(
+                f"/api/v1/projects/{project_id}/photos/batch",
+                files=_batch_files("r1.jpg", "r2.jpg", "i1.jpg"),
+                data={"photo_types": ["room", "room", "inspiration"]},
+            )
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "3"
+        mock_val.assert_not_called()
+
+
 class TestPhotoDelete:
     """DELETE /api/v1/projects/{id}/photos/{photoId} — INT-3."""
 
@@ -0,0 +1,129 @@
+"""Tests for the content-addressed blob store, on the local storage backend."""
+
+import hashlib
+
+import pytest
+
+from app.utils import blob_store
+from app.utils.blob_store import blob_key, get_blob, put_blob, release_project_blobs
+
+PNG = b"\x89PNG fake image bytes"
+DIGEST = hashlib.sha256(PNG).hexdigest()
+
+
+async def _keys(backend, prefix: str = "") -> list[str]:
+    keys, _ = await backend.list_objects(prefix)
+    return keys
+
+
+class TestBlobKey:
+    def test_key_is_hash_plus_extension(self):
+        assert blob_key(PNG, "image/png") == f"blobs/{DIGEST}.png"
+        assert blob_key(PNG, "image/webp").endswith(".webp")
+
+    def test_unknown_content_type(self):
+        assert blob_key(PNG, "application/x-unknown").endswith(".bin")
+
+
+class TestPutBlob:
+    @pytest.mark.asyncio
+    async def test_stores_bytes_and_both_references(self, local_storage):
+        key = await put_blob("p1", PNG, "image/png")
+
+        assert await get_blob(key) == PNG
+        assert await _keys(local_storage) == [
+            f"blob-refs/{DIGEST}/p1",
+            key,
+            f"projects/p1/blob-refs/{DIGEST}",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_same_bytes_uploaded_once_across_projects(self, local_storage):
+        first = await put_blob("p1", PNG, "image/png")
+        again = await put_blob("p1", PNG, "image/png")
+        other = await put_blob("p2", PNG, "image/png")
+
+        assert first == again == other
+        assert blob_store.stats()["uploads"] == 1
+        assert blob_store.stats()["dedup_hits"] == 2
+        assert await _keys(local_storage, "blob-refs/") == [
+            f"blob-refs/{DIGEST}/p1",
+            f"blob-refs/{DIGEST}/p2",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_reference_recorded_by_another_worker_skips_writes(self, local_storage):
+        await put_blob("p1", PNG, "image/png")
+        blob_store.reset()  # a fresh process that has not seen this reference
+
+        await put_blob("p1", PNG, "image/png")
+
+        assert blob_store.stats() == {
+            "uploads": 0,
+            "dedup_hits": 1,
+            "bytes_uploaded": 0,
+            "bytes_deduplicated": len(PNG),
+        }
+
+    @pytest.mark.asyncio
+    async def test_assume_new_skips_existence_probes(self, local_storage):
+        from unittest.mock import patch
+
+        with patch("app.utils.r2_async.head_object") as head:
+            key = await put_blob("p1", PNG, "image/png", assume_new=True)
+
+        head.assert_not_called()
+        assert await get_blob(key) == PNG
+        assert await _keys(local_storage) == [
+            f"blob-refs/{DIGEST}/p1",
+            key,
+            f"projects/p1/blob-refs/{DIGEST}",
+        ]
+
+
+class TestReleaseProjectBlobs:
+    @pytest.mark.asyncio
+    async def test_orphaned_blob_and_variants_deleted(self, local_storage):
+        key = await put_blob("p1", PNG, "image/png")
+        await local_storage.put_object(f"blobs/{DIGEST}.preview.jpg", b"jpg", "image/jpeg")
+
+        deleted = await release_project_blobs(["p1"])
+
+        assert deleted == 2
+        assert await _keys(local_storage, "blobs/") == []
+        assert await _keys(local_storage, "blob-refs/") == []
+        assert key not in await _keys(local_storage)
+
+    @pytest.mark.asyncio
+    async def test_blob_shared_with_another_project_kept(self, local_storage):
+        key = await put_blob("p1", PNG, "image/png")
+        await put_blob("p2", PNG, "image/png")
+
+        deleted = await release_project_blobs(["p1"])
+
+        assert deleted == 0
+        assert await get_blob(key) == PNG
+        assert await _keys(local_storage, "blob-refs/") == [f"blob-refs/{DIGEST}/p2"]
+
+    @pytest.mark.asyncio
+    async def test_releasing_every_referencing_project_deletes_blob(self, local_storage):
+        await put_blob("p1", PNG, "image/png")
+        await put_blob("p2", PNG, "image/png")
+        await put_blob("p2", b"other bytes", "image/png")
+
+        deleted = await release_project_blobs(["p1", "p2"])
+
+        assert deleted == 2
+        assert await _keys(local_storage, "blobs/") == []
+
+    @pytest.mark.asyncio
+    async def test_project_without_blobs(self, local_storage):
+        assert await release_project_blobs(["nothing-here"]) == 0
+
+    @pytest.mark.asyncio
+    async def test_released_project_stores_again(self, local_storage):
+        key = await put_blob("p1", PNG, "image/png")
+        await release_project_blobs(["p1"])
+
+        assert await put_blob("p1", PNG, "image/png") == key
+        assert await get_blob(key) == PNG
@@ -1845,6 +1845,8 @@ class TestAllModelsImportable:
             "LoadSkillOutput",
             "ValidatePhotoInput",
             "ValidatePhotoOutput",
+            "PurgeProjectsInput",
+            "PurgeProjectsOutput",
             "WorkflowState",
             "CreateProjectRequest",
             "CreateProjectResponse",
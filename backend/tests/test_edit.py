@@ -5,6 +5,7 @@ Integration tests marked with @pytest.mark.integration.
 """
 
 import io
+from contextlib import asynccontextmanager
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -426,6 +427,22 @@ def _image_bytes(img: Image.Image) -> bytes:
     return buf.getvalue()
 
 
+def _mock_stream(response: MagicMock | None = None, error: Exception | None = None):
+    """Stand-in for ``httpx.AsyncClient.stream``, yielding ``response`` (body = .content)."""
+
+    async def chunks():
+        yield response.content
+
+    @asynccontextmanager
+    async def stream(method, url, **kwargs):
+        if error is not None:
+            raise error
+        response.aiter_bytes = chunks
+        yield response
+
+    return stream
+
+
 def _mock_gemini_response(with_image: bool = True) -> MagicMock:
     """Create a mock Gemini response with optional image."""
     response = MagicMock()
@@ -486,7 +503,7 @@ class TestEditDesignActivity:
         )
 
         mock_chat = MagicMock()
-        mock_chat.send_message.return_value = _mock_gemini_response(with_image=True)
+        mock_chat.send_message = AsyncMock(return_value=_mock_gemini_response(with_image=True))
         mock_chat.get_history.return_value = []
 
         with (
@@ -527,7 +544,7 @@ class TestEditDesignActivity:
         )
 
         mock_chat = MagicMock()
-        mock_chat.send_message.return_value = _mock_gemini_response(with_image=True)
+        mock_chat.send_message = AsyncMock(return_value=_mock_gemini_response(with_image=True))
         mock_chat.get_history.return_value = []
 
         with (
@@ -716,7 +733,7 @@ class TestEditDesignActivity:
         )
 
         mock_chat = MagicMock()
-        mock_chat.send_message.return_value = _mock_gemini_response(with_image=True)
+        mock_chat.send_message = AsyncMock(return_value=_mock_gemini_response(with_image=True))
         mock_chat.get_history.return_value = []
 
         with (
@@ -747,9 +764,7 @@ class TestEditDesignActivity:
             assert mock_chat.send_message.call_count == 2
             # Verify the edit call included "Additional feedback"
             edit_call_args = mock_chat.send_message.call_args_list[1][0][0]
-            feedback_parts = [
-                p for p in edit_call_args if isinstance(p, str) and "Additional feedback" in p
-            ]
+            feedback_parts = [p for p in edit_call_args if "Additional feedback" in (p.text or "")]
             assert len(feedback_parts) == 1
 
     @pytest.mark.asyncio
@@ -765,11 +780,13 @@ class TestEditDesignActivity:
 
         mock_chat = MagicMock()
         # First send_message = context (ignored), second = text-only, third = retry with image
-        mock_chat.send_message.side_effect = [
-            _mock_gemini_response(with_image=True),  # context turn
-            _mock_gemini_response(with_image=False),  # edit turn: text-only
-            _mock_gemini_response(with_image=True),  # retry: success
-        ]
+        mock_chat.send_message = AsyncMock(
+            side_effect=[
+                _mock_gemini_response(with_image=True),  # context turn
+                _mock_gemini_response(with_image=False),  # edit turn: text-only
+                _mock_gemini_response(with_image=True),  # retry: success
+            ]
+        )
         mock_chat.get_history.return_value = []
 
         with (
@@ -818,11 +835,13 @@ class TestEditDesignActivity:
 
         mock_chat = MagicMock()
         # Context succeeds, edit returns text-only, retry returns text-only
-        mock_chat.send_message.side_effect = [
-            _mock_gemini_response(with_image=True),  # context
-            _mock_gemini_response(with_image=False),  # edit: text-only
-            _mock_gemini_response(with_image=False),  # retry: still text-only
-        ]
+        mock_chat.send_message = AsyncMock(
+            side_effect=[
+                _mock_gemini_response(with_image=True),  # context
+                _mock_gemini_response(with_image=False),  # edit: text-only
+                _mock_gemini_response(with_image=False),  # retry: still text-only
+            ]
+        )
         mock_chat.get_history.return_value = []
 
         with (
@@ -994,7 +1013,7 @@ class TestEditDesignActivity:
         ]
 
         # First call returns text-only, second (retry) returns image
-        mock_continue = MagicMock(
+        mock_continue = AsyncMock(
             side_effect=[
                 _mock_gemini_response(with_image=False),
                 _mock_gemini_response(with_image=True),
@@ -1058,7 +1077,7 @@ class TestEditDesignActivity:
         ]
 
         # Both calls return text-only
-        mock_continue = MagicMock(
+        mock_continue = AsyncMock(
             side_effect=[
                 _mock_gemini_response(with_image=False),
                 _mock_gemini_response(with_image=False),
@@ -1122,7 +1141,7 @@ class TestDownloadImageEdit:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
+            mock_client.stream = _mock_stream(mock_response)
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -1142,7 +1161,7 @@ class TestDownloadImageEdit:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
+            mock_client.stream = _mock_stream(mock_response)
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -1163,7 +1182,7 @@ class TestDownloadImageEdit:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
+            mock_client.stream = _mock_stream(mock_response)
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -1185,7 +1204,7 @@ class TestDownloadImageEdit:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
+            mock_client.stream = _mock_stream(mock_response)
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -1202,7 +1221,7 @@ class TestDownloadImageEdit:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.side_effect = httpx.TimeoutException("timed out")
+            mock_client.stream = _mock_stream(error=httpx.TimeoutException("timed out"))
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -1227,7 +1246,7 @@ class TestDownloadImages:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
+            mock_client.stream = _mock_stream(mock_response)
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -1242,25 +1261,191 @@ class TestDownloadImages:
         results = await download_images([])
         assert results == []
 
+    @pytest.mark.asyncio
+    async def test_storage_keys_read_through_object_cache(self):
+        from app.config import settings
+        from app.utils.http import download_images
+
+        img_bytes = _image_bytes(_make_test_image())
+        with patch("app.utils.object_cache.get_object", return_value=img_bytes) as mock_get:
+            results = await download_images(["projects/p1/photos/room.jpg"])
+
+        mock_get.assert_awaited_once_with(
+            "projects/p1/photos/room.jpg", max_bytes=settings.image_download_max_bytes
+        )
+        assert results[0].size == (100, 100)
+
+    @pytest.mark.asyncio
+    async def test_oversized_storage_object_non_retryable(self, monkeypatch):
+        from temporalio.exceptions import ApplicationError
+
+        from app.config import settings
+        from app.utils.http import download_images
+
+        monkeypatch.setattr(settings, "image_download_max_bytes", 16)
+        with (
+            patch("app.utils.object_cache.get_object", return_value=b"x" * 17),
+            pytest.raises(ApplicationError, match="exceeds 16 bytes") as exc_info,
+        ):
+            await download_images(["projects/p1/photos/huge.jpg"])
+        assert exc_info.value.non_retryable is True
+
+    @pytest.mark.asyncio
+    async def test_oversized_storage_object_rejected_before_download(self):
+        from temporalio.exceptions import ApplicationError
+
+        from app.utils.http import download_images
+        from app.utils.storage import ObjectTooLargeError
+
+        too_large = ObjectTooLargeError("projects/p1/photos/huge.jpg", 10**9)
+        with (
+            patch("app.utils.object_cache.get_object", side_effect=too_large),
+            pytest.raises(ApplicationError, match="exceeds") as exc_info,
+        ):
+            await download_images(["projects/p1/photos/huge.jpg"])
+        assert exc_info.value.non_retryable is True
+
+    @pytest.mark.asyncio
+    async def test_stream_abandoned_past_byte_budget(self, monkeypatch):
+        import httpx
+        from temporalio.exceptions import ApplicationError
+
+        from app.config import settings
+        from app.utils.http import fetch_image
+
+        sent: list[int] = []
+
+        async def body():
+            for _ in range(100):
+                sent.append(1)
+                yield b"x" * 1024
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, headers={"content-type": "image/jpeg"}, content=body())
+
+        monkeypatch.setattr(settings, "image_download_max_bytes", 4096)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with pytest.raises(ApplicationError, match="exceeds 4096 bytes") as exc_info:
+                await fetch_image(client, "https://example.com/huge.jpg")
+        assert exc_info.value.non_retryable is True
+        assert len(sent) < 100
+
+    @pytest.mark.asyncio
+    async def test_declared_length_over_budget_rejected_before_body(self, monkeypatch):
+        import httpx
+        from temporalio.exceptions import ApplicationError
+
+        from app.config import settings
+        from app.utils.http import fetch_image
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, headers={"content-type": "image/jpeg"}, content=b"x" * 5000)
+
+        monkeypatch.setattr(settings, "image_download_max_bytes", 4096)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with pytest.raises(ApplicationError, match="exceeds"):
+                await fetch_image(client, "https://example.com/huge.jpg")
+
+    @pytest.mark.asyncio
+    async def test_max_side_decodes_reduced(self):
+        from app.utils.http import download_image
+
+        buf = io.BytesIO()
+        Image.new("RGB", (1600, 1200), "blue").save(buf, format="JPEG")
+        with patch("app.utils.object_cache.get_object", return_value=buf.getvalue()):
+            full = await download_image("projects/p1/photos/room.jpg")
+            reduced = await download_image("projects/p1/photos/room.jpg", max_side=400)
+
+        assert full.size == (1600, 1200)
+        assert reduced.size == (400, 300)
+
+    @pytest.mark.asyncio
+    async def test_logs_transfer_rate_and_decode_time(self):
+        from app.utils.http import download_images
+
+        img_bytes = _image_bytes(_make_test_image())
+        with (
+            patch("app.utils.object_cache.get_object", return_value=img_bytes),
+            patch("app.utils.http.logger") as mock_logger,
+        ):
+            await download_images(["projects/p1/photos/room.jpg"])
+
+        event, fields = mock_logger.info.call_args.args[0], mock_logger.info.call_args.kwargs
+        assert event == "image_fetched"
+        assert fields["size_bytes"] == len(img_bytes)
+        assert {"bytes_per_second", "decode_ms", "read_ms"} <= fields.keys()
+
+    @pytest.mark.asyncio
+    async def test_storage_reads_bounded_per_call(self, monkeypatch):
+        import asyncio
+
+        from app.config import settings
+        from app.utils.http import download_images
+
+        img_bytes = _image_bytes(_make_test_image())
+        in_flight = peak = 0
+
+        async def slow_get(key, max_bytes=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return img_bytes
+
+        monkeypatch.setattr(settings, "image_read_concurrency", 2)
+        with patch("app.utils.object_cache.get_object", side_effect=slow_get):
+            results = await download_images([f"projects/p1/photos/{i}.jpg" for i in range(6)])
+
+        assert len(results) == 6
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_missing_storage_key_non_retryable(self):
+        from botocore.exceptions import ClientError
+        from temporalio.exceptions import ApplicationError
+
+        from app.utils.http import download_image
+
+        missing = ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        with (
+            patch("app.utils.object_cache.get_object", side_effect=missing),
+            pytest.raises(ApplicationError) as exc_info,
+        ):
+            await download_image("projects/p1/photos/gone.jpg")
+        assert exc_info.value.non_retryable is True
+
 
 class TestUploadImage:
     """Tests for _upload_image."""
 
-    def test_upload_image_returns_storage_key(self):
+    @pytest.mark.asyncio
+    async def test_upload_image_returns_storage_key(self, local_storage):
         """_upload_image returns an R2 key (not presigned URL) for stable storage."""
         from app.activities.edit import _upload_image
 
         img = _make_test_image()
 
-        with patch("app.utils.r2.upload_object") as mock_upload:
-            key = _upload_image(img, "proj-123")
-            # Returns storage key, not a presigned URL
-            assert key.startswith("projects/proj-123/revisions/")
-            assert key.endswith(".png")
-            assert not key.startswith("http")
-            mock_upload.assert_called_once()
-            call_args = mock_upload.call_args[0]
-            assert call_args[0] == key
+        key = await _upload_image(img, "proj-123")
+        # Returns a content-addressed storage key, not a presigned URL
+        assert key.startswith("blobs/")
+        assert key.endswith(".webp")
+        assert local_storage.path_for(key).exists()
+        assert local_storage.path_for(f"projects/proj-123/blob-refs/{key[6:-5]}").exists()
+
+    @pytest.mark.asyncio
+    async def test_identical_revision_is_stored_once(self, local_storage):
+        from app.activities.edit import _upload_image
+        from app.utils import blob_store
+
+        img = _make_test_image()
+
+        first = await _upload_image(img, "proj-123")
+        second = await _upload_image(img, "proj-123")
+
+        assert first == second
+        assert blob_store.stats()["uploads"] == 1
+        assert blob_store.stats()["dedup_hits"] == 1
 
 
 class TestBootstrapWithInspirationImages:
@@ -1279,7 +1464,7 @@ class TestBootstrapWithInspirationImages:
         )
 
         mock_chat = MagicMock()
-        mock_chat.send_message.return_value = _mock_gemini_response(with_image=True)
+        mock_chat.send_message = AsyncMock(return_value=_mock_gemini_response(with_image=True))
         mock_chat.get_history.return_value = []
 
         with (
@@ -1309,6 +1494,9 @@ class TestBootstrapWithInspirationImages:
             # Context message should include room + inspiration + base + prompt = 4 items
             context_call_args = mock_chat.send_message.call_args_list[0][0][0]
             assert len(context_call_args) == 4
+            # Images arrive pre-encoded as PNG parts, not raw PIL images
+            assert [p.inline_data.mime_type for p in context_call_args[:3]] == ["image/png"] * 3
+            assert context_call_args[3].text
 
 
 class TestContinueChatDirectly:
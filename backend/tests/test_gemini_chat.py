@@ -5,7 +5,7 @@ No API keys needed — uses mock data for serialization/deserialization tests.
 
 import base64
 import json
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from google.genai import types
@@ -314,7 +314,8 @@ class TestDeserializationValidation:
 class TestSerializeToR2:
     """Tests for R2 serialization with mocked R2 client."""
 
-    def test_serialize_to_r2_uploads_json(self):
+    @pytest.mark.asyncio
+    async def test_serialize_to_r2_uploads_json(self):
         from unittest.mock import patch
 
         from app.utils.gemini_chat import serialize_to_r2
@@ -325,16 +326,18 @@ class TestSerializeToR2:
             _make_content("model", [_make_text_part("hi")]),
         ]
 
-        with patch("app.utils.r2.upload_object") as mock_upload:
-            key = serialize_to_r2(mock_chat, "proj-123")
+        with patch("app.utils.object_cache.put_object") as mock_upload:
+            key = await serialize_to_r2(mock_chat, "proj-123")
 
         assert key == "projects/proj-123/gemini_chat_history.json"
-        mock_upload.assert_called_once()
-        call_args = mock_upload.call_args
-        assert call_args[0][0] == key
-        assert call_args[1]["content_type"] == "application/json"
-
-    def test_serialize_contents_to_r2_uploads_json(self):
+        # One segment, then the index that references it
+        segment_call, index_call = mock_upload.call_args_list
+        assert segment_call[0][0].startswith("projects/proj-123/gemini_chat_segments/0000-")
+        assert index_call[0][0] == key
+        assert index_call[1]["content_type"] == "application/json"
+
+    @pytest.mark.asyncio
+    async def test_serialize_contents_to_r2_uploads_json(self):
         from unittest.mock import patch
 
         from app.utils.gemini_chat import serialize_contents_to_r2
@@ -344,17 +347,18 @@ class TestSerializeToR2:
             _make_content("model", [_make_text_part("response")]),
         ]
 
-        with patch("app.utils.r2.upload_object") as mock_upload:
-            key = serialize_contents_to_r2(contents, "proj-456")
+        with patch("app.utils.object_cache.put_object") as mock_upload:
+            key = await serialize_contents_to_r2(contents, "proj-456")
 
         assert key == "projects/proj-456/gemini_chat_history.json"
-        mock_upload.assert_called_once()
+        assert mock_upload.call_count == 2
 
 
 class TestRestoreFromR2:
     """Tests for R2 deserialization with mocked R2 client."""
 
-    def test_restore_success(self):
+    @pytest.mark.asyncio
+    async def test_restore_success(self):
         import json
         from unittest.mock import patch
 
@@ -364,19 +368,19 @@ class TestRestoreFromR2:
             {"role": "user", "parts": [{"text": "hello"}]},
             {"role": "model", "parts": [{"text": "hi"}]},
         ]
-        mock_body = MagicMock()
-        mock_body.read.return_value = json.dumps(serialized).encode("utf-8")
-        mock_r2 = MagicMock()
-        mock_r2.get_object.return_value = {"Body": mock_body}
 
-        with patch("app.utils.r2._get_client", return_value=mock_r2):
-            contents = restore_from_r2("proj-123")
+        with patch(
+            "app.utils.object_cache.get_object", return_value=json.dumps(serialized).encode("utf-8")
+        ) as mock_get:
+            contents = await restore_from_r2("proj-123")
 
+        mock_get.assert_called_once_with("projects/proj-123/gemini_chat_history.json")
         assert len(contents) == 2
         assert contents[0].role == "user"
         assert contents[0].parts[0].text == "hello"
 
-    def test_restore_not_found_raises_application_error(self):
+    @pytest.mark.asyncio
+    async def test_restore_not_found_raises_application_error(self):
         from unittest.mock import patch
 
         from botocore.exceptions import ClientError
@@ -384,47 +388,204 @@ class TestRestoreFromR2:
 
         from app.utils.gemini_chat import restore_from_r2
 
-        mock_r2 = MagicMock()
-        mock_r2.get_object.side_effect = ClientError(
+        not_found = ClientError(
             {"Error": {"Code": "NoSuchKey", "Message": "not found"}},
             "GetObject",
         )
 
         with (
-            patch("app.utils.r2._get_client", return_value=mock_r2),
+            patch("app.utils.object_cache.get_object", side_effect=not_found),
             pytest.raises(ApplicationError, match="not found"),
         ):
-            restore_from_r2("proj-missing")
+            await restore_from_r2("proj-missing")
 
-    def test_restore_corrupt_json_raises_application_error(self):
+    @pytest.mark.asyncio
+    async def test_restore_corrupt_json_raises_application_error(self):
         from unittest.mock import patch
 
         from temporalio.exceptions import ApplicationError
 
         from app.utils.gemini_chat import restore_from_r2
 
-        mock_body = MagicMock()
-        mock_body.read.return_value = b"not valid json{{"
-        mock_r2 = MagicMock()
-        mock_r2.get_object.return_value = {"Body": mock_body}
-
         with (
-            patch("app.utils.r2._get_client", return_value=mock_r2),
+            patch("app.utils.object_cache.get_object", return_value=b"not valid json{{"),
             pytest.raises(ApplicationError, match="corrupted"),
         ):
-            restore_from_r2("proj-corrupt")
+            await restore_from_r2("proj-corrupt")
+
+
+def _turns(n: int, start: int = 0) -> list[types.Content]:
+    return [
+        _make_content("user" if i % 2 == 0 else "model", [_make_text_part(f"turn {i}")])
+        for i in range(start, start + n)
+    ]
+
+
+class TestHistoryFormat:
+    """Segment index + blob images, and the readers for older formats."""
+
+    @pytest.mark.asyncio
+    async def test_segments_reference_images_as_blobs(self, local_storage):
+        from app.utils.gemini_chat import (
+            HISTORY_FORMAT_VERSION,
+            restore_from_r2,
+            serialize_contents_to_r2,
+        )
+
+        image = _make_image_part()
+        contents = [
+            _make_content("user", [_make_text_part("edit this"), image]),
+            _make_content("model", [_make_text_part("done", signature="sig-1")]),
+        ]
+
+        key = await serialize_contents_to_r2(contents, "proj-fmt")
+
+        index = json.loads(local_storage.path_for(key).read_bytes())
+        assert index["version"] == HISTORY_FORMAT_VERSION
+        assert index["turns"] == 2
+        (segment_ref,) = index["segments"]
+        segment = json.loads(local_storage.path_for(segment_ref["key"]).read_bytes())
+        inline = segment["turns"][0]["parts"][1]["inline_data"]
+        assert "data" not in inline
+        assert local_storage.path_for(inline["blob"]).read_bytes() == image.inline_data.data
+
+        restored = await restore_from_r2("proj-fmt")
+        assert restored[0].parts[1].inline_data.data == image.inline_data.data
+        assert restored[1].parts[0].thought_signature == "sig-1"
+
+    @pytest.mark.asyncio
+    async def test_v2_manifest_still_restores(self):
+        from unittest.mock import patch
+
+        from app.utils.gemini_chat import restore_from_r2
+
+        manifest = {"version": 2, "turns": _contents_to_serializable(_turns(2))}
+        with patch("app.utils.object_cache.get_object", return_value=json.dumps(manifest).encode()):
+            restored = await restore_from_r2("proj-v2")
+
+        assert [c.parts[0].text for c in restored] == ["turn 0", "turn 1"]
+
+    @pytest.mark.asyncio
+    async def test_legacy_base64_history_still_restores(self):
+        from unittest.mock import patch
+
+        from app.utils.gemini_chat import restore_from_r2
+
+        image = _make_image_part()
+        legacy = _contents_to_serializable([_make_content("user", [image])])
+        assert "data" in legacy[0]["parts"][0]["inline_data"]
+
+        with patch("app.utils.object_cache.get_object", return_value=json.dumps(legacy).encode()):
+            restored = await restore_from_r2("proj-legacy")
+
+        assert restored[0].parts[0].inline_data.data == image.inline_data.data
+
+    @pytest.mark.asyncio
+    async def test_unknown_version_non_retryable(self):
+        from unittest.mock import patch
+
+        from temporalio.exceptions import ApplicationError
+
+        from app.utils.gemini_chat import restore_from_r2
+
+        document = json.dumps({"version": 99, "turns": []}).encode()
+        with (
+            patch("app.utils.object_cache.get_object", return_value=document),
+            pytest.raises(ApplicationError, match="version: 99") as exc_info,
+        ):
+            await restore_from_r2("proj-future")
+        assert exc_info.value.non_retryable
+
+
+class TestAppendOnlyHistory:
+    """Continuations write only their new turns as a segment."""
+
+    @pytest.mark.asyncio
+    async def test_append_writes_only_new_turns(self, local_storage):
+        from app.utils.gemini_chat import restore_from_r2, serialize_contents_to_r2
+
+        key = await serialize_contents_to_r2(_turns(4), "proj-app")
+        history = await restore_from_r2("proj-app")
+        await serialize_contents_to_r2(
+            history + _turns(2, start=4), "proj-app", persisted_turns=len(history)
+        )
+
+        index = json.loads(local_storage.path_for(key).read_bytes())
+        assert [s["turns"] for s in index["segments"]] == [4, 2]
+        appended = json.loads(local_storage.path_for(index["segments"][1]["key"]).read_bytes())
+        assert [t["parts"][0]["text"] for t in appended["turns"]] == ["turn 4", "turn 5"]
+
+        restored = await restore_from_r2("proj-app")
+        assert [c.parts[0].text for c in restored] == [f"turn {i}" for i in range(6)]
+
+    @pytest.mark.asyncio
+    async def test_stale_persisted_turns_rewrites_in_full(self, local_storage):
+        from app.utils.gemini_chat import serialize_contents_to_r2
+
+        key = await serialize_contents_to_r2(_turns(4), "proj-stale")
+        # Claims 2 persisted turns, but the index holds 4: don't stitch blindly
+        await serialize_contents_to_r2(_turns(3), "proj-stale", persisted_turns=2)
+
+        index = json.loads(local_storage.path_for(key).read_bytes())
+        assert index["turns"] == 3
+        assert [s["turns"] for s in index["segments"]] == [3]
+
+    @pytest.mark.asyncio
+    async def test_legacy_history_is_rewritten_as_segments(self, local_storage):
+        from app.utils.gemini_chat import (
+            CHAT_HISTORY_KEY_TEMPLATE,
+            restore_from_r2,
+            serialize_contents_to_r2,
+        )
+
+        key = CHAT_HISTORY_KEY_TEMPLATE.format(project_id="proj-old")
+        legacy = json.dumps(_contents_to_serializable(_turns(2))).encode()
+        await local_storage.put_object(key, legacy, "application/json")
+
+        history = await restore_from_r2("proj-old")
+        await serialize_contents_to_r2(
+            history + _turns(2, start=2), "proj-old", persisted_turns=len(history)
+        )
+
+        index = json.loads(local_storage.path_for(key).read_bytes())
+        assert [s["turns"] for s in index["segments"]] == [4]
+
+    @pytest.mark.asyncio
+    async def test_compacts_after_max_segments(self, local_storage, monkeypatch):
+        from app.utils import gemini_chat
+        from app.utils.gemini_chat import restore_from_r2, serialize_contents_to_r2
+
+        monkeypatch.setattr(gemini_chat, "CHAT_HISTORY_MAX_SEGMENTS", 3)
+        key = await serialize_contents_to_r2(_turns(2), "proj-cmp")
+        history = _turns(2)
+        for round_ in range(3):
+            updated = history + _turns(2, start=len(history))
+            await serialize_contents_to_r2(updated, "proj-cmp", persisted_turns=len(history))
+            history = updated
+            index = json.loads(local_storage.path_for(key).read_bytes())
+            if round_ < 2:
+                assert len(index["segments"]) == round_ + 2
+
+        # The third append found 3 segments and compacted into one
+        assert index["segments"] == [{"key": index["segments"][0]["key"], "turns": 8}]
+        prefix = "projects/proj-cmp/gemini_chat_segments/"
+        segment_keys, _ = await local_storage.list_objects(prefix)
+        assert segment_keys == [index["segments"][0]["key"]]
+        restored = await restore_from_r2("proj-cmp")
+        assert [c.parts[0].text for c in restored] == [f"turn {i}" for i in range(8)]
 
 
 class TestCleanup:
     """Tests for cleanup with mocked R2."""
 
-    def test_cleanup_deletes_key(self):
+    @pytest.mark.asyncio
+    async def test_cleanup_deletes_key(self):
         from unittest.mock import patch
 
         from app.utils.gemini_chat import cleanup
 
-        with patch("app.utils.r2.delete_object") as mock_delete:
-            cleanup("proj-123")
+        with patch("app.utils.object_cache.delete_object") as mock_delete:
+            await cleanup("proj-123")
 
         mock_delete.assert_called_once_with("projects/proj-123/gemini_chat_history.json")
 
@@ -432,7 +593,8 @@ class TestCleanup:
 class TestContinueChat:
     """Tests for continue_chat with mocked Gemini client."""
 
-    def test_builds_contents_and_calls_generate(self):
+    @pytest.mark.asyncio
+    async def test_builds_contents_and_calls_generate(self):
         from app.utils.gemini_chat import continue_chat
 
         history = [
@@ -442,30 +604,31 @@ class TestContinueChat:
 
         mock_response = MagicMock()
         mock_client = MagicMock()
-        mock_client.models.generate_content.return_value = mock_response
+        mock_client.aio.models.generate_content = AsyncMock(return_value=mock_response)
 
-        result = continue_chat(history, ["make it blue"], mock_client)
+        result = await continue_chat(history, ["make it blue"], mock_client)
 
         assert result == mock_response
-        mock_client.models.generate_content.assert_called_once()
-        call_args = mock_client.models.generate_content.call_args
+        mock_client.aio.models.generate_content.assert_called_once()
+        call_args = mock_client.aio.models.generate_content.call_args
         contents = call_args[1]["contents"]
         # Should have history (2 turns) + new user turn (1)
         assert len(contents) == 3
         assert contents[2].role == "user"
 
-    def test_handles_image_in_message(self):
+    @pytest.mark.asyncio
+    async def test_handles_image_in_message(self):
         from app.utils.gemini_chat import continue_chat
 
         history = [_make_content("user", [_make_text_part("hello")])]
         img = Image.new("RGB", (10, 10), "red")
 
         mock_client = MagicMock()
-        mock_client.models.generate_content.return_value = MagicMock()
+        mock_client.aio.models.generate_content = AsyncMock(return_value=MagicMock())
 
-        continue_chat(history, [img, "edit this"], mock_client)
+        await continue_chat(history, [img, "edit this"], mock_client)
 
-        call_args = mock_client.models.generate_content.call_args
+        call_args = mock_client.aio.models.generate_content.call_args
         contents = call_args[1]["contents"]
         user_turn = contents[-1]
         assert len(user_turn.parts) == 2  # image + text
@@ -474,18 +637,19 @@ class TestContinueChat:
 class TestContinueChatWithParts:
     """Test continue_chat with types.Part items."""
 
-    def test_handles_types_part_directly(self):
+    @pytest.mark.asyncio
+    async def test_handles_types_part_directly(self):
         from app.utils.gemini_chat import continue_chat
 
         history = [_make_content("user", [_make_text_part("hello")])]
         raw_part = types.Part(text="already a part")
 
         mock_client = MagicMock()
-        mock_client.models.generate_content.return_value = MagicMock()
+        mock_client.aio.models.generate_content = AsyncMock(return_value=MagicMock())
 
-        continue_chat(history, [raw_part], mock_client)
+        await continue_chat(history, [raw_part], mock_client)
 
-        call_args = mock_client.models.generate_content.call_args
+        call_args = mock_client.aio.models.generate_content.call_args
         contents = call_args[1]["contents"]
         user_turn = contents[-1]
         assert len(user_turn.parts) == 1
@@ -557,7 +721,8 @@ class TestImageCountAndPruning:
         texts = [p.text for p in middle_turn.parts if p.text]
         assert "[image removed for context limit]" in texts
 
-    def test_continue_chat_prunes_when_over_limit(self):
+    @pytest.mark.asyncio
+    async def test_continue_chat_prunes_when_over_limit(self):
         from app.utils.gemini_chat import MAX_INPUT_IMAGES, continue_chat
 
         # Build history with MAX_INPUT_IMAGES images
@@ -566,14 +731,14 @@ class TestImageCountAndPruning:
             history.append(_make_content("user" if i % 2 == 0 else "model", [_make_image_part()]))
 
         mock_client = MagicMock()
-        mock_client.models.generate_content.return_value = MagicMock()
+        mock_client.aio.models.generate_content = AsyncMock(return_value=MagicMock())
 
         # Send a new message with 1 image — should trigger pruning
         img = Image.new("RGB", (10, 10), "blue")
-        continue_chat(history, [img, "edit this"], mock_client)
+        await continue_chat(history, [img, "edit this"], mock_client)
 
         # Should have been called (pruning doesn't prevent the call)
-        mock_client.models.generate_content.assert_called_once()
+        mock_client.aio.models.generate_content.assert_called_once()
 
 
 class TestExtractImageEdgeCases:
@@ -605,30 +770,30 @@ class TestExtractTextEdgeCases:
 class TestRestoreFromR2EdgeCases:
     """Edge cases for restore_from_r2."""
 
-    def test_non_nosuchkey_error_raises_application_error(self):
+    @pytest.mark.asyncio
+    async def test_non_nosuchkey_error_raises_application_error(self):
         from unittest.mock import patch
 
+        from botocore.exceptions import ClientError
         from temporalio.exceptions import ApplicationError
 
         from app.utils.gemini_chat import restore_from_r2
 
-        mock_r2 = MagicMock()
-        from botocore.exceptions import ClientError
-
-        mock_r2.get_object.side_effect = ClientError(
+        denied = ClientError(
             {"Error": {"Code": "AccessDenied", "Message": "forbidden"}},
             "GetObject",
         )
 
         with (
-            patch("app.utils.r2._get_client", return_value=mock_r2),
-            pytest.raises(ApplicationError, match="AccessDenied"),
+            patch("app.utils.object_cache.get_object", side_effect=denied),
+            pytest.raises(ApplicationError, match="AccessDenied") as exc_info,
         ):
-            restore_from_r2("proj-denied")
+            await restore_from_r2("proj-denied")
+        assert exc_info.value.non_retryable
 
 
 class TestGetClient:
-    """Tests for get_client() factory function."""
+    """Tests for the process-wide get_client() registry."""
 
     def test_creates_client_with_api_key(self):
         from unittest.mock import patch
@@ -658,6 +823,49 @@ class TestGetClient:
             with pytest.raises(ApplicationError, match="GOOGLE_AI_API_KEY not configured"):
                 get_client()
 
+    def test_reuses_client_per_api_key(self, monkeypatch):
+        from unittest.mock import patch
+
+        from app.utils import gemini_chat
+
+        monkeypatch.setattr(gemini_chat.settings, "google_ai_api_key", "key-a")
+        with patch("app.utils.gemini_chat.genai.Client", side_effect=lambda **_: MagicMock()):
+            first = gemini_chat.get_client()
+            assert gemini_chat.get_client() is first
+
+            monkeypatch.setattr(gemini_chat.settings, "google_ai_api_key", "key-b")
+            assert gemini_chat.get_client() is not first
+
+        stats = gemini_chat.client_stats()
+        assert stats["created"] == 2
+        assert stats["reused"] == 1
+        assert stats["construct_ms"] >= 0
+
+    def test_open_client_skips_without_api_key(self, monkeypatch):
+        from unittest.mock import patch
+
+        from app.utils import gemini_chat
+
+        monkeypatch.setattr(gemini_chat.settings, "google_ai_api_key", "")
+        with patch("app.utils.gemini_chat.genai.Client") as mock_client_cls:
+            gemini_chat.open_client()
+        mock_client_cls.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_close_clients_closes_and_forgets(self, monkeypatch):
+        from unittest.mock import patch
+
+        from app.utils import gemini_chat
+
+        monkeypatch.setattr(gemini_chat.settings, "google_ai_api_key", "key-a")
+        with patch("app.utils.gemini_chat.genai.Client", side_effect=lambda **_: MagicMock()):
+            client = gemini_chat.get_client()
+            client.aio.aclose = AsyncMock()
+            await gemini_chat.close_clients()
+
+            client.aio.aclose.assert_awaited_once()
+            assert gemini_chat.get_client() is not client
+
 
 class TestCreateChatDefaultClient:
     """Tests for create_chat() with default client path."""
@@ -669,19 +877,19 @@ class TestCreateChatDefaultClient:
 
         mock_client = MagicMock()
         mock_chat = MagicMock()
-        mock_client.chats.create.return_value = mock_chat
+        mock_client.aio.chats.create.return_value = mock_chat
 
         with patch("app.utils.gemini_chat.get_client", return_value=mock_client):
             chat = create_chat()  # No client arg -> uses get_client()
             assert chat is mock_chat
-            mock_client.chats.create.assert_called_once()
+            mock_client.aio.chats.create.assert_called_once()
 
     def test_creates_chat_with_provided_client(self):
         from app.utils.gemini_chat import create_chat
 
         mock_client = MagicMock()
         mock_chat = MagicMock()
-        mock_client.chats.create.return_value = mock_chat
+        mock_client.aio.chats.create.return_value = mock_chat
 
         chat = create_chat(client=mock_client)
         assert chat is mock_chat
@@ -690,7 +898,8 @@ class TestCreateChatDefaultClient:
 class TestContinueChatDefaultClient:
     """Tests for continue_chat() with default client path."""
 
-    def test_uses_default_client_when_none(self):
+    @pytest.mark.asyncio
+    async def test_uses_default_client_when_none(self):
         from unittest.mock import patch
 
         from app.utils.gemini_chat import continue_chat
@@ -698,11 +907,72 @@ class TestContinueChatDefaultClient:
         history = [_make_content("user", [_make_text_part("hello")])]
 
         mock_client = MagicMock()
-        mock_client.models.generate_content.return_value = MagicMock()
+        mock_client.aio.models.generate_content = AsyncMock(return_value=MagicMock())
 
         with patch("app.utils.gemini_chat.get_client", return_value=mock_client):
-            continue_chat(history, ["test message"])  # No client -> default
-            mock_client.models.generate_content.assert_called_once()
+            await continue_chat(history, ["test message"])  # No client -> default
+            mock_client.aio.models.generate_content.assert_called_once()
+
+
+class TestGeminiCall:
+    """gemini_call() caps in-flight Gemini requests and cancels on timeout."""
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrency_to_setting(self, monkeypatch):
+        import asyncio
+
+        from app.utils.gemini_chat import gemini_call, settings
+
+        monkeypatch.setattr(settings, "gemini_max_concurrency", 2)
+        in_flight = peak = 0
+
+        async def call():
+            nonlocal in_flight, peak
+            async with gemini_call():
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        await asyncio.gather(*(call() for _ in range(5)))
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_timeout_cancels_request(self, monkeypatch):
+        import asyncio
+
+        from app.utils.gemini_chat import gemini_call, settings
+
+        monkeypatch.setattr(settings, "gemini_timeout_seconds", 0.01)
+        cancelled = False
+
+        async def slow_request():
+            nonlocal cancelled
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+
+        with pytest.raises(TimeoutError):
+            async with gemini_call():
+                await slow_request()
+        assert cancelled
+
+    @pytest.mark.asyncio
+    async def test_slot_released_after_timeout(self, monkeypatch):
+        import asyncio
+
+        from app.utils.gemini_chat import gemini_call, settings
+
+        monkeypatch.setattr(settings, "gemini_max_concurrency", 1)
+        monkeypatch.setattr(settings, "gemini_timeout_seconds", 0.01)
+
+        with pytest.raises(TimeoutError):
+            async with gemini_call():
+                await asyncio.sleep(10)
+        async with gemini_call():
+            pass
 
 
 class TestModelConfig:
@@ -5,6 +5,8 @@ Integration tests marked with @pytest.mark.integration.
 """
 
 import io
+import re
+from contextlib import asynccontextmanager
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -901,6 +903,22 @@ def _image_bytes(img: Image.Image) -> bytes:
     return buf.getvalue()
 
 
+def _mock_stream(response: MagicMock | None = None, error: Exception | None = None):
+    """Stand-in for ``httpx.AsyncClient.stream``, yielding ``response`` (body = .content)."""
+
+    async def chunks():
+        yield response.content
+
+    @asynccontextmanager
+    async def stream(method, url, **kwargs):
+        if error is not None:
+            raise error
+        response.aiter_bytes = chunks
+        yield response
+
+    return stream
+
+
 def _mock_gemini_response(with_image: bool = True) -> MagicMock:
     """Create a mock Gemini response with optional image."""
     response = MagicMock()
@@ -937,7 +955,7 @@ class TestDownloadImage:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
+            mock_client.stream = _mock_stream(mock_response)
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -957,7 +975,7 @@ class TestDownloadImage:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
+            mock_client.stream = _mock_stream(mock_response)
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -978,7 +996,7 @@ class TestDownloadImage:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
+            mock_client.stream = _mock_stream(mock_response)
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -1000,7 +1018,7 @@ class TestDownloadImage:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
+            mock_client.stream = _mock_stream(mock_response)
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -1017,7 +1035,7 @@ class TestDownloadImage:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.side_effect = httpx.TimeoutException("timed out")
+            mock_client.stream = _mock_stream(error=httpx.TimeoutException("timed out"))
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -1036,7 +1054,7 @@ class TestDownloadImage:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.side_effect = httpx.ConnectError("Connection refused")
+            mock_client.stream = _mock_stream(error=httpx.ConnectError("Connection refused"))
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -1064,7 +1082,7 @@ class TestDownloadImage:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
+            mock_client.stream = _mock_stream(mock_response)
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -1087,7 +1105,7 @@ class TestGenerateSingleOption:
 
         response = _mock_gemini_response(with_image=True)
         mock_client = MagicMock()
-        mock_client.models.generate_content.return_value = response
+        mock_client.aio.models.generate_content = AsyncMock(return_value=response)
 
         with patch("app.activities.generate.get_client", return_value=mock_client):
             result = await _generate_single_option("test prompt", [_make_test_image()], [], 0)
@@ -1100,15 +1118,18 @@ class TestGenerateSingleOption:
         text_response = _mock_gemini_response(with_image=False)
         image_response = _mock_gemini_response(with_image=True)
         mock_client = MagicMock()
-        mock_client.models.generate_content.side_effect = [
-            text_response,
-            image_response,
-        ]
+        mock_client.aio.models.generate_content = AsyncMock(
+            side_effect=[text_response, image_response]
+        )
 
         with patch("app.activities.generate.get_client", return_value=mock_client):
             result = await _generate_single_option("test prompt", [_make_test_image()], [], 0)
             assert isinstance(result, Image.Image)
-            assert mock_client.models.generate_content.call_count == 2
+            assert mock_client.aio.models.generate_content.call_count == 2
+            # The retry reuses the already-encoded parts and appends the nudge
+            first, retry = mock_client.aio.models.generate_content.call_args_list
+            assert retry.kwargs["contents"][:-1] == first.kwargs["contents"]
+            assert retry.kwargs["contents"][-1].text == "Please generate the room image now."
 
     @pytest.mark.asyncio
     async def test_raises_after_retry_fails(self):
@@ -1118,7 +1139,7 @@ class TestGenerateSingleOption:
 
         text_response = _mock_gemini_response(with_image=False)
         mock_client = MagicMock()
-        mock_client.models.generate_content.return_value = text_response
+        mock_client.aio.models.generate_content = AsyncMock(return_value=text_response)
 
         with (
             patch("app.activities.generate.get_client", return_value=mock_client),
@@ -1218,6 +1239,74 @@ class TestGenerateDesignsActivity:
             assert result.options[0].image_url == "https://r2.example.com/option_0.png"
             assert result.options[1].image_url == "https://r2.example.com/option_1.png"
 
+    @pytest.mark.asyncio
+    async def test_source_photos_read_by_storage_key(self):
+        """Keys go straight to download_images — nothing is presigned for the download."""
+        from app.activities.generate import generate_designs
+
+        inp = GenerateDesignsInput(
+            room_photo_urls=["projects/test-proj/room_photos/room.jpg"],
+            inspiration_photo_urls=["projects/test-proj/inspiration/insp.jpg"],
+        )
+
+        with (
+            patch(
+                "app.activities.generate.download_images",
+                new_callable=AsyncMock,
+                side_effect=[[_make_test_image()], [_make_test_image()]],
+            ) as mock_download,
+            patch(
+                "app.activities.generate._generate_single_option",
+                new_callable=AsyncMock,
+                return_value=_make_test_image(),
+            ),
+            patch(
+                "app.activities.generate._upload_image",
+                side_effect=[
+                    "https://r2.example.com/option_0.png",
+                    "https://r2.example.com/option_1.png",
+                ],
+            ),
+            patch("app.utils.r2.presign_batch", new_callable=AsyncMock) as mock_presign,
+        ):
+            await generate_designs(inp)
+
+        assert [c.args[0] for c in mock_download.call_args_list] == [
+            ["projects/test-proj/room_photos/room.jpg"],
+            ["projects/test-proj/inspiration/insp.jpg"],
+        ]
+        mock_presign.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_options_carry_delivery_variants(self):
+        """Options stored under R2 keys get preview/thumbnail variants alongside."""
+        from app.activities.generate import generate_designs
+
+        inp = GenerateDesignsInput(room_photo_urls=["projects/test-proj/room_photos/room.jpg"])
+
+        with (
+            patch(
+                "app.activities.generate.download_images",
+                new_callable=AsyncMock,
+                side_effect=[[_make_test_image()], []],
+            ),
+            patch(
+                "app.activities.generate._generate_single_option",
+                new_callable=AsyncMock,
+                return_value=_make_test_image(),
+            ),
+            patch("app.utils.r2_async.upload_object") as mock_upload,
+        ):
+            result = await generate_designs(inp)
+
+        variants = result.options[1].variants
+        assert variants is not None
+        stem = result.options[1].image_url.rsplit(".", 1)[0]
+        assert stem.startswith("projects/test-proj/generated/option_1-")
+        assert variants.thumbnail_url == f"{stem}.thumbnail.jpg"
+        # 2 originals + 2 variants each
+        assert mock_upload.call_count == 6
+
     @pytest.mark.asyncio
     async def test_error_on_no_room_photos(self):
         from temporalio.exceptions import ApplicationError
@@ -1293,7 +1382,7 @@ class TestDownloadImages:
 
         with patch("httpx.AsyncClient") as mock_async_client:
             mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
+            mock_client.stream = _mock_stream(mock_response)
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
             mock_client.__aexit__ = AsyncMock(return_value=False)
             mock_async_client.return_value = mock_client
@@ -1312,19 +1401,57 @@ class TestDownloadImages:
 class TestUploadImageGenerate:
     """Tests for _upload_image in generate.py."""
 
-    def test_upload_returns_storage_key(self):
+    @pytest.mark.asyncio
+    async def test_upload_returns_storage_key(self):
         """_upload_image returns an R2 key (not presigned URL) for stable storage."""
         from app.activities.generate import _upload_image
 
         img = _make_test_image()
 
-        with patch("app.utils.r2.upload_object") as mock_upload:
-            key = _upload_image(img, "proj-123", "option_0.png")
-            assert key == "projects/proj-123/generated/option_0.png"
+        with patch("app.utils.r2_async.upload_object") as mock_upload:
+            key = await _upload_image(img, "proj-123", "option_0")
+            assert re.fullmatch(r"projects/proj-123/generated/option_0-[0-9a-f]{16}\.webp", key)
             assert not key.startswith("http")
             mock_upload.assert_called_once()
             call_args = mock_upload.call_args[0]
             assert call_args[0] == key
+            assert mock_upload.call_args[1]["content_type"] == "image/webp"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("fmt", "suffix", "content_type"),
+        [("jpeg", ".jpg", "image/jpeg"), ("png", ".png", "image/png")],
+    )
+    async def test_key_and_content_type_follow_format(self, fmt, suffix, content_type):
+        from app.activities.generate import _upload_image
+        from app.config import settings
+
+        with (
+            patch.object(settings, "output_image_format", fmt),
+            patch("app.utils.r2_async.upload_object") as mock_upload,
+        ):
+            key = await _upload_image(_make_test_image(), "proj-123", "option_1")
+        assert key.startswith("projects/proj-123/generated/option_1-")
+        assert key.endswith(suffix)
+        assert mock_upload.call_args[1]["content_type"] == content_type
+
+    @pytest.mark.asyncio
+    async def test_regenerated_option_gets_new_url(self):
+        """A regenerated option must not resolve to the cached URL of the previous one."""
+        from app.activities.generate import _upload_image
+        from app.utils import r2
+
+        with (
+            patch("app.utils.r2_async.upload_object"),
+            patch.object(r2, "generate_presigned_url", side_effect=lambda k: f"https://s/{k}"),
+        ):
+            first = await _upload_image(Image.new("RGB", (8, 8), "red"), "proj-123", "option_0")
+            first_url = r2.resolve_url(first)
+            second = await _upload_image(Image.new("RGB", (8, 8), "blue"), "proj-123", "option_0")
+            second_url = r2.resolve_url(second)
+
+        assert second != first
+        assert second_url != first_url
 
 
 class TestGenerateSingleOptionWithInspiration:
@@ -1332,11 +1459,13 @@ class TestGenerateSingleOptionWithInspiration:
 
     @pytest.mark.asyncio
     async def test_includes_inspiration_images(self):
+        from google.genai import types
+
         from app.activities.generate import _generate_single_option
 
         response = _mock_gemini_response(with_image=True)
         mock_client = MagicMock()
-        mock_client.models.generate_content.return_value = response
+        mock_client.aio.models.generate_content = AsyncMock(return_value=response)
 
         room_images = [_make_test_image()]
         inspiration_images = [_make_test_image(50, 50)]
@@ -1347,10 +1476,13 @@ class TestGenerateSingleOptionWithInspiration:
             )
             assert isinstance(result, Image.Image)
             # Verify content includes both room + inspiration images with labels
-            call_args = mock_client.models.generate_content.call_args
+            call_args = mock_client.aio.models.generate_content.call_args
             contents = call_args[1]["contents"]
             # room label + room img + insp label + insp img + prompt = 5
             assert len(contents) == 5
+            # Images are PNG-encoded before the call, not handed to the SDK as PIL
+            assert all(isinstance(c, types.Part) for c in contents)
+            assert contents[1].inline_data.mime_type == "image/png"
 
 
 class TestImageCountTruncation:
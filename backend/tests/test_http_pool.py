@@ -0,0 +1,108 @@
+"""Tests for the shared outbound HTTP clients — reuse, lifecycle, per-host stats.
+
+Clients are built against an httpx.MockTransport by wrapping the
+``httpx.AsyncClient`` constructor, so the real limits and event hooks apply.
+"""
+
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.utils import http_pool
+from app.utils.http import download_images
+from app.utils.http_pool import close_clients, get_client, open_clients
+
+_RealAsyncClient = httpx.AsyncClient
+
+
+def _png() -> bytes:
+    import io
+
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (8, 8), "red").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def constructed():
+    """Route pooled clients through a mock transport; yields constructor kwargs seen."""
+    calls: list[dict] = []
+    png = _png()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "broken.example.com":
+            return httpx.Response(503)
+        return httpx.Response(200, content=png, headers={"content-type": "image/png"})
+
+    def build(**kwargs):
+        calls.append(kwargs)
+        return _RealAsyncClient(transport=httpx.MockTransport(handler), **kwargs)
+
+    with patch("httpx.AsyncClient", side_effect=build):
+        yield calls
+
+
+class TestGetClient:
+    def test_same_client_per_name(self, constructed):
+        assert get_client("downloads") is get_client("downloads")
+        assert get_client("exa") is not get_client("downloads")
+        assert len(constructed) == 2
+
+    def test_pool_limits_from_settings(self, constructed, monkeypatch):
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "http_max_connections", 7)
+        get_client()
+
+        limits = constructed[0]["limits"]
+        assert limits.max_connections == 7
+        assert limits.max_keepalive_connections == settings.http_max_keepalive_connections
+
+    def test_http2_falls_back_without_h2(self, constructed, monkeypatch):
+        monkeypatch.setattr(http_pool, "_http2_available", lambda: False)
+        get_client()
+        assert constructed[0]["http2"] is False
+
+    def test_open_clients_creates_all(self, constructed):
+        open_clients()
+        assert set(http_pool._clients) == set(http_pool.CLIENT_NAMES)
+
+
+class TestLifecycle:
+    @pytest.mark.asyncio
+    async def test_close_clients_closes_and_forgets(self, constructed):
+        client = get_client()
+        await close_clients()
+
+        assert client.is_closed
+        assert get_client() is not client
+
+    @pytest.mark.asyncio
+    async def test_downloads_share_one_client(self, constructed):
+        await download_images(["https://r2.example.com/a.png", "https://r2.example.com/b.png"])
+        await download_images(["https://r2.example.com/c.png"])
+
+        assert len(constructed) == 1
+
+
+class TestStats:
+    @pytest.mark.asyncio
+    async def test_counts_per_host(self, constructed):
+        client = get_client()
+        await client.get("https://r2.example.com/a.png")
+        await client.get("https://r2.example.com/b.png")
+        await client.get("https://broken.example.com/c.png")
+
+        assert http_pool.stats() == {
+            "r2.example.com": {"requests": 2, "responses": 2, "http2": 0, "server_errors": 0},
+            "broken.example.com": {"requests": 1, "responses": 1, "http2": 0, "server_errors": 1},
+        }
+
+    @pytest.mark.asyncio
+    async def test_reset_zeroes_counters(self, constructed):
+        await get_client().get("https://r2.example.com/a.png")
+        http_pool.reset_clients()
+        assert http_pool.stats() == {}
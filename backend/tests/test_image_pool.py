@@ -0,0 +1,145 @@
+"""Tests for the admission-controlled image work pool."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+
+import pytest
+
+from app.utils import image_pool
+from app.utils.image_pool import (
+    ImagePoolSaturatedError,
+    ImageWorkPool,
+    get_image_pool,
+    shutdown_image_pool,
+)
+
+
+def _pid() -> int:
+    return os.getpid()
+
+
+class TestAdmission:
+    """run() bounds the number of queued + running tasks."""
+
+    async def test_rejects_beyond_max_pending(self) -> None:
+        pool = ImageWorkPool(workers=0, max_pending=2, retry_after_seconds=5)
+        release = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def _block() -> None:
+            asyncio.run_coroutine_threadsafe(release.wait(), loop).result(2)
+
+        tasks = [asyncio.create_task(pool.run(_block)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.saturated is True
+        with pytest.raises(ImagePoolSaturatedError) as exc_info:
+            await pool.run(_pid)
+        release.set()
+        await asyncio.gather(*tasks)
+
+        assert exc_info.value.retry_after_seconds == 5
+        assert pool.rejected == 1
+        assert pool.in_flight == 0
+        assert pool.saturated is False
+
+    async def test_slot_released_on_error(self) -> None:
+        pool = ImageWorkPool(workers=0, max_pending=1, retry_after_seconds=1)
+        with pytest.raises(ZeroDivisionError):
+            await pool.run(divmod, 1, 0)
+        assert pool.in_flight == 0
+
+    async def test_cancelled_caller_keeps_slot_until_job_finishes(self) -> None:
+        """The worker is still busy after the awaiting task is cancelled."""
+        pool = ImageWorkPool(workers=0, max_pending=1, retry_after_seconds=1)
+        started = asyncio.Event()
+        release = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def _block() -> None:
+            loop.call_soon_threadsafe(started.set)
+            asyncio.run_coroutine_threadsafe(release.wait(), loop).result(2)
+
+        task = asyncio.create_task(pool.run(_block))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert pool.in_flight == 1
+        assert pool.saturated is True
+        release.set()
+        for _ in range(100):
+            if pool.in_flight == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.in_flight == 0
+
+    def test_has_capacity_counts_requested_tasks(self) -> None:
+        pool = ImageWorkPool(workers=0, max_pending=4, retry_after_seconds=1)
+        pool.in_flight = 1
+        assert pool.has_capacity(3) is True
+        assert pool.has_capacity(4) is False
+
+
+class TestRun:
+    """run() executes work off the event loop and tracks queue depth."""
+
+    async def test_thread_mode_runs_in_process(self) -> None:
+        pool = ImageWorkPool(workers=0, max_pending=4, retry_after_seconds=1)
+        assert await pool.run(_pid) == os.getpid()
+
+    async def test_in_flight_and_queue_depth(self) -> None:
+        pool = ImageWorkPool(workers=0, max_pending=4, retry_after_seconds=1)
+        release = asyncio.Event()
+        seen: list[dict[str, int]] = []
+
+        def _block() -> None:
+            asyncio.run_coroutine_threadsafe(release.wait(), loop).result(2)
+
+        loop = asyncio.get_running_loop()
+        tasks = [asyncio.create_task(pool.run(_block)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        seen.append(pool.stats())
+        release.set()
+        await asyncio.gather(*tasks)
+
+        assert seen[0]["pool_in_flight"] == 3
+        assert seen[0]["pool_queue_depth"] == 3  # no dedicated workers
+        assert pool.peak_in_flight == 3
+        assert pool.in_flight == 0
+
+    async def test_process_mode_runs_in_worker_process(self) -> None:
+        """Spawned worker executes the function in a different process."""
+        pool = ImageWorkPool(workers=1, max_pending=4, retry_after_seconds=1)
+        try:
+            assert await pool.run(_pid) != os.getpid()
+        finally:
+            pool.shutdown()
+
+
+class TestWarmUp:
+    async def test_spawns_all_workers_before_first_task(self) -> None:
+        pool = ImageWorkPool(workers=2, max_pending=4, retry_after_seconds=1)
+        try:
+            await pool.warm_up(preload=("app.activities.validation",))
+            assert pool._executor is not None
+            assert len(pool._executor._processes) == 2
+            assert pool.in_flight == 0  # warm-up bypasses admission counters
+        finally:
+            pool.shutdown()
+
+    async def test_thread_mode_is_noop(self) -> None:
+        pool = ImageWorkPool(workers=0, max_pending=4, retry_after_seconds=1)
+        await pool.warm_up(preload=("app.activities.validation",))
+        assert pool._executor is None
+
+
+class TestSingleton:
+    def test_get_and_shutdown(self) -> None:
+        shutdown_image_pool()
+        pool = get_image_pool()
+        assert get_image_pool() is pool
+        shutdown_image_pool()
+        assert image_pool._pool is None
@@ -5,6 +5,7 @@ No API keys needed — pure Pillow operations.
 
 import io
 
+import pytest
 from PIL import Image
 
 from app.models.contracts import AnnotationRegion
@@ -14,6 +15,7 @@ from app.utils.image import (
     _clamp_radius,
     _load_font,
     draw_annotations,
+    encode_output_image,
     image_to_bytes,
 )
 
@@ -229,3 +231,111 @@ class TestCoordinateScaling:
         region = _make_region(center_x=1.0, center_y=1.0, radius=0.05)
         result = draw_annotations(img, [region])
         assert result.size == (1000, 1000)
+
+
+class TestEncodeOutputImage:
+    """Tests for encode_output_image — generated option / revision encodings."""
+
+    @pytest.mark.parametrize(
+        ("fmt", "pil_format", "content_type", "extension"),
+        [
+            ("webp", "WEBP", "image/webp", "webp"),
+            ("jpeg", "JPEG", "image/jpeg", "jpg"),
+            ("png", "PNG", "image/png", "png"),
+        ],
+    )
+    def test_encodes_with_matching_metadata(self, fmt, pil_format, content_type, extension):
+        encoded = encode_output_image(_make_image(64, 48, "red"), fmt, 90)
+        assert encoded.content_type == content_type
+        assert encoded.extension == extension
+        with Image.open(io.BytesIO(encoded.data)) as img:
+            assert img.format == pil_format
+            assert img.size == (64, 48)
+
+    def test_jpeg_flattens_alpha(self):
+        rgba = Image.new("RGBA", (32, 32), (255, 0, 0, 128))
+        encoded = encode_output_image(rgba, "jpeg", 90)
+        with Image.open(io.BytesIO(encoded.data)) as img:
+            assert img.mode == "RGB"
+
+    def test_lossy_smaller_than_png(self):
+        noisy = Image.effect_noise((256, 256), 40).convert("RGB")
+        png = encode_output_image(noisy, "png", 90)
+        assert len(encode_output_image(noisy, "webp", 90).data) < len(png.data)
+        assert len(encode_output_image(noisy, "jpeg", 90).data) < len(png.data)
+
+    def test_unknown_format_rejected(self):
+        with pytest.raises(ValueError, match="Unsupported output format"):
+            encode_output_image(_make_image(8, 8), "bmp", 90)
+
+
+class TestImageVariants:
+    """Tests for the downscaled delivery variants of stored images."""
+
+    def test_variants_fit_their_long_edge(self):
+        from app.utils.image_variants import VARIANT_MAX_EDGE, render_variants
+
+        rendered = render_variants(_make_image(2048, 1536))
+        for name, data in rendered.items():
+            img = Image.open(io.BytesIO(data))
+            assert img.format == "JPEG"
+            assert max(img.size) == VARIANT_MAX_EDGE[name]
+            assert img.size[0] > img.size[1]  # aspect ratio preserved
+
+    def test_small_source_is_not_upscaled(self):
+        from app.utils.image_variants import render_variants
+
+        rendered = render_variants(_make_image(200, 100))
+        assert Image.open(io.BytesIO(rendered["preview"])).size == (200, 100)
+
+    def test_rgba_source_encodes(self):
+        from app.utils.image_variants import render_variants
+
+        rendered = render_variants(Image.new("RGBA", (600, 600), (0, 0, 0, 0)))
+        assert set(rendered) == {"preview", "thumbnail"}
+
+    def test_from_bytes_applies_exif_orientation(self):
+        from app.utils.image_variants import render_variants_from_bytes
+
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotate 90° CW on display
+        buf = io.BytesIO()
+        _make_image(1600, 1200).save(buf, format="JPEG", exif=exif)
+
+        rendered = render_variants_from_bytes(buf.getvalue())
+        assert Image.open(io.BytesIO(rendered["preview"])).size == (768, 1024)
+
+    @pytest.mark.asyncio
+    async def test_store_uploads_next_to_original(self):
+        from unittest.mock import patch
+
+        from app.utils.image_variants import store_variants
+
+        with patch("app.utils.r2_async.upload_object") as mock_upload:
+            variants = await store_variants("projects/p/generated/option_0.png", _make_image())
+        assert variants is not None
+        assert variants.preview_url == "projects/p/generated/option_0.preview.jpg"
+        assert variants.thumbnail_url == "projects/p/generated/option_0.thumbnail.jpg"
+        uploaded = [c.args[0] for c in mock_upload.call_args_list]
+        assert uploaded == [variants.preview_url, variants.thumbnail_url]
+
+    @pytest.mark.asyncio
+    async def test_store_skips_urls(self):
+        from unittest.mock import patch
+
+        from app.utils.image_variants import store_variants
+
+        with patch("app.utils.r2_async.upload_object") as mock_upload:
+            assert (
+                await store_variants("https://r2.example.com/option_0.png", _make_image()) is None
+            )
+        mock_upload.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_store_failure_returns_none(self):
+        from unittest.mock import patch
+
+        from app.utils.image_variants import store_variants
+
+        with patch("app.utils.r2_async.upload_object", side_effect=RuntimeError("r2 down")):
+            assert await store_variants("projects/p/revisions/abc.png", _make_image()) is None
@@ -0,0 +1,75 @@
+"""Integration benchmark for the photo content check — real Claude API calls.
+
+Run with:
+    ANTHROPIC_API_KEY=... .venv/bin/python -m pytest tests/test_integration_validation.py -x -q -s
+
+Compares the thumbnail payload sent by _check_content against the previous
+full-upload payload on the fixture room photos: request size, latency and
+YES/NO verdict. Marked @pytest.mark.integration so it is skipped in CI.
+"""
+
+import base64
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+ANTHROPIC_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
+skip_no_key = pytest.mark.skipif(not ANTHROPIC_KEY, reason="ANTHROPIC_API_KEY not set")
+
+_FIXTURES = Path(__file__).parent / "fixtures"
+_PHOTOS = ["room_photo.jpg", "room_photo_2.jpg"]
+
+
+def _full_payload(image_data: bytes) -> tuple[str, str]:
+    """Pre-thumbnail behavior: the original upload, base64-encoded."""
+    from app.activities.validation import _detect_media_type
+
+    return _detect_media_type(image_data), base64.b64encode(image_data).decode()
+
+
+async def _timed_check(image_data: bytes) -> tuple[tuple[bool, str], float]:
+    from app.activities.validation import _check_content
+
+    start = time.perf_counter()
+    result = await _check_content(image_data, "room")
+    return result, time.perf_counter() - start
+
+
+@skip_no_key
+class TestContentPayloadBenchmark:
+    """Thumbnail vs full-size payload for the Haiku room classification."""
+
+    @pytest.fixture(autouse=True)
+    def _fresh_client(self):
+        import app.activities.validation as val_mod
+
+        val_mod._anthropic_client = None
+        with patch.object(val_mod.settings, "anthropic_api_key", ANTHROPIC_KEY):
+            yield
+        val_mod._anthropic_client = None
+
+    @pytest.mark.parametrize("photo", _PHOTOS)
+    async def test_thumbnail_matches_full_verdict(self, photo: str) -> None:
+        """Thumbnail payload gives the same verdict with a far smaller request."""
+        from app.activities.validation import _build_classification_payload
+
+        data = (_FIXTURES / photo).read_bytes()
+        full_b64 = _full_payload(data)[1]
+        thumb_b64 = _build_classification_payload(data)[1]
+
+        with patch("app.activities.validation._build_classification_payload", _full_payload):
+            full_result, full_s = await _timed_check(data)
+        thumb_result, thumb_s = await _timed_check(data)
+
+        print(
+            f"\n{photo}: full {len(full_b64) / 1024:.0f} KB {full_s:.2f}s "
+            f"verdict={full_result[0]} | thumbnail {len(thumb_b64) / 1024:.0f} KB "
+            f"{thumb_s:.2f}s verdict={thumb_result[0]}"
+        )
+        assert thumb_result[0] == full_result[0] is True
+        assert len(thumb_b64) < len(full_b64) / 10
@@ -0,0 +1,264 @@
+"""Tests for the worker's read-through R2 object cache — ETag revalidation, tiers, LRU.
+
+R2 is an httpx.MockTransport serving a dict of objects with MD5-style ETags
+and honouring If-None-Match, so the cache talks to a real AsyncR2Client.
+"""
+
+import hashlib
+from unittest.mock import patch
+
+import httpx
+import pytest
+from botocore.exceptions import ClientError
+
+from app.utils import object_cache, r2_async
+from app.utils.object_cache import ObjectCache
+from app.utils.r2_async import AsyncR2Client
+from app.utils.storage import ObjectTooLargeError
+
+
+class _FakeBucket:
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+        self.requests: list[httpx.Request] = []
+
+    @staticmethod
+    def etag(data: bytes) -> str:
+        return f'"{hashlib.md5(data).hexdigest()}"'
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        key = request.url.path.split("/", 2)[2]
+        if request.method == "PUT":
+            self.objects[key] = request.content
+            return httpx.Response(200, headers={"ETag": self.etag(request.content)})
+        if request.method == "DELETE":
+            self.objects.pop(key, None)
+            return httpx.Response(204)
+        data = self.objects.get(key)
+        if data is None:
+            return httpx.Response(404, content=b"<Error><Code>NoSuchKey</Code></Error>")
+        if request.headers.get("if-none-match") == self.etag(data):
+            return httpx.Response(304, headers={"ETag": self.etag(data)})
+        return httpx.Response(200, content=data, headers={"ETag": self.etag(data)})
+
+    def bodies_sent(self) -> int:
+        """GET responses that carried a body (i.e. not served from cache)."""
+        return sum(
+            1 for r in self.requests if r.method == "GET" and "if-none-match" not in r.headers
+        )
+
+
+@pytest.fixture
+def bucket():
+    fake = _FakeBucket()
+    client = AsyncR2Client(
+        endpoint_url="https://acct.r2.cloudflarestorage.com",
+        bucket="remo-images",
+        access_key_id="AKID",
+        secret_access_key="secret",
+        transport=httpx.MockTransport(fake.handler),
+    )
+    with patch.object(r2_async, "_client", client):
+        yield fake
+
+
+def _cache(tmp_path, memory_bytes=1024, disk_bytes=4096) -> ObjectCache:
+    return ObjectCache(memory_bytes=memory_bytes, disk_bytes=disk_bytes, directory=tmp_path)
+
+
+class TestReadThrough:
+    @pytest.mark.asyncio
+    async def test_repeat_read_revalidates_and_serves_locally(self, bucket, tmp_path):
+        bucket.objects["projects/p/room.jpg"] = b"jpeg"
+        cache = _cache(tmp_path)
+
+        assert await cache.get("projects/p/room.jpg") == b"jpeg"
+        assert await cache.get("projects/p/room.jpg") == b"jpeg"
+
+        conditional = bucket.requests[-1]
+        assert conditional.headers["if-none-match"] == _FakeBucket.etag(b"jpeg")
+        assert cache.stats()["memory_hits"] == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hit_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_rewritten_object_is_refetched(self, bucket, tmp_path):
+        """Chat history is overwritten in place — a stale ETag must not be served."""
+        bucket.objects["h.json"] = b"v1"
+        cache = _cache(tmp_path)
+        await cache.get("h.json")
+        bucket.objects["h.json"] = b"v2"
+
+        assert await cache.get("h.json") == b"v2"
+        assert await cache.get("h.json") == b"v2"
+        assert cache.stats()["misses"] == 2
+
+    @pytest.mark.asyncio
+    async def test_deleted_object_raises_and_is_evicted(self, bucket, tmp_path):
+        bucket.objects["k"] = b"data"
+        cache = _cache(tmp_path)
+        await cache.get("k")
+        del bucket.objects["k"]
+
+        with pytest.raises(ClientError):
+            await cache.get("k")
+        assert cache.stats()["memory_bytes"] == 0
+        assert cache.stats()["disk_bytes"] == 0
+
+    @pytest.mark.asyncio
+    async def test_put_writes_through(self, bucket, tmp_path):
+        cache = _cache(tmp_path)
+        await cache.put("h.json", b"history", "application/json")
+
+        assert await cache.get("h.json") == b"history"
+        assert bucket.bodies_sent() == 0
+        assert cache.stats()["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_etag_is_not_cached(self, tmp_path):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, content=b"data")
+
+        client = AsyncR2Client("https://r2", "b", "a", "s", transport=httpx.MockTransport(handler))
+        cache = _cache(tmp_path)
+        with patch.object(r2_async, "_client", client):
+            await cache.get("k")
+            await cache.get("k")
+        assert cache.stats()["misses"] == 2
+
+    @pytest.mark.asyncio
+    async def test_capped_read_rejects_oversized_object_before_body(self, tmp_path):
+        sent: list[int] = []
+
+        async def body():
+            for _ in range(5):
+                sent.append(1)
+                yield b"x" * 1000
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, headers={"Content-Length": "5000"}, content=body())
+
+        client = AsyncR2Client("https://r2", "b", "a", "s", transport=httpx.MockTransport(handler))
+        cache = _cache(tmp_path)
+        with (
+            patch.object(r2_async, "_client", client),
+            pytest.raises(ObjectTooLargeError) as exc_info,
+        ):
+            await cache.get("projects/p/huge.jpg", max_bytes=4096)
+        assert exc_info.value.size == 5000
+        assert sent == []
+        assert cache.stats()["memory_bytes"] == 0
+
+    @pytest.mark.asyncio
+    async def test_capped_read_revalidates_in_one_request(self, bucket, tmp_path):
+        bucket.objects["projects/p/room.jpg"] = b"jpeg"
+        cache = _cache(tmp_path)
+
+        assert await cache.get("projects/p/room.jpg", max_bytes=4096) == b"jpeg"
+        assert await cache.get("projects/p/room.jpg", max_bytes=4096) == b"jpeg"
+
+        assert [r.method for r in bucket.requests] == ["GET", "GET"]
+        assert "if-none-match" in bucket.requests[-1].headers
+        assert cache.stats()["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_copy_over_cap_is_not_served(self, bucket, tmp_path):
+        bucket.objects["projects/p/huge.jpg"] = b"x" * 5000
+        cache = _cache(tmp_path, memory_bytes=8192, disk_bytes=8192)
+        await cache.get("projects/p/huge.jpg")
+
+        with pytest.raises(ObjectTooLargeError):
+            await cache.get("projects/p/huge.jpg", max_bytes=4096)
+        assert "if-none-match" not in bucket.requests[-1].headers
+
+
+class TestTiers:
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_memory_eviction(self, bucket, tmp_path):
+        bucket.objects["k"] = b"data"
+        cache = _cache(tmp_path)
+        await cache.get("k")
+        cache.clear_memory()
+
+        assert await cache.get("k") == b"data"
+        assert cache.stats()["disk_hits"] == 1
+        assert bucket.bodies_sent() == 1
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, bucket, tmp_path):
+        bucket.objects["k"] = b"data"
+        await _cache(tmp_path).get("k")
+
+        restarted = _cache(tmp_path)
+        assert await restarted.get("k") == b"data"
+        assert restarted.stats()["disk_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_memory_lru_bounded_by_bytes(self, bucket, tmp_path):
+        for name in "abc":
+            bucket.objects[name] = name.encode() * 400
+        cache = _cache(tmp_path, memory_bytes=1000, disk_bytes=0)
+        await cache.get("a")
+        await cache.get("b")
+        await cache.get("a")  # "b" is now least recently used
+        await cache.get("c")
+
+        assert cache.stats()["memory_bytes"] == 800
+        await cache.get("a")
+        assert cache.stats()["memory_hits"] == 2
+        await cache.get("b")
+        assert cache.stats()["misses"] == 4
+
+    @pytest.mark.asyncio
+    async def test_disk_lru_bounded_by_bytes(self, bucket, tmp_path):
+        for name in "abc":
+            bucket.objects[name] = name.encode() * 1500
+        cache = _cache(tmp_path, memory_bytes=0, disk_bytes=4000)
+        for name in "abc":
+            await cache.get(name)
+
+        assert cache.stats()["disk_bytes"] <= 4000
+        assert len(list(tmp_path.iterdir())) == 2  # "a" evicted
+        await cache.get("a")
+        assert cache.stats()["disk_hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_disk_index_scanned_once_by_concurrent_first_reads(self, bucket, tmp_path):
+        import asyncio
+
+        bucket.objects["a"] = b"1"
+        bucket.objects["b"] = b"2"
+        cache = _cache(tmp_path)
+
+        with patch.object(
+            object_cache, "_scan_directory", wraps=object_cache._scan_directory
+        ) as scan:
+            await asyncio.gather(cache.get("a"), cache.get("b"))
+
+        assert scan.call_count == 1
+        assert cache.stats()["disk_bytes"] > 0
+
+    @pytest.mark.asyncio
+    async def test_corrupt_disk_entry_is_refetched(self, bucket, tmp_path):
+        bucket.objects["k"] = b"data"
+        cache = _cache(tmp_path)
+        await cache.get("k")
+        cache.clear_memory()
+        for path in tmp_path.iterdir():
+            path.write_bytes(b"")
+
+        assert await cache.get("k") == b"data"
+        assert cache.stats()["misses"] == 2
+
+
+class TestModuleHelpers:
+    @pytest.mark.asyncio
+    async def test_singleton_put_get_delete(self, bucket):
+        await object_cache.put_object("h.json", b"{}", "application/json")
+        assert await object_cache.get_object("h.json") == b"{}"
+        assert object_cache.stats()["memory_hits"] == 1
+
+        await object_cache.delete_object("h.json")
+        assert "h.json" not in bucket.objects
+        assert object_cache.stats()["memory_bytes"] == 0
@@ -7,7 +7,14 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from app.activities.purge import _pg_dsn, purge_project_data
+from app.activities.purge import _pg_dsn, purge_project_data, purge_projects
+
+
+@pytest.fixture(autouse=True)
+def mock_release_blobs():
+    """Blob reference release is covered in test_blob_store; here it finds nothing."""
+    with patch("app.activities.purge.release_project_blobs", AsyncMock(return_value=0)) as m:
+        yield m
 
 
 class TestPgDsn:
@@ -83,7 +90,7 @@ class TestPurgeProjectData:
         await purge_project_data(project_id)
 
         mock_conn.execute.assert_called_once_with(
-            "DELETE FROM projects WHERE id = $1", uuid.UUID(project_id)
+            "DELETE FROM projects WHERE id = ANY($1::uuid[])", [uuid.UUID(project_id)]
         )
         mock_conn.close.assert_awaited_once()
 
@@ -135,3 +142,72 @@ class TestPurgeProjectData:
 
         mock_conn.execute.assert_called_once()
         mock_conn.close.assert_awaited_once()
+
+
+class TestPurgeProjects:
+    """Tests for the bulk purge_projects activity."""
+
+    @pytest.mark.asyncio
+    @patch("app.activities.purge.asyncpg")
+    @patch("app.activities.purge.delete_prefixes")
+    async def test_purges_all_prefixes_in_one_call(
+        self, mock_delete: MagicMock, mock_asyncpg: MagicMock
+    ) -> None:
+        from app.models.contracts import PurgeProjectsInput
+        from app.utils.r2_async import PurgeReport
+
+        mock_delete.return_value = PurgeReport(prefixes=2, deleted=30, seconds=1.5)
+        mock_conn = AsyncMock()
+        mock_asyncpg.connect = AsyncMock(return_value=mock_conn)
+        ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+
+        result = await purge_projects(PurgeProjectsInput(project_ids=ids))
+
+        mock_delete.assert_awaited_once_with([f"projects/{ids[0]}/", f"projects/{ids[1]}/"])
+        mock_conn.execute.assert_called_once_with(
+            "DELETE FROM projects WHERE id = ANY($1::uuid[])", [uuid.UUID(i) for i in ids]
+        )
+        assert mock_asyncpg.connect.await_count == 1
+        assert result.objects_deleted == 30
+        assert result.objects_failed == 0
+        assert result.objects_per_second == 20.0
+
+    @pytest.mark.asyncio
+    @patch("app.activities.purge.asyncpg")
+    @patch("app.activities.purge.delete_prefixes")
+    async def test_releases_blobs_before_deleting_prefixes(
+        self, mock_delete: MagicMock, mock_asyncpg: MagicMock, mock_release_blobs: AsyncMock
+    ) -> None:
+        from app.models.contracts import PurgeProjectsInput
+        from app.utils.r2_async import PurgeReport
+
+        calls: list[str] = []
+        mock_release_blobs.side_effect = lambda ids: calls.append("release") or 2
+        mock_delete.side_effect = lambda prefixes: calls.append("delete") or PurgeReport(
+            prefixes=1, deleted=30, seconds=1.5
+        )
+        mock_asyncpg.connect = AsyncMock(return_value=AsyncMock())
+        ids = [str(uuid.uuid4())]
+
+        result = await purge_projects(PurgeProjectsInput(project_ids=ids))
+
+        mock_release_blobs.assert_awaited_once_with(ids)
+        assert calls == ["release", "delete"]
+        assert result.objects_deleted == 32
+
+    @pytest.mark.asyncio
+    @patch("app.activities.purge.asyncpg")
+    @patch("app.activities.purge.delete_prefixes")
+    async def test_reports_failed_objects(
+        self, mock_delete: MagicMock, mock_asyncpg: MagicMock
+    ) -> None:
+        from app.models.contracts import PurgeProjectsInput
+        from app.utils.r2_async import PurgeReport
+
+        mock_delete.return_value = PurgeReport(
+            prefixes=1, deleted=4, failed=[{"Key": "k", "Code": "AccessDenied"}], seconds=1.0
+        )
+        mock_asyncpg.connect = AsyncMock(return_value=AsyncMock())
+
+        result = await purge_projects(PurgeProjectsInput(project_ids=[str(uuid.uuid4())]))
+        assert result.objects_failed == 1
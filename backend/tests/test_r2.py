@@ -1,7 +1,7 @@
-"""Tests for R2 storage client — verifies upload, download URL, delete, and prefix operations.
+"""Tests for R2 storage client — verifies presigned URLs, URL caching, and variant keys.
 
 All boto3 calls are mocked since R2 is an external service.
-Success metric: Upload/download test object succeeds (via mock verification).
+Success metric: keys resolve to presigned URLs (via mock verification).
 """
 
 from unittest.mock import MagicMock, patch
@@ -30,39 +30,6 @@ def mock_s3():
         yield mock_client
 
 
-class TestUploadObject:
-    """Tests for R2 object upload."""
-
-    def test_upload_calls_put_object(self, mock_s3):
-        """Verifies upload_object calls put_object with correct params and returns the key."""
-        key = "projects/abc/photos/room_0.jpg"
-        data = b"fake-image-bytes"
-
-        result = r2.upload_object(key, data, content_type="image/jpeg")
-
-        mock_s3.put_object.assert_called_once_with(
-            Bucket=settings.r2_bucket_name,
-            Key=key,
-            Body=data,
-            ContentType="image/jpeg",
-        )
-        assert result == key
-
-    def test_upload_default_content_type(self, mock_s3):
-        """Verifies upload_object defaults to image/jpeg content type."""
-        r2.upload_object("test/key.jpg", b"data")
-
-        call_kwargs = mock_s3.put_object.call_args[1]
-        assert call_kwargs["ContentType"] == "image/jpeg"
-
-    def test_upload_custom_content_type(self, mock_s3):
-        """Verifies upload_object respects custom content type."""
-        r2.upload_object("test/key.png", b"data", content_type="image/png")
-
-        call_kwargs = mock_s3.put_object.call_args[1]
-        assert call_kwargs["ContentType"] == "image/png"
-
-
 class TestGeneratePresignedUrl:
     """Tests for pre-signed URL generation."""
 
@@ -107,162 +74,24 @@ class TestGeneratePresignedUrl:
         assert call_kwargs[1]["key"] == "projects/abc/missing.jpg"
 
 
-class TestHeadObject:
-    """Tests for object existence check."""
-
-    def test_returns_true_when_exists(self, mock_s3):
-        """Verifies head_object returns True when object exists."""
-        mock_s3.head_object.return_value = {"ContentLength": 1024}
-
-        assert r2.head_object("projects/abc/photos/room_0.jpg") is True
-
-    def test_returns_false_when_not_found(self, mock_s3):
-        """Verifies head_object returns False for 404 errors."""
-        mock_s3.head_object.side_effect = ClientError(
-            {"Error": {"Code": "404", "Message": "Not Found"}},
-            "HeadObject",
-        )
-
-        assert r2.head_object("projects/abc/nonexistent.jpg") is False
-
-    def test_raises_on_other_errors(self, mock_s3):
-        """Verifies head_object re-raises non-404 ClientErrors."""
-        mock_s3.head_object.side_effect = ClientError(
-            {"Error": {"Code": "403", "Message": "Forbidden"}},
-            "HeadObject",
-        )
-
-        with pytest.raises(ClientError):
-            r2.head_object("projects/abc/photos/room_0.jpg")
-
-    def test_logs_non_404_error(self, mock_s3):
-        """Verifies head_object logs non-404 errors before re-raising."""
-        mock_s3.head_object.side_effect = ClientError(
-            {"Error": {"Code": "403", "Message": "Forbidden"}},
-            "HeadObject",
-        )
-
-        with patch.object(r2, "logger") as mock_logger, pytest.raises(ClientError):
-            r2.head_object("projects/abc/secret.jpg")
-
-        mock_logger.error.assert_called_once()
-        call_kwargs = mock_logger.error.call_args
-        assert call_kwargs[0][0] == "r2_head_failed"
-        assert call_kwargs[1]["key"] == "projects/abc/secret.jpg"
-
-
-class TestDeleteObject:
-    """Tests for single object deletion."""
-
-    def test_deletes_object(self, mock_s3):
-        """Verifies delete_object calls S3 delete_object with correct params."""
-        r2.delete_object("projects/abc/photos/room_0.jpg")
-
-        mock_s3.delete_object.assert_called_once_with(
-            Bucket=settings.r2_bucket_name,
-            Key="projects/abc/photos/room_0.jpg",
-        )
-
-
-class TestDeletePrefix:
-    """Tests for prefix-based bulk deletion."""
-
-    def test_deletes_all_objects_under_prefix(self, mock_s3):
-        """Verifies delete_prefix lists and deletes all objects under a prefix."""
-        paginator = MagicMock()
-        mock_s3.get_paginator.return_value = paginator
-        paginator.paginate.return_value = [
-            {
-                "Contents": [
-                    {"Key": "projects/abc/photos/room_0.jpg"},
-                    {"Key": "projects/abc/photos/room_1.jpg"},
-                ]
-            },
-        ]
-        mock_s3.delete_objects.return_value = {"Deleted": [{"Key": "k"}]}
-
-        r2.delete_prefix("projects/abc/")
-
-        mock_s3.get_paginator.assert_called_once_with("list_objects_v2")
-        mock_s3.delete_objects.assert_called_once_with(
-            Bucket=settings.r2_bucket_name,
-            Delete={
-                "Objects": [
-                    {"Key": "projects/abc/photos/room_0.jpg"},
-                    {"Key": "projects/abc/photos/room_1.jpg"},
-                ]
-            },
-        )
-
-    def test_handles_empty_prefix(self, mock_s3):
-        """Verifies delete_prefix handles empty results gracefully."""
-        paginator = MagicMock()
-        mock_s3.get_paginator.return_value = paginator
-        paginator.paginate.return_value = [{"Contents": []}]
-
-        r2.delete_prefix("projects/nonexistent/")
-
-        mock_s3.delete_objects.assert_not_called()
-
-    def test_handles_multiple_pages(self, mock_s3):
-        """Verifies delete_prefix handles pagination across multiple pages."""
-        paginator = MagicMock()
-        mock_s3.get_paginator.return_value = paginator
-        paginator.paginate.return_value = [
-            {"Contents": [{"Key": "projects/abc/photos/room_0.jpg"}]},
-            {"Contents": [{"Key": "projects/abc/generated/option_0.png"}]},
-        ]
-        mock_s3.delete_objects.return_value = {"Deleted": [{"Key": "k"}]}
-
-        r2.delete_prefix("projects/abc/")
-
-        assert mock_s3.delete_objects.call_count == 2
-
-    def test_partial_failure_logs_warning(self, mock_s3):
-        """Verifies delete_prefix warns when some objects fail to delete."""
-        paginator = MagicMock()
-        mock_s3.get_paginator.return_value = paginator
-        paginator.paginate.return_value = [
-            {
-                "Contents": [
-                    {"Key": "projects/abc/photos/room_0.jpg"},
-                    {"Key": "projects/abc/photos/room_1.jpg"},
-                ]
-            },
-        ]
-        mock_s3.delete_objects.return_value = {
-            "Deleted": [{"Key": "projects/abc/photos/room_0.jpg"}],
-            "Errors": [{"Key": "projects/abc/photos/room_1.jpg", "Code": "AccessDenied"}],
-        }
-
-        with patch.object(r2, "logger") as mock_logger:
-            r2.delete_prefix("projects/abc/")
-
-        mock_logger.warning.assert_called_once()
-        call_args = mock_logger.warning.call_args
-        assert call_args[0][0] == "r2_delete_partial_failure"
-        assert call_args[1]["prefix"] == "projects/abc/"
-        assert len(call_args[1]["errors"]) == 1
-
-
 class TestClientSingleton:
     """Tests for the lazy-init singleton pattern."""
 
-    def test_client_is_reused(self, mock_s3):
+    def test_client_is_reused(self):
         """Verifies the client is created once and reused."""
-        r2.upload_object("key1", b"data1")
-        r2.upload_object("key2", b"data2")
+        with patch.object(r2, "_build_client") as mock_build:
+            mock_build.return_value = MagicMock()
+            assert r2._get_client() is r2._get_client()
 
-        # _build_client is called once (via the mock_s3 fixture)
-        assert mock_s3.put_object.call_count == 2
+            assert mock_build.call_count == 1
 
     def test_reset_forces_rebuild(self):
         """Verifies reset_client allows a fresh client to be created."""
         with patch.object(r2, "_build_client") as mock_build:
             mock_build.return_value = MagicMock()
-            r2.upload_object("key1", b"data1")
+            r2._get_client()
             r2.reset_client()
-            r2.upload_object("key2", b"data2")
+            r2._get_client()
 
             assert mock_build.call_count == 2
 
@@ -313,3 +142,108 @@ class TestResolveUrls:
         """Empty list returns empty list."""
         assert r2.resolve_urls([]) == []
         mock_s3.generate_presigned_url.assert_not_called()
+
+
+class TestVariantKey:
+    """Tests for variant_key — delivery variants stored next to the original."""
+
+    def test_replaces_extension_with_variant_jpg(self):
+        key = r2.variant_key("projects/abc/generated/option_0.png", "preview")
+        assert key == "projects/abc/generated/option_0.preview.jpg"
+
+    def test_stays_under_project_prefix(self):
+        """Variants share the project prefix, so delete_prefix purges them too."""
+        key = r2.variant_key("projects/abc/photos/room_1.jpg", "thumbnail")
+        assert key.startswith("projects/abc/photos/")
+
+    def test_key_without_extension(self):
+        assert r2.variant_key("projects/abc/revisions/x", "thumbnail") == (
+            "projects/abc/revisions/x.thumbnail.jpg"
+        )
+
+
+def _sign_by_key(operation, **kwargs):
+    return f"https://signed/{kwargs['Params']['Key']}"
+
+
+class TestPresignCache:
+    """resolve_url reuses presigned URLs per key until close to expiry."""
+
+    def test_repeat_resolve_reuses_url(self, mock_s3):
+        mock_s3.generate_presigned_url.side_effect = ["https://signed/1", "https://signed/2"]
+        first = r2.resolve_url("projects/abc/generated/option_0.png")
+        second = r2.resolve_url("projects/abc/generated/option_0.png")
+        assert first == second == "https://signed/1"
+        assert mock_s3.generate_presigned_url.call_count == 1
+
+    def test_distinct_keys_signed_separately(self, mock_s3):
+        mock_s3.generate_presigned_url.side_effect = _sign_by_key
+        assert r2.resolve_urls(["a.png", "b.png", "a.png"]) == [
+            "https://signed/a.png",
+            "https://signed/b.png",
+            "https://signed/a.png",
+        ]
+        assert mock_s3.generate_presigned_url.call_count == 2
+
+    def test_resigns_near_expiry(self, mock_s3):
+        """URLs are refreshed PRESIGN_REFRESH_MARGIN_SECONDS before they expire."""
+        mock_s3.generate_presigned_url.side_effect = ["https://signed/1", "https://signed/2"]
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=1000.0):
+            r2.resolve_url("k.png")
+        reuse_for = settings.presigned_url_expiry_seconds - r2.PRESIGN_REFRESH_MARGIN_SECONDS
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=1000.0 + reuse_for - 1):
+            assert r2.resolve_url("k.png") == "https://signed/1"
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=1000.0 + reuse_for):
+            assert r2.resolve_url("k.png") == "https://signed/2"
+
+    def test_short_expiry_reuses_for_half_the_lifetime(self, mock_s3):
+        with patch.object(settings, "presigned_url_expiry_seconds", 600):
+            assert r2._get_presign_cache().ttl_seconds == 300
+
+    def test_bounded_lru(self, mock_s3):
+        mock_s3.generate_presigned_url.side_effect = _sign_by_key
+        with patch.object(settings, "presign_cache_max_entries", 2):
+            r2.resolve_urls(["a", "b", "a", "c"])  # "b" is least recently used
+            r2.resolve_url("a")
+            r2.resolve_url("b")
+        assert mock_s3.generate_presigned_url.call_count == 4
+
+    def test_reset_client_drops_cached_urls(self, mock_s3):
+        mock_s3.generate_presigned_url.return_value = "https://signed/1"
+        r2.resolve_url("k.png")
+        r2.reset_client()
+        r2.resolve_url("k.png")
+        assert mock_s3.generate_presigned_url.call_count == 2
+
+
+class TestPresignBatch:
+    """presign_batch signs all cache misses in one executor hop."""
+
+    @pytest.mark.asyncio
+    async def test_misses_signed_in_one_thread_hop(self, mock_s3):
+        mock_s3.generate_presigned_url.side_effect = _sign_by_key
+        with patch("app.utils.r2.asyncio.to_thread", wraps=r2.asyncio.to_thread) as to_thread:
+            urls = await r2.presign_batch(["a.png", "b.png", "a.png"])
+        assert urls == ["https://signed/a.png", "https://signed/b.png", "https://signed/a.png"]
+        assert to_thread.call_count == 1
+        assert mock_s3.generate_presigned_url.call_count == 2  # deduplicated
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_and_urls_answered_inline(self, mock_s3):
+        mock_s3.generate_presigned_url.side_effect = _sign_by_key
+        r2.resolve_url("a.png")
+        with patch("app.utils.r2.asyncio.to_thread") as to_thread:
+            urls = await r2.presign_batch(["a.png", "https://cdn/x.png"])
+        assert urls == ["https://signed/a.png", "https://cdn/x.png"]
+        to_thread.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_fills_cache_for_resolve_url(self, mock_s3):
+        mock_s3.generate_presigned_url.side_effect = _sign_by_key
+        await r2.presign_batch(["a.png"])
+        assert r2.resolve_url("a.png") == "https://signed/a.png"
+        assert mock_s3.generate_presigned_url.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self, mock_s3):
+        assert await r2.presign_batch([]) == []
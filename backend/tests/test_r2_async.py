@@ -0,0 +1,342 @@
+"""Tests for the async R2 client — signing, error mapping, retries, module helpers.
+
+Requests go to an httpx.MockTransport standing in for the S3 endpoint.
+"""
+
+import asyncio
+import xml.etree.ElementTree as ET
+from unittest.mock import patch
+
+import httpx
+import pytest
+from botocore.exceptions import ClientError
+
+from app.utils import r2_async
+from app.utils.r2_async import AsyncR2Client
+
+_NO_SUCH_KEY = (
+    b"<?xml version='1.0' encoding='UTF-8'?>"
+    b"<Error><Code>NoSuchKey</Code><Message>The specified key does not exist.</Message></Error>"
+)
+
+
+def _client(handler) -> AsyncR2Client:
+    return AsyncR2Client(
+        endpoint_url="https://acct.r2.cloudflarestorage.com",
+        bucket="remo-images",
+        access_key_id="AKID",
+        secret_access_key="secret",
+        transport=httpx.MockTransport(handler),
+    )
+
+
+@pytest.fixture(autouse=True)
+def _reset_client():
+    r2_async.reset_client()
+    yield
+    r2_async.reset_client()
+
+
+@pytest.fixture(autouse=True)
+def _no_backoff():
+    with patch.object(r2_async, "RETRY_BACKOFF_SECONDS", 0):
+        yield
+
+
+class TestAsyncR2Client:
+    """Wire format of the SigV4-signed S3 requests."""
+
+    @pytest.mark.asyncio
+    async def test_put_is_signed_path_style(self):
+        seen: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return httpx.Response(200)
+
+        client = _client(handler)
+        await client.put_object("projects/p 1/photos/room.jpg", b"jpeg", "image/jpeg")
+
+        request = seen[0]
+        assert request.method == "PUT"
+        assert request.url.raw_path == b"/remo-images/projects/p%201/photos/room.jpg"
+        assert request.content == b"jpeg"
+        assert request.headers["content-type"] == "image/jpeg"
+        assert request.headers["authorization"].startswith("AWS4-HMAC-SHA256 Credential=AKID/")
+        assert "/auto/s3/aws4_request" in request.headers["authorization"]
+        assert "x-amz-date" in request.headers
+        assert "x-amz-content-sha256" in request.headers
+
+    @pytest.mark.asyncio
+    async def test_get_returns_body_and_headers(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, content=b"data", headers={"ETag": '"abc"'})
+
+        data, headers = await _client(handler).get_object("k")
+        assert data == b"data"
+        assert headers["etag"] == '"abc"'
+
+    @pytest.mark.asyncio
+    async def test_error_body_maps_to_client_error(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(404, content=_NO_SUCH_KEY)
+
+        with pytest.raises(ClientError) as exc_info:
+            await _client(handler).get_object("missing")
+        assert exc_info.value.response["Error"]["Code"] == "NoSuchKey"
+        assert exc_info.value.operation_name == "GetObject"
+
+    @pytest.mark.asyncio
+    async def test_head_error_code_is_status(self):
+        """HEAD responses have no body — the code is the status, like boto3."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(403)
+
+        with pytest.raises(ClientError) as exc_info:
+            await _client(handler).head_object("k")
+        assert exc_info.value.response["Error"]["Code"] == "403"
+
+    @pytest.mark.asyncio
+    async def test_retries_server_errors_with_fresh_signature(self):
+        statuses = iter([503, 500, 200])
+        seen: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return httpx.Response(next(statuses))
+
+        await _client(handler).delete_object("k")
+        assert len(seen) == 3
+        assert all("authorization" in r.headers for r in seen)
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_retry_budget(self):
+        calls = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            return httpx.Response(503)
+
+        with pytest.raises(ClientError):
+            await _client(handler).delete_object("k")
+        assert calls == r2_async.RETRY_ATTEMPTS
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self):
+        calls = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            return httpx.Response(403)
+
+        with pytest.raises(ClientError):
+            await _client(handler).delete_object("k")
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_transport_errors_are_retried(self):
+        attempts = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise httpx.ConnectError("reset")
+            return httpx.Response(200)
+
+        await _client(handler).put_object("k", b"x", "image/png")
+        assert attempts == 2
+
+
+class TestModuleHelpers:
+    """upload_object / get_object / head_object / delete_object on the singleton."""
+
+    @pytest.fixture
+    def requests(self):
+        seen: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            if request.url.path.endswith("/missing"):
+                return httpx.Response(404)
+            return httpx.Response(200, content=b"body")
+
+        with patch.object(r2_async, "_build_client", return_value=_client(handler)):
+            yield seen
+
+    @pytest.mark.asyncio
+    async def test_upload_returns_key(self, requests):
+        key = await r2_async.upload_object("projects/p/a.png", b"png", content_type="image/png")
+        assert key == "projects/p/a.png"
+        assert requests[0].method == "PUT"
+
+    @pytest.mark.asyncio
+    async def test_get_object_bytes(self, requests):
+        assert await r2_async.get_object("projects/p/a.png") == b"body"
+
+    @pytest.mark.asyncio
+    async def test_head_object_true_false(self, requests):
+        assert await r2_async.head_object("projects/p/a.png") is True
+        assert await r2_async.head_object("projects/p/missing") is False
+
+    @pytest.mark.asyncio
+    async def test_delete_object(self, requests):
+        await r2_async.delete_object("projects/p/a.png")
+        assert requests[0].method == "DELETE"
+
+    @pytest.mark.asyncio
+    async def test_client_is_shared_and_closed(self, requests):
+        first = r2_async._get_client()
+        assert r2_async._get_client() is first
+        await r2_async.close_client()
+        assert r2_async._client is None
+
+
+class TestConditionalGet:
+    @pytest.mark.asyncio
+    async def test_not_modified_returns_none(self):
+        seen: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return httpx.Response(304)
+
+        assert await _client(handler).get_object_if_none_match("k", '"abc"') is None
+        assert seen[0].headers["if-none-match"] == '"abc"'
+
+    @pytest.mark.asyncio
+    async def test_changed_returns_body(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, content=b"new", headers={"ETag": '"def"'})
+
+        data, headers = await _client(handler).get_object_if_none_match("k", '"abc"')
+        assert data == b"new"
+        assert headers["etag"] == '"def"'
+
+
+class _ListingBucket:
+    """MockTransport handler serving ListObjectsV2 pages and DeleteObjects."""
+
+    def __init__(self, keys: list[str], page_size: int = 2) -> None:
+        self.keys = sorted(keys)
+        self.page_size = page_size
+        self.fail_once: dict[str, str] = {}  # key -> error code on first delete
+        self.deny_prefixes: set[str] = set()  # listing these answers 403 AccessDenied
+        self.deleted: list[str] = []
+        self.delete_bodies: list[bytes] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            prefix = request.url.params["prefix"]
+            if prefix in self.deny_prefixes:
+                return httpx.Response(403, content=b"<Error><Code>AccessDenied</Code></Error>")
+            after = request.url.params.get("continuation-token", "")
+            matching = [k for k in self.keys if k.startswith(prefix) and k > after]
+            page, rest = matching[: self.page_size], matching[self.page_size :]
+            contents = "".join(f"<Contents><Key>{k}</Key></Contents>" for k in page)
+            token = f"<NextContinuationToken>{page[-1]}</NextContinuationToken>" if rest else ""
+            body = (
+                '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                f"<IsTruncated>{'true' if rest else 'false'}</IsTruncated>{contents}{token}"
+                "</ListBucketResult>"
+            )
+            return httpx.Response(200, content=body.encode())
+        assert request.method == "POST" and request.url.query == b"delete="
+        assert "content-md5" in request.headers
+        self.delete_bodies.append(request.content)
+        errors = ""
+        for key in ET.fromstring(request.content).iter("Key"):
+            code = self.fail_once.pop(key.text or "", None)
+            if code:
+                errors += f"<Error><Key>{key.text}</Key><Code>{code}</Code></Error>"
+            else:
+                self.deleted.append(key.text or "")
+        body = (
+            f'<DeleteResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">{errors}</DeleteResult>'
+        )
+        return httpx.Response(200, content=body.encode())
+
+
+class TestBulkPurge:
+    """delete_prefixes — paginated, concurrent, retrying bulk delete."""
+
+    @pytest.fixture
+    def bucket(self):
+        fake = _ListingBucket(
+            [f"projects/a/photos/{i}.jpg" for i in range(5)]
+            + [f"projects/b/generated/{i}.png" for i in range(3)]
+            + ["projects/c/keep.jpg"]
+        )
+        with patch.object(r2_async, "_build_client", return_value=_client(fake.handler)):
+            yield fake
+
+    @pytest.mark.asyncio
+    async def test_deletes_every_page_of_every_prefix(self, bucket):
+        report = await r2_async.delete_prefixes(["projects/a/", "projects/b/"])
+
+        assert sorted(bucket.deleted) == sorted(k for k in bucket.keys if "/c/" not in k)
+        assert len(bucket.delete_bodies) == 5  # 3 pages of a, 2 of b
+        assert report.prefixes == 2
+        assert report.deleted == 8
+        assert report.failed == []
+        assert report.objects_per_second > 0
+
+    @pytest.mark.asyncio
+    async def test_empty_prefix_sends_no_delete(self, bucket):
+        report = await r2_async.delete_prefix("projects/missing/")
+        assert report.deleted == 0
+        assert bucket.delete_bodies == []
+
+    @pytest.mark.asyncio
+    async def test_error_entries_are_retried(self, bucket):
+        bucket.fail_once["projects/a/photos/1.jpg"] = "InternalError"
+
+        report = await r2_async.delete_prefix("projects/a/")
+
+        assert report.deleted == 5
+        assert report.failed == []
+        assert b"projects/a/photos/1.jpg" in bucket.delete_bodies[-1]
+
+    @pytest.mark.asyncio
+    async def test_persistent_errors_are_reported(self, bucket):
+        with patch.object(r2_async, "PURGE_DELETE_ATTEMPTS", 1):
+            bucket.fail_once["projects/b/generated/0.png"] = "AccessDenied"
+            with patch.object(r2_async, "logger") as mock_logger:
+                report = await r2_async.delete_prefix("projects/b/")
+
+        assert report.deleted == 2
+        assert report.failed == [
+            {"Key": "projects/b/generated/0.png", "Code": "AccessDenied", "Message": ""}
+        ]
+        assert mock_logger.warning.call_args[0][0] == "r2_delete_partial_failure"
+
+    @pytest.mark.asyncio
+    async def test_failing_prefix_raises_client_error(self, bucket):
+        """Task failures surface as the ClientError itself, not an ExceptionGroup."""
+        bucket.deny_prefixes.add("projects/b/")
+
+        with pytest.raises(ClientError) as exc_info:
+            await r2_async.delete_prefixes(["projects/a/", "projects/b/"])
+        assert exc_info.value.response["Error"]["Code"] == "AccessDenied"
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, bucket):
+        in_flight = peak = 0
+        real = AsyncR2Client.delete_objects
+
+        async def tracked(self, keys):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            try:
+                return await real(self, keys)
+            finally:
+                in_flight -= 1
+
+        with patch.object(AsyncR2Client, "delete_objects", tracked):
+            await r2_async.delete_prefixes(["projects/a/", "projects/b/"], max_concurrency=2)
+        assert peak <= 2
@@ -451,6 +451,7 @@ class TestOpenAPISchema:
             "/api/v1/projects",
             "/api/v1/projects/{project_id}",
             "/api/v1/projects/{project_id}/photos",
+            "/api/v1/projects/{project_id}/photos/batch",
             "/api/v1/projects/{project_id}/photos/{photo_id}",
             "/api/v1/projects/{project_id}/photos/{photo_id}/note",
             "/api/v1/projects/{project_id}/photos/confirm",
@@ -469,6 +470,7 @@ class TestOpenAPISchema:
             "/api/v1/projects/{project_id}/retry",
             "/api/v1/projects/{project_id}/shopping/stream",
             "/api/v1/debug/force-failure",
+            "/api/v1/storage/{key}",
         }
         assert expected_paths == paths
 
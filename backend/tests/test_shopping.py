@@ -49,6 +49,7 @@ from app.activities.shopping import (
     _room_size_label,
     _search_exa,
     _strip_code_fence,
+    _trace_project_id,
     _validate_extracted_items,
     apply_confidence_filtering,
     extract_items,
@@ -1046,6 +1047,30 @@ class TestExtractRetailer:
         assert _extract_retailer("not a url") == "Unknown"
 
 
+class TestTraceProjectId:
+    def test_prefers_explicit_project_id(self):
+        inp = GenerateShoppingListInput(
+            design_image_url="blobs/abc.webp",
+            original_room_photo_urls=["projects/other/photos/room_1.jpg"],
+            project_id="proj-1",
+        )
+        assert _trace_project_id(inp) == "proj-1"
+
+    def test_edited_design_falls_back_to_room_photos(self):
+        """Revisions live under blobs/, so the design URL carries no project id."""
+        inp = GenerateShoppingListInput(
+            design_image_url="blobs/abc.webp",
+            original_room_photo_urls=["projects/proj-2/photos/room_1.jpg"],
+        )
+        assert _trace_project_id(inp) == "proj-2"
+
+    def test_unknown_without_any_project_key(self):
+        inp = GenerateShoppingListInput(
+            design_image_url="blobs/abc.webp", original_room_photo_urls=[]
+        )
+        assert _trace_project_id(inp) == "unknown"
+
+
 # === Price Extraction Tests ===
 
 
@@ -3216,14 +3241,13 @@ class TestR2ResolutionInShopping:
         {"ANTHROPIC_API_KEY": "test-key", "EXA_API_KEY": "test-exa"},
     )
     @patch("app.activities.shopping.extract_items")
-    @patch("app.utils.r2.resolve_url")
-    @patch("app.utils.r2.resolve_urls")
-    def test_r2_keys_resolved_to_presigned_urls(
-        self, mock_resolve_urls, mock_resolve_url, mock_extract
-    ):
+    @patch("app.utils.r2.presign_batch")
+    def test_r2_keys_resolved_to_presigned_urls(self, mock_presign, mock_extract):
         """R2 storage keys should be resolved to presigned URLs before pipeline starts."""
-        mock_resolve_url.return_value = "https://presigned.r2/design.jpg"
-        mock_resolve_urls.return_value = ["https://presigned.r2/room.jpg"]
+        mock_presign.return_value = [
+            "https://presigned.r2/design.jpg",
+            "https://presigned.r2/room.jpg",
+        ]
         mock_extract.return_value = []  # short-circuit: no items → pipeline ends
 
         input_data = GenerateShoppingListInput(
@@ -3233,8 +3257,8 @@ class TestR2ResolutionInShopping:
 
         result = asyncio.run(generate_shopping_list(input_data))
 
-        mock_resolve_url.assert_called_once_with("projects/p1/design.jpg")
-        mock_resolve_urls.assert_called_once_with(["projects/p1/room.jpg"])
+        mock_presign.assert_awaited_once_with(["projects/p1/design.jpg", "projects/p1/room.jpg"])
+        assert mock_extract.call_args.args[1] == "https://presigned.r2/design.jpg"
         assert result.items == []
 
 
@@ -3442,11 +3466,11 @@ class TestGenerateShoppingListStreaming:
         assert "Extraction failed" in events[0]
 
     def test_url_resolution_failure_yields_error(self, monkeypatch):
-        """resolve_url failure should yield error event, not crash."""
+        """presign_batch failure should yield error event, not crash."""
         monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
         monkeypatch.setenv("EXA_API_KEY", "test-key")
 
-        # Use R2 storage keys (not https:// URLs) to trigger resolve_url
+        # Use R2 storage keys (not https:// URLs) to trigger presigning
         inp = GenerateShoppingListInput(
             design_image_url="projects/test-123/generated/opt0.png",
             original_room_photo_urls=["projects/test-123/photos/room.jpg"],
@@ -3454,7 +3478,7 @@ class TestGenerateShoppingListStreaming:
         )
 
         with patch(
-            "app.utils.r2.resolve_url",
+            "app.utils.r2.presign_batch",
             side_effect=Exception("R2 connection failed"),
         ):
             events = asyncio.run(self._collect_events(inp))
@@ -0,0 +1,144 @@
+"""Tests for the storage backend interface and the local filesystem backend."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.config import settings
+from app.utils import r2, r2_async, storage
+from app.utils.storage import LocalStorageBackend
+
+
+@pytest.fixture
+def local(tmp_path):
+    """Select the local backend, rooted in a temp directory."""
+    with (
+        patch.object(settings, "storage_backend", "local"),
+        patch.object(settings, "local_storage_dir", str(tmp_path / "storage")),
+        patch.object(settings, "local_storage_base_url", "http://test"),
+    ):
+        storage.reset_backend()
+        yield storage.get_local_backend()
+    storage.reset_backend()
+
+
+class TestLocalStorageBackend:
+    @pytest.mark.asyncio
+    async def test_put_get_head_delete(self, local):
+        headers = await local.put_object("projects/p/photos/room.jpg", b"jpeg", "image/jpeg")
+        data, got = await local.get_object("projects/p/photos/room.jpg")
+
+        assert data == b"jpeg"
+        assert got["etag"] == headers["etag"]
+        assert got["content-type"] == "image/jpeg"
+        assert (await local.head_object("projects/p/photos/room.jpg"))["content-length"] == "4"
+
+        await local.delete_object("projects/p/photos/room.jpg")
+        with pytest.raises(ClientError) as exc_info:
+            await local.get_object("projects/p/photos/room.jpg")
+        assert exc_info.value.response["Error"]["Code"] == "NoSuchKey"
+
+    @pytest.mark.asyncio
+    async def test_head_missing_code_is_404(self, local):
+        with pytest.raises(ClientError) as exc_info:
+            await local.head_object("projects/p/missing.jpg")
+        assert exc_info.value.response["Error"]["Code"] == "404"
+
+    @pytest.mark.asyncio
+    async def test_conditional_get(self, local):
+        headers = await local.put_object("k.json", b"v1", "application/json")
+        assert await local.get_object_if_none_match("k.json", headers["etag"]) is None
+        await local.put_object("k.json", b"v2", "application/json")
+        data, _ = await local.get_object_if_none_match("k.json", headers["etag"])
+        assert data == b"v2"
+
+    @pytest.mark.asyncio
+    async def test_list_pages_and_bulk_delete(self, local):
+        for i in range(5):
+            await local.put_object(f"projects/a/{i}.jpg", b"x", "image/jpeg")
+        await local.put_object("projects/b/keep.jpg", b"x", "image/jpeg")
+
+        with patch.object(storage, "LIST_PAGE_SIZE", 2):
+            first, token = await local.list_objects("projects/a/")
+            second, token2 = await local.list_objects("projects/a/", token)
+        assert first == ["projects/a/0.jpg", "projects/a/1.jpg"]
+        assert second == ["projects/a/2.jpg", "projects/a/3.jpg"]
+        assert token2 is not None
+
+        report = await r2_async.delete_prefix("projects/a/")
+        assert report.deleted == 5
+        assert (await local.list_objects("projects/"))[0] == ["projects/b/keep.jpg"]
+
+    @pytest.mark.parametrize("key", ["../etc/passwd", "/abs.jpg", "projects//x.jpg", "a/./b"])
+    def test_rejects_keys_escaping_root(self, tmp_path, key):
+        with pytest.raises(ValueError):
+            LocalStorageBackend(tmp_path, "http://test").path_for(key)
+
+
+class TestBackendSelection:
+    def test_r2_is_default(self):
+        with patch.object(r2_async, "_build_client") as build:
+            try:
+                assert storage.get_backend() is build.return_value
+            finally:
+                r2_async.reset_client()
+
+    @pytest.mark.asyncio
+    async def test_module_helpers_use_local_backend(self, local):
+        await r2_async.upload_object("projects/p/a.png", b"png", "image/png")
+        assert await r2_async.get_object("projects/p/a.png") == b"png"
+        assert await r2_async.head_object("projects/p/a.png") is True
+        assert (local.root / "projects" / "p" / "a.png").read_bytes() == b"png"
+
+    def test_resolve_url_points_at_api(self, local):
+        url = r2.resolve_url("projects/p/photos/room 1.jpg")
+        assert url.startswith("http://test/api/v1/storage/projects/p/photos/room%201.jpg?")
+        assert "signature=" in url
+
+
+class TestStorageRoute:
+    @pytest.mark.asyncio
+    async def test_serves_object_behind_signed_url(self, local, client):
+        await local.put_object("projects/p/photos/room.jpg", b"jpeg-bytes", "image/jpeg")
+        url = r2.resolve_url("projects/p/photos/room.jpg").removeprefix("http://test")
+
+        response = await client.get(url)
+
+        assert response.status_code == 200
+        assert response.content == b"jpeg-bytes"
+        assert response.headers["content-type"] == "image/jpeg"
+
+    @pytest.mark.asyncio
+    async def test_tampered_signature_forbidden(self, local, client):
+        await local.put_object("projects/p/a.jpg", b"x", "image/jpeg")
+        expires = int(time.time()) + 60
+        response = await client.get(
+            f"/api/v1/storage/projects/p/a.jpg?expires={expires}&signature=deadbeef"
+        )
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_expired_url_forbidden(self, local, client):
+        await local.put_object("projects/p/a.jpg", b"x", "image/jpeg")
+        expires = int(time.time()) - 1
+        signature = storage.url_signature("projects/p/a.jpg", expires)
+        response = await client.get(
+            f"/api/v1/storage/projects/p/a.jpg?expires={expires}&signature={signature}"
+        )
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_missing_object_404(self, local, client):
+        expires = int(time.time()) + 60
+        signature = storage.url_signature("projects/p/gone.jpg", expires)
+        response = await client.get(
+            f"/api/v1/storage/projects/p/gone.jpg?expires={expires}&signature={signature}"
+        )
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_disabled_with_r2_backend(self, client):
+        response = await client.get("/api/v1/storage/projects/p/a.jpg?expires=1&signature=x")
+        assert response.status_code == 404
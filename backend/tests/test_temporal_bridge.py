@@ -7,6 +7,7 @@ endpoints, including error handling (RPCError NOT_FOUND, R2 upload/rollback).
 
 from __future__ import annotations
 
+import asyncio
 import io
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -18,6 +19,7 @@ from app.main import app
 from app.models.contracts import (
     DesignOption,
     PhotoData,
+    ValidatePhotoOutput,
     WorkflowError,
     WorkflowState,
 )
@@ -242,7 +244,7 @@ class TestPhotoUploadTemporal:
 
         with (
             _mock_validation(),
-            patch("app.utils.r2.upload_object") as mock_upload,
+            patch("app.utils.r2_async.upload_object") as mock_upload,
         ):
             resp = await client.post(
                 "/api/v1/projects/proj-1/photos",
@@ -255,6 +257,70 @@ class TestPhotoUploadTemporal:
         mock_upload.assert_called_once()
         handle.signal.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_stores_delivery_variants_with_photo(self, temporal_app):
+        """Decodable photo: preview + thumbnail written next to it and signalled with it."""
+        from PIL import Image
+
+        mock_client, client = temporal_app
+        handle = mock_client.get_workflow_handle.return_value
+        handle.query.return_value = _PHOTOS
+        buf = io.BytesIO()
+        Image.new("RGB", (1600, 1200), "gray").save(buf, format="JPEG")
+
+        with (
+            _mock_validation(),
+            patch("app.utils.r2_async.upload_object") as mock_upload,
+        ):
+            resp = await client.post(
+                "/api/v1/projects/proj-1/photos",
+                files={"file": ("room.jpg", io.BytesIO(buf.getvalue()), "image/jpeg")},
+                data={"photo_type": "room"},
+            )
+
+        assert resp.status_code == 200
+        keys = [c.args[0] for c in mock_upload.call_args_list]
+        assert len(keys) == 3
+        photo = handle.signal.call_args.args[1]
+        assert photo.variants is not None
+        assert photo.variants.preview_url == keys[0].replace(".jpg", ".preview.jpg")
+        assert {photo.variants.preview_url, photo.variants.thumbnail_url} == set(keys[1:])
+
+    @pytest.mark.asyncio
+    async def test_variants_render_while_validation_runs(self, temporal_app):
+        """The variant render is started with the upload, not after validation."""
+        mock_client, client = temporal_app
+        handle = mock_client.get_workflow_handle.return_value
+        handle.query.return_value = _PHOTOS
+        render_started = asyncio.Event()
+
+        async def render(fn, data):
+            render_started.set()
+            return {"preview": b"p", "thumbnail": b"t"}
+
+        async def validate(_input):
+            await asyncio.wait_for(render_started.wait(), timeout=1)
+            return ValidatePhotoOutput(passed=True, failures=[], messages=["OK"])
+
+        pool = MagicMock()
+        pool.has_capacity.return_value = True
+        pool.run = AsyncMock(side_effect=render)
+        with (
+            patch("app.api.routes.projects.get_image_pool", return_value=pool),
+            patch("app.api.routes.projects.validate_photo", side_effect=validate),
+            patch("app.utils.r2_async.upload_object") as mock_upload,
+        ):
+            resp = await client.post(
+                "/api/v1/projects/proj-1/photos",
+                files=_photo_files(),
+                data={"photo_type": "room"},
+            )
+
+        assert resp.status_code == 200
+        assert resp.json()["validation"]["passed"] is True
+        assert mock_upload.call_count == 3
+        assert handle.signal.call_args.args[1].variants is not None
+
     @pytest.mark.asyncio
     async def test_r2_upload_failure_returns_500(self, temporal_app):
         """R2 upload failure is re-raised -> 500."""
@@ -265,7 +331,7 @@ class TestPhotoUploadTemporal:
         with (
             _mock_validation(),
             patch(
-                "app.utils.r2.upload_object",
+                "app.utils.r2_async.upload_object",
                 side_effect=ConnectionError("R2 down"),
             ),
         ):
@@ -277,6 +343,38 @@ class TestPhotoUploadTemporal:
 
         assert resp.status_code == 500
 
+    @pytest.mark.asyncio
+    async def test_r2_upload_failure_drops_variant_render(self, temporal_app):
+        """A failed PUT cancels the in-flight variant render instead of leaking it."""
+        mock_client, client = temporal_app
+        handle = mock_client.get_workflow_handle.return_value
+        handle.query.return_value = _PHOTOS
+        cancelled = asyncio.Event()
+
+        async def render(fn, data):
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        pool = MagicMock()
+        pool.has_capacity.return_value = True
+        pool.run = AsyncMock(side_effect=render)
+        with (
+            _mock_validation(),
+            patch("app.api.routes.projects.get_image_pool", return_value=pool),
+            patch("app.utils.r2_async.upload_object", side_effect=ConnectionError("R2 down")),
+        ):
+            resp = await client.post(
+                "/api/v1/projects/proj-1/photos",
+                files=_photo_files(),
+                data={"photo_type": "room"},
+            )
+
+        assert resp.status_code == 500
+        assert cancelled.is_set()
+
     @pytest.mark.asyncio
     async def test_signal_failure_triggers_r2_rollback(self, temporal_app):
         """Signal failure after R2 upload -> R2 object deleted."""
@@ -287,8 +385,8 @@ class TestPhotoUploadTemporal:
 
         with (
             _mock_validation(),
-            patch("app.utils.r2.upload_object") as mock_upload,
-            patch("app.utils.r2.delete_object") as mock_delete,
+            patch("app.utils.r2_async.upload_object") as mock_upload,
+            patch("app.utils.r2_async.delete_object") as mock_delete,
         ):
             resp = await client.post(
                 "/api/v1/projects/proj-1/photos",
@@ -310,9 +408,9 @@ class TestPhotoUploadTemporal:
 
         with (
             _mock_validation(),
-            patch("app.utils.r2.upload_object"),
+            patch("app.utils.r2_async.upload_object"),
             patch(
-                "app.utils.r2.delete_object",
+                "app.utils.r2_async.delete_object",
                 side_effect=ConnectionError("R2 down"),
             ),
         ):
@@ -326,15 +424,16 @@ class TestPhotoUploadTemporal:
         assert resp.status_code == 404
 
     @pytest.mark.asyncio
-    async def test_validation_failure_skips_upload_and_signal(self, temporal_app):
-        """Failed validation -> no R2 upload, no signal."""
+    async def test_validation_failure_discards_speculative_upload(self, temporal_app):
+        """Failed validation -> speculative R2 object deleted, no signal."""
         mock_client, client = temporal_app
         handle = mock_client.get_workflow_handle.return_value
         handle.query.return_value = _PHOTOS
 
         with (
             _mock_validation(passed=False),
-            patch("app.utils.r2.upload_object") as mock_upload,
+            patch("app.utils.r2_async.upload_object") as mock_upload,
+            patch("app.utils.r2_async.delete_object") as mock_delete,
         ):
             resp = await client.post(
                 "/api/v1/projects/proj-1/photos",
@@ -344,9 +443,176 @@ class TestPhotoUploadTemporal:
 
         assert resp.status_code == 200
         assert resp.json()["validation"]["passed"] is False
-        mock_upload.assert_not_called()
+        uploaded_key = mock_upload.call_args[0][0]
+        mock_delete.assert_called_once_with(uploaded_key)
+        handle.signal.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_validation_failure_with_failed_upload_skips_delete(self, temporal_app):
+        """Rejected photo whose speculative PUT failed -> nothing to delete, no 500."""
+        mock_client, client = temporal_app
+        handle = mock_client.get_workflow_handle.return_value
+        handle.query.return_value = _PHOTOS
+
+        with (
+            _mock_validation(passed=False),
+            patch("app.utils.r2_async.upload_object", side_effect=ConnectionError("R2 down")),
+            patch("app.utils.r2_async.delete_object") as mock_delete,
+        ):
+            resp = await client.post(
+                "/api/v1/projects/proj-1/photos",
+                files=_photo_files(),
+                data={"photo_type": "room"},
+            )
+
+        assert resp.status_code == 200
+        mock_delete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_r2_upload_overlaps_validation(self, temporal_app):
+        """R2 PUT starts before validation finishes."""
+        import threading
+
+        mock_client, client = temporal_app
+        handle = mock_client.get_workflow_handle.return_value
+        handle.query.return_value = _PHOTOS
+        upload_started = threading.Event()
+
+        async def _validate(_inp):
+            # Let the speculative upload thread start, then check it did
+            await asyncio.to_thread(upload_started.wait, 2)
+            return ValidatePhotoOutput(passed=upload_started.is_set(), failures=[], messages=[])
+
+        with (
+            patch("app.api.routes.projects.validate_photo", side_effect=_validate),
+            patch("app.utils.r2_async.upload_object", side_effect=lambda *a: upload_started.set()),
+        ):
+            resp = await client.post(
+                "/api/v1/projects/proj-1/photos",
+                files=_photo_files(),
+                data={"photo_type": "room"},
+            )
+
+        assert resp.status_code == 200
+        assert resp.json()["validation"]["passed"] is True
+        handle.signal.assert_called_once()
+
+
+def _batch_files(count: int):
+    return [
+        ("files", (f"room{i}.jpg", io.BytesIO(b"\xff\xd8" + b"\x00" * 100), "image/jpeg"))
+        for i in range(count)
+    ]
+
+
+class TestBatchPhotoUploadTemporal:
+    """POST /api/v1/projects/{id}/photos/batch with use_temporal=True."""
+
+    @pytest.mark.asyncio
+    async def test_uploads_all_and_sends_one_signal(self, temporal_app):
+        """Every valid photo is stored, then delivered in a single add_photos signal."""
+        mock_client, client = temporal_app
+        handle = mock_client.get_workflow_handle.return_value
+        handle.query.return_value = _PHOTOS
+
+        with (
+            _mock_validation(),
+            patch("app.utils.r2_async.upload_object") as mock_upload,
+        ):
+            resp = await client.post(
+                "/api/v1/projects/proj-1/photos/batch",
+                files=_batch_files(3),
+                data={"photo_types": ["room", "room", "inspiration"]},
+            )
+
+        assert resp.status_code == 200
+        assert mock_upload.call_count == 3
+        handle.signal.assert_called_once()
+        signal_name, photos = handle.signal.call_args[0]
+        assert signal_name.__name__ == "add_photos"
+        assert [p.photo_id for p in photos] == [r["photo_id"] for r in resp.json()["photos"]]
+
+    @pytest.mark.asyncio
+    async def test_rejected_photos_discarded_not_signalled(self, temporal_app):
+        """Rejected photos' speculative objects are deleted; only accepted ones are signalled."""
+        mock_client, client = temporal_app
+        handle = mock_client.get_workflow_handle.return_value
+        handle.query.return_value = _PHOTOS
+        results = [
+            ValidatePhotoOutput(passed=True, failures=[], messages=[]),
+            ValidatePhotoOutput(passed=False, failures=["blurry"], messages=["Blurry"]),
+        ]
+
+        with (
+            patch("app.api.routes.projects.validate_photo", side_effect=results),
+            patch("app.utils.r2_async.upload_object"),
+            patch("app.utils.r2_async.delete_object") as mock_delete,
+        ):
+            resp = await client.post(
+                "/api/v1/projects/proj-1/photos/batch",
+                files=_batch_files(2),
+                data={"photo_types": ["room", "room"]},
+            )
+
+        assert resp.status_code == 200
+        rejected_id = resp.json()["photos"][1]["photo_id"]
+        mock_delete.assert_called_once()
+        assert rejected_id in mock_delete.call_args[0][0]
+        _, photos = handle.signal.call_args[0]
+        assert len(photos) == 1
+
+    @pytest.mark.asyncio
+    async def test_upload_failure_rolls_back_batch(self, temporal_app):
+        """One failed PUT -> 500, successful PUTs deleted, no signal."""
+        mock_client, client = temporal_app
+        handle = mock_client.get_workflow_handle.return_value
+        handle.query.return_value = _PHOTOS
+
+        def _upload(key, *_args):
+            if "room_" in key and not _upload.failed:
+                _upload.failed = True
+                raise ConnectionError("R2 down")
+            return key
+
+        _upload.failed = False
+
+        with (
+            _mock_validation(),
+            patch("app.utils.r2_async.upload_object", side_effect=_upload),
+            patch("app.utils.r2_async.delete_object") as mock_delete,
+        ):
+            resp = await client.post(
+                "/api/v1/projects/proj-1/photos/batch",
+                files=_batch_files(2),
+                data={"photo_types": ["room", "room"]},
+            )
+
+        assert resp.status_code == 500
+        assert mock_delete.call_count == 1
         handle.signal.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_signal_failure_rolls_back_all_uploads(self, temporal_app):
+        """add_photos signal failure deletes every stored object."""
+        mock_client, client = temporal_app
+        handle = mock_client.get_workflow_handle.return_value
+        handle.query.return_value = _PHOTOS
+        handle.signal.side_effect = _rpc_error(RPCStatusCode.NOT_FOUND)
+
+        with (
+            _mock_validation(),
+            patch("app.utils.r2_async.upload_object"),
+            patch("app.utils.r2_async.delete_object") as mock_delete,
+        ):
+            resp = await client.post(
+                "/api/v1/projects/proj-1/photos/batch",
+                files=_batch_files(2),
+                data={"photo_types": ["room", "room"]},
+            )
+
+        assert resp.status_code == 404
+        assert mock_delete.call_count == 2
+
 
 # ---------------------------------------------------------------------------
 # Delete photo
@@ -692,7 +958,7 @@ class TestSignalErrorPropagation:
 
 
 # ---------------------------------------------------------------------------
-# Photo upload without R2 configured (line 404)
+# Photo upload without storage configured
 # ---------------------------------------------------------------------------
 
 
@@ -708,7 +974,7 @@ class TestPhotoUploadNoR2:
 
         with (
             _mock_validation(),
-            patch("app.api.routes.projects._r2_configured", return_value=False),
+            patch("app.api.routes.projects._storage_configured", return_value=False),
         ):
             resp = await client.post(
                 "/api/v1/projects/proj-1/photos",
@@ -720,6 +986,38 @@ class TestPhotoUploadNoR2:
         assert resp.json()["validation"]["passed"] is True
         handle.signal.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_local_backend_stores_without_r2(self, temporal_app, local_storage):
+        """STORAGE_BACKEND=local stores the photo even with no R2 credentials."""
+        from app.api.routes import projects
+
+        mock_client, client = temporal_app
+        handle = mock_client.get_workflow_handle.return_value
+        handle.query.return_value = _PHOTOS
+
+        with (
+            _mock_validation(),
+            patch.multiple(
+                projects.settings,
+                storage_backend="local",
+                r2_account_id="",
+                r2_access_key_id="",
+                r2_secret_access_key="",
+                r2_bucket_name="",
+            ),
+        ):
+            resp = await client.post(
+                "/api/v1/projects/proj-1/photos",
+                files=_photo_files(),
+                data={"photo_type": "room"},
+            )
+
+        assert resp.status_code == 200
+        keys, _ = await local_storage.list_objects("projects/proj-1/photos/")
+        assert len(keys) == 1
+        assert keys[0].startswith("projects/proj-1/photos/room_")
+        handle.signal.assert_called_once()
+
 
 # ---------------------------------------------------------------------------
 # Signal NOT_FOUND for all remaining endpoints (lines 473, 523, 554,
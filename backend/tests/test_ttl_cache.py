@@ -0,0 +1,51 @@
+"""Tests for ttl_cache — bounded LRU cache with per-entry TTL."""
+
+from unittest.mock import patch
+
+from app.utils.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    def test_miss_then_hit(self):
+        cache: TTLCache[str, int] = TTLCache(max_entries=4, ttl_seconds=60)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_entry_expires_after_ttl(self):
+        cache: TTLCache[str, int] = TTLCache(max_entries=4, ttl_seconds=10)
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=109.9):
+            assert cache.get("a") == 1
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=110.0):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_per_entry_ttl_override(self):
+        cache: TTLCache[str, int] = TTLCache(max_entries=4, ttl_seconds=10)
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=0.0):
+            cache.set("short", 1, ttl_seconds=1)
+            cache.set("long", 2)
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=5.0):
+            assert cache.get("short") is None
+            assert cache.get("long") == 2
+
+    def test_evicts_least_recently_used(self):
+        cache: TTLCache[str, int] = TTLCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # a is now most recent
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_clear_resets_counters(self):
+        cache: TTLCache[str, int] = TTLCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("x")
+        cache.clear()
+        assert cache.stats() == {"cache_hits": 0, "cache_misses": 0, "cache_size": 0}
@@ -2,20 +2,58 @@
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock, patch
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import anthropic
+import pytest
 from PIL import Image, ImageDraw, ImageFilter
 
 from app.activities.validation import (
+    _LAPLACIAN_KERNEL,
+    CLASSIFY_MAX_SIZE,
     MIN_RESOLUTION,
+    NORMALIZE_SIZE,
+    _build_classification_payload,
     _check_blur,
     _check_content,
     _check_resolution,
+    _decode_working_image,
     _detect_media_type,
+    _get_pg_pool,
+    _laplacian_variance,
+    _perceptual_hash,
+    _verdict_cache,
+    find_near_duplicate,
     validate_photo,
 )
-from app.models.contracts import ValidatePhotoInput, ValidatePhotoOutput
+from app.models.contracts import PhotoData, ValidatePhotoInput, ValidatePhotoOutput
+from app.utils.image_pool import ImagePoolSaturatedError, ImageWorkPool
+
+_FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture(autouse=True)
+def _clear_verdict_cache():
+    """Tests reuse identical image bytes — start each one with an empty verdict cache.
+
+    Tests that patch ``settings`` with a MagicMock get a truthy
+    validation_cache_persist, so the Postgres tier is stubbed to be unreachable.
+    The image pool runs in thread mode so patched helpers stay visible.
+    """
+    _verdict_cache.clear()
+    with (
+        patch(
+            "app.activities.validation._get_pg_pool",
+            AsyncMock(side_effect=OSError("no database in unit tests")),
+        ),
+        patch(
+            "app.activities.validation.get_image_pool",
+            return_value=ImageWorkPool(workers=0, max_pending=8, retry_after_seconds=2),
+        ),
+    ):
+        yield
+    _verdict_cache.clear()
 
 
 def _make_image(width: int, height: int, mode: str = "RGB") -> Image.Image:
@@ -143,6 +181,155 @@ class TestCheckBlur:
         # The result depends on image content, not the cap itself.
 
 
+class TestLaplacianVariance:
+    """Tests for _laplacian_variance — histogram-based blur metric."""
+
+    def test_matches_per_pixel_reference(self) -> None:
+        """Variance must equal the population variance of the clamped Laplacian pixels."""
+        gray = Image.effect_noise((256, 192), 40)
+        pixels = list(gray.filter(_LAPLACIAN_KERNEL).getdata())
+        mean = sum(pixels) / len(pixels)
+        expected = sum((p - mean) ** 2 for p in pixels) / len(pixels)
+
+        result = _laplacian_variance(gray)
+        assert result is not None
+        assert abs(result - expected) < 1e-6 * max(1.0, expected)
+
+    def test_solid_image_has_zero_variance(self) -> None:
+        """A flat black image has no edges (Pillow copies border pixels unfiltered)."""
+        assert _laplacian_variance(Image.new("L", (64, 64), 0)) == 0.0
+
+    def test_empty_image_returns_none(self) -> None:
+        """Zero-area image cannot be analyzed."""
+        assert _laplacian_variance(Image.new("L", (0, 0))) is None
+
+    @pytest.mark.benchmark
+    def test_fast_at_max_normalized_size(self) -> None:
+        """Micro-benchmark: filter + statistics stay well under the old per-pixel loop.
+
+        1024x4096 is the largest working image _check_blur produces
+        (NORMALIZE_SIZE on the short side, 4x cap on the long side).
+        The call measures ~50ms (nearly all in the 3x3 filter); the old
+        per-pixel Python loop took ~480ms for the statistics alone.
+        Run with ``pytest -m benchmark``.
+        """
+        import time
+
+        gray = Image.effect_noise((NORMALIZE_SIZE, NORMALIZE_SIZE * 4), 40)
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            _laplacian_variance(gray)
+            timings.append(time.perf_counter() - start)
+        assert min(timings) < 0.1
+
+
+class TestDecodeWorkingImage:
+    """Tests for _decode_working_image — reduced-resolution (draft) decode."""
+
+    def test_large_jpeg_decoded_at_reduced_size(self) -> None:
+        """JPEG draft mode scales down but keeps the short side >= NORMALIZE_SIZE."""
+        import io
+
+        data = _image_to_bytes(_make_sharp_image(4800, 3600))
+        img = _decode_working_image(Image.open(io.BytesIO(data)))
+
+        assert img.size == (2400, 1800)
+        assert img.mode == "L"
+
+    def test_small_jpeg_decoded_at_full_size(self) -> None:
+        """JPEG already at/below NORMALIZE_SIZE is not scaled."""
+        import io
+
+        data = _image_to_bytes(_make_sharp_image(1024, 768))
+        img = _decode_working_image(Image.open(io.BytesIO(data)))
+
+        assert img.size == (1024, 768)
+
+    def test_png_decoded_at_full_size(self) -> None:
+        """Formats without draft support decode at full resolution."""
+        import io
+
+        data = _image_to_bytes(_make_sharp_image(2048, 1536), fmt="PNG")
+        img = _decode_working_image(Image.open(io.BytesIO(data)))
+
+        assert img.size == (2048, 1536)
+
+    def test_truncated_jpeg_raises_in_draft_mode(self) -> None:
+        """Draft decoding still reads the whole scan, so truncation is detected."""
+        import io
+
+        data = _image_to_bytes(_make_sharp_image(4800, 3600))
+        truncated = data[: len(data) // 2]
+        with pytest.raises(OSError):
+            _decode_working_image(Image.open(io.BytesIO(truncated)))
+
+
+# ── Perceptual hash / near-duplicate checks ─────────────────────────
+
+
+def _photo(photo_id: str, perceptual_hash: str | None) -> PhotoData:
+    return PhotoData(
+        photo_id=photo_id,
+        storage_key=f"projects/p/photos/room_{photo_id}.jpg",
+        photo_type="room",
+        perceptual_hash=perceptual_hash,
+    )
+
+
+class TestPerceptualHash:
+    """Tests for _perceptual_hash and find_near_duplicate."""
+
+    def test_reencoded_resized_copy_hashes_close(self) -> None:
+        """A smaller, recompressed copy of the same photo stays within the threshold."""
+        import io
+
+        original = Image.open(_FIXTURES / "room_photo.jpg")
+        buf = io.BytesIO()
+        original.convert("RGB").resize(
+            (original.width // 2, original.height // 2), Image.LANCZOS
+        ).save(buf, format="JPEG", quality=60)
+        copy = Image.open(io.BytesIO(buf.getvalue()))
+
+        stored = _photo("a", _perceptual_hash(original))
+        assert find_near_duplicate(_perceptual_hash(copy), [stored]) is stored
+
+    def test_different_rooms_not_duplicates(self) -> None:
+        """Two different room photos are far apart."""
+        first = _perceptual_hash(Image.open(_FIXTURES / "room_photo.jpg"))
+        second = _perceptual_hash(Image.open(_FIXTURES / "room_photo_2.jpg"))
+        assert find_near_duplicate(second, [_photo("a", first)]) is None
+
+    def test_hash_is_16_hex_chars(self) -> None:
+        """64-bit hash serialised as fixed-width hex; works on any image mode."""
+        value = _perceptual_hash(_make_image(300, 200, mode="RGBA"))
+        assert len(value) == 16
+        int(value, 16)
+
+    def test_closest_match_wins_and_unhashed_skipped(self) -> None:
+        """Photos without a hash never match; the nearest hashed photo is returned."""
+        photos = [
+            _photo("legacy", None),
+            _photo("far", "0000000000000007"),  # distance 3
+            _photo("near", "0000000000000001"),  # distance 1
+        ]
+        assert find_near_duplicate("0000000000000000", photos) is photos[2]
+        assert find_near_duplicate(None, photos) is None
+        assert find_near_duplicate("ffffffffffffffff", photos) is None
+
+    async def test_validate_photo_returns_hash(self) -> None:
+        """validate_photo reports the working image's hash alongside the verdict."""
+        with patch("app.activities.validation.settings") as mock_settings:
+            mock_settings.anthropic_api_key = ""
+            mock_settings.validation_cache_persist = False
+            img = _make_sharp_image()
+            result = await validate_photo(
+                ValidatePhotoInput(image_data=_image_to_bytes(img), photo_type="room")
+            )
+        assert result.perceptual_hash is not None
+        assert len(result.perceptual_hash) == 16
+
+
 # ── Content classification checks ───────────────────────────────────
 
 
@@ -155,6 +342,13 @@ def _mock_anthropic_response(text: str) -> MagicMock:
     return response
 
 
+def _mock_async_client() -> MagicMock:
+    """Create a mock AsyncAnthropic client whose messages.create is awaitable."""
+    client = MagicMock()
+    client.messages.create = AsyncMock()
+    return client
+
+
 class TestDetectMediaType:
     """Tests for _detect_media_type — format detection from image bytes."""
 
@@ -172,7 +366,7 @@ class TestDetectMediaType:
 class TestGetAnthropicClient:
     """Tests for _get_anthropic_client — lazy singleton initialization."""
 
-    @patch("app.activities.validation.anthropic.Anthropic")
+    @patch("app.activities.validation.anthropic.AsyncAnthropic")
     def test_creates_client_on_first_call(self, mock_cls: MagicMock) -> None:
         """First call creates an Anthropic client with the configured API key."""
         import app.activities.validation as val_mod
@@ -189,7 +383,7 @@ class TestGetAnthropicClient:
         mock_cls.assert_called_once_with(api_key="test-key-abc")
         val_mod._anthropic_client = None  # cleanup
 
-    @patch("app.activities.validation.anthropic.Anthropic")
+    @patch("app.activities.validation.anthropic.AsyncAnthropic")
     def test_reuses_client_on_subsequent_calls(self, mock_cls: MagicMock) -> None:
         """Subsequent calls reuse the cached client (singleton)."""
         import app.activities.validation as val_mod
@@ -229,200 +423,280 @@ class TestDetectMediaTypeEdgeCases:
         assert result == "image/jpeg"
 
 
+class TestBuildClassificationPayload:
+    """Tests for _build_classification_payload — thumbnail for the content check."""
+
+    def test_large_image_reencoded_as_small_jpeg(self) -> None:
+        """A full-size upload is shrunk to CLASSIFY_MAX_SIZE on the long side."""
+        import base64
+        import io
+
+        data = _image_to_bytes(_make_sharp_image(4032, 3024), fmt="PNG")
+        media_type, b64 = _build_classification_payload(data)
+
+        thumb_bytes = base64.b64decode(b64)
+        thumb = Image.open(io.BytesIO(thumb_bytes))
+        assert media_type == "image/jpeg"
+        assert thumb.format == "JPEG"
+        assert max(thumb.size) == CLASSIFY_MAX_SIZE
+        assert thumb.size == (512, 384)
+
+    def test_fixture_photo_payload_is_small(self) -> None:
+        """Real iPhone photo payload shrinks by more than an order of magnitude."""
+        import base64
+
+        data = (_FIXTURES / "room_photo.jpg").read_bytes()
+        _, b64 = _build_classification_payload(data)
+        assert len(b64) < len(base64.b64encode(data)) / 10
+
+    def test_small_image_sent_unchanged(self) -> None:
+        """Images already within the limit keep their bytes and media type."""
+        import base64
+
+        data = _image_to_bytes(_make_image(400, 300), fmt="PNG")
+        media_type, b64 = _build_classification_payload(data)
+
+        assert media_type == "image/png"
+        assert base64.b64decode(b64) == data
+
+
 class TestCheckContent:
     """Tests for _check_content — Claude Haiku 4.5 image classification."""
 
-    @patch("app.activities.validation._detect_media_type", return_value="image/jpeg")
+    @patch(
+        "app.activities.validation._build_classification_payload",
+        return_value=("image/jpeg", "ZmFrZQ=="),
+    )
     @patch("app.activities.validation._get_anthropic_client")
-    def test_room_photo_accepted(self, mock_get_client: MagicMock, _mock_media: MagicMock) -> None:
+    async def test_room_photo_accepted(
+        self, mock_get_client: MagicMock, _mock_media: MagicMock
+    ) -> None:
         """YES response for a room photo should pass."""
-        mock_client = MagicMock()
+        mock_client = _mock_async_client()
         mock_client.messages.create.return_value = _mock_anthropic_response(
             "YES. This is a photo of a modern living room."
         )
         mock_get_client.return_value = mock_client
 
-        ok, msg = _check_content(b"fake-image-data", "room")
+        ok, msg = await _check_content(b"fake-image-data", "room")
         assert ok is True
         assert msg == ""
 
-    @patch("app.activities.validation._detect_media_type", return_value="image/jpeg")
+    @patch(
+        "app.activities.validation._build_classification_payload",
+        return_value=("image/jpeg", "ZmFrZQ=="),
+    )
     @patch("app.activities.validation._get_anthropic_client")
-    def test_room_photo_rejected(self, mock_get_client: MagicMock, _mock_media: MagicMock) -> None:
+    async def test_room_photo_rejected(
+        self, mock_get_client: MagicMock, _mock_media: MagicMock
+    ) -> None:
         """NO response for a room photo should fail with spec-compliant message."""
-        mock_client = MagicMock()
+        mock_client = _mock_async_client()
         mock_client.messages.create.return_value = _mock_anthropic_response(
             "NO. This appears to be a photo of a cat."
         )
         mock_get_client.return_value = mock_client
 
-        ok, msg = _check_content(b"fake-image-data", "room")
+        ok, msg = await _check_content(b"fake-image-data", "room")
         assert ok is False
         expected = (
             "We couldn't identify a room in this photo. Please upload a photo of an interior space."
         )
         assert msg == expected
 
-    @patch("app.activities.validation._detect_media_type", return_value="image/jpeg")
+    @patch(
+        "app.activities.validation._build_classification_payload",
+        return_value=("image/jpeg", "ZmFrZQ=="),
+    )
     @patch("app.activities.validation._get_anthropic_client")
-    def test_inspiration_photo_accepted(
+    async def test_inspiration_photo_accepted(
         self, mock_get_client: MagicMock, _mock_media: MagicMock
     ) -> None:
         """YES response for inspiration photo should pass."""
-        mock_client = MagicMock()
+        mock_client = _mock_async_client()
         mock_client.messages.create.return_value = _mock_anthropic_response(
             "YES. This is a beautiful interior design mood board."
         )
         mock_get_client.return_value = mock_client
 
-        ok, msg = _check_content(b"fake-image-data", "inspiration")
+        ok, msg = await _check_content(b"fake-image-data", "inspiration")
         assert ok is True
 
-    @patch("app.activities.validation._detect_media_type", return_value="image/jpeg")
+    @patch(
+        "app.activities.validation._build_classification_payload",
+        return_value=("image/jpeg", "ZmFrZQ=="),
+    )
     @patch("app.activities.validation._get_anthropic_client")
-    def test_inspiration_person_rejected_with_spec_message(
+    async def test_inspiration_person_rejected_with_spec_message(
         self, mock_get_client: MagicMock, _mock_media: MagicMock
     ) -> None:
         """PHOTO-11: Inspiration photo with person returns spec-compliant message."""
-        mock_client = MagicMock()
+        mock_client = _mock_async_client()
         mock_client.messages.create.return_value = _mock_anthropic_response(
             "NO. This is a photo of a person posing in a room."
         )
         mock_get_client.return_value = mock_client
 
-        ok, msg = _check_content(b"fake-image-data", "inspiration")
+        ok, msg = await _check_content(b"fake-image-data", "inspiration")
         assert ok is False
         assert "not people or animals" in msg
         assert "Please choose a different image" in msg
 
-    @patch("app.activities.validation._detect_media_type", return_value="image/jpeg")
+    @patch(
+        "app.activities.validation._build_classification_payload",
+        return_value=("image/jpeg", "ZmFrZQ=="),
+    )
     @patch("app.activities.validation._get_anthropic_client")
-    def test_inspiration_pet_rejected_with_spec_message(
+    async def test_inspiration_pet_rejected_with_spec_message(
         self, mock_get_client: MagicMock, _mock_media: MagicMock
     ) -> None:
         """PHOTO-12: Inspiration photo with pet returns same spec-compliant message."""
-        mock_client = MagicMock()
+        mock_client = _mock_async_client()
         mock_client.messages.create.return_value = _mock_anthropic_response(
             "NO. This is a photo of a dog on a couch."
         )
         mock_get_client.return_value = mock_client
 
-        ok, msg = _check_content(b"fake-image-data", "inspiration")
+        ok, msg = await _check_content(b"fake-image-data", "inspiration")
         assert ok is False
         assert "not people or animals" in msg
         assert "Please choose a different image" in msg
 
-    @patch("app.activities.validation._detect_media_type", return_value="image/jpeg")
+    @patch(
+        "app.activities.validation._build_classification_payload",
+        return_value=("image/jpeg", "ZmFrZQ=="),
+    )
     @patch("app.activities.validation._get_anthropic_client")
-    def test_room_rejection_still_uses_generic_message(
+    async def test_room_rejection_still_uses_generic_message(
         self, mock_get_client: MagicMock, _mock_media: MagicMock
     ) -> None:
         """Room photo rejection uses the fixed spec-compliant message."""
-        mock_client = MagicMock()
+        mock_client = _mock_async_client()
         mock_client.messages.create.return_value = _mock_anthropic_response(
             "NO. This is an outdoor landscape photo."
         )
         mock_get_client.return_value = mock_client
 
-        ok, msg = _check_content(b"fake-image-data", "room")
+        ok, msg = await _check_content(b"fake-image-data", "room")
         assert ok is False
         expected = (
             "We couldn't identify a room in this photo. Please upload a photo of an interior space."
         )
         assert msg == expected
 
-    @patch("app.activities.validation._detect_media_type", return_value="image/jpeg")
+    @patch(
+        "app.activities.validation._build_classification_payload",
+        return_value=("image/jpeg", "ZmFrZQ=="),
+    )
     @patch("app.activities.validation._get_anthropic_client")
-    def test_api_error_fails_open(self, mock_get_client: MagicMock, _mock_media: MagicMock) -> None:
+    async def test_api_error_fails_open(
+        self, mock_get_client: MagicMock, _mock_media: MagicMock
+    ) -> None:
         """Anthropic API exception should fail open (return True) for P1."""
-        mock_client = MagicMock()
+        mock_client = _mock_async_client()
         mock_client.messages.create.side_effect = anthropic.APIConnectionError(
             request=MagicMock(),
         )
         mock_get_client.return_value = mock_client
 
-        ok, msg = _check_content(b"fake-image-data", "room")
+        ok, msg = await _check_content(b"fake-image-data", "room")
         assert ok is True
         assert msg == ""
 
-    @patch("app.activities.validation._detect_media_type", return_value="image/jpeg")
+    @patch(
+        "app.activities.validation._build_classification_payload",
+        return_value=("image/jpeg", "ZmFrZQ=="),
+    )
     @patch("app.activities.validation._get_anthropic_client")
-    def test_empty_response_content_fails_open(
+    async def test_empty_response_content_fails_open(
         self, mock_get_client: MagicMock, _mock_media: MagicMock
     ) -> None:
         """Empty response.content should fail open (return True)."""
-        mock_client = MagicMock()
+        mock_client = _mock_async_client()
         response = MagicMock()
         response.content = []
         mock_client.messages.create.return_value = response
         mock_get_client.return_value = mock_client
 
-        ok, msg = _check_content(b"fake-image-data", "room")
+        ok, msg = await _check_content(b"fake-image-data", "room")
         assert ok is True
         assert msg == ""
 
-    @patch("app.activities.validation._detect_media_type", return_value="image/jpeg")
+    @patch(
+        "app.activities.validation._build_classification_payload",
+        return_value=("image/jpeg", "ZmFrZQ=="),
+    )
     @patch("app.activities.validation._get_anthropic_client")
-    def test_non_text_block_response_fails_open(
+    async def test_non_text_block_response_fails_open(
         self, mock_get_client: MagicMock, _mock_media: MagicMock
     ) -> None:
         """Response with non-text content block should fail open."""
-        mock_client = MagicMock()
+        mock_client = _mock_async_client()
         content_block = MagicMock(spec=[])  # no .text attribute
         response = MagicMock()
         response.content = [content_block]
         mock_client.messages.create.return_value = response
         mock_get_client.return_value = mock_client
 
-        ok, msg = _check_content(b"fake-image-data", "room")
+        ok, msg = await _check_content(b"fake-image-data", "room")
         assert ok is True
         assert msg == ""
 
-    @patch("app.activities.validation._detect_media_type", return_value="image/jpeg")
+    @patch(
+        "app.activities.validation._build_classification_payload",
+        return_value=("image/jpeg", "ZmFrZQ=="),
+    )
     @patch("app.activities.validation._get_anthropic_client")
-    def test_room_prompt_used_for_room_type(
+    async def test_room_prompt_used_for_room_type(
         self, mock_get_client: MagicMock, _mock_media: MagicMock
     ) -> None:
         """Room photo_type should use the interior room prompt."""
-        mock_client = MagicMock()
+        mock_client = _mock_async_client()
         mock_client.messages.create.return_value = _mock_anthropic_response("YES")
         mock_get_client.return_value = mock_client
 
-        _check_content(b"fake-image-data", "room")
+        await _check_content(b"fake-image-data", "room")
 
         call_kwargs = mock_client.messages.create.call_args[1]
         user_content = call_kwargs["messages"][0]["content"]
         text_block = next(b for b in user_content if b["type"] == "text")
         assert "interior room" in text_block["text"]
 
-    @patch("app.activities.validation._detect_media_type", return_value="image/png")
+    @patch(
+        "app.activities.validation._build_classification_payload",
+        return_value=("image/png", "ZmFrZQ=="),
+    )
     @patch("app.activities.validation._get_anthropic_client")
-    def test_media_type_passed_to_api(
+    async def test_media_type_passed_to_api(
         self, mock_get_client: MagicMock, _mock_media: MagicMock
     ) -> None:
-        """Detected media type should be sent to the Anthropic API."""
-        mock_client = MagicMock()
+        """Payload media type and data should be sent to the Anthropic API."""
+        mock_client = _mock_async_client()
         mock_client.messages.create.return_value = _mock_anthropic_response("YES")
         mock_get_client.return_value = mock_client
 
-        _check_content(b"fake-image-data", "room")
+        await _check_content(b"fake-image-data", "room")
 
         call_kwargs = mock_client.messages.create.call_args[1]
         user_content = call_kwargs["messages"][0]["content"]
         img_block = next(b for b in user_content if b["type"] == "image")
         assert img_block["source"]["media_type"] == "image/png"
+        assert img_block["source"]["data"] == "ZmFrZQ=="
 
-    @patch("app.activities.validation._detect_media_type", return_value="image/jpeg")
+    @patch(
+        "app.activities.validation._build_classification_payload",
+        return_value=("image/jpeg", "ZmFrZQ=="),
+    )
     @patch("app.activities.validation._get_anthropic_client")
-    def test_inspiration_prompt_used_for_other_type(
+    async def test_inspiration_prompt_used_for_other_type(
         self, mock_get_client: MagicMock, _mock_media: MagicMock
     ) -> None:
         """Non-room photo_type should use the design inspiration prompt."""
-        mock_client = MagicMock()
+        mock_client = _mock_async_client()
         mock_client.messages.create.return_value = _mock_anthropic_response("YES")
         mock_get_client.return_value = mock_client
 
-        _check_content(b"fake-image-data", "inspiration")
+        await _check_content(b"fake-image-data", "inspiration")
 
         call_kwargs = mock_client.messages.create.call_args[1]
         user_content = call_kwargs["messages"][0]["content"]
@@ -436,21 +710,21 @@ class TestCheckContent:
 class TestValidatePhoto:
     """Tests for the top-level validate_photo function."""
 
-    def test_invalid_image_data(self) -> None:
+    async def test_invalid_image_data(self) -> None:
         """Corrupt bytes should return invalid_image failure."""
         inp = ValidatePhotoInput(image_data=b"not-an-image", photo_type="room")
-        result = validate_photo(inp)
+        result = await validate_photo(inp)
 
         assert result.passed is False
         assert "invalid_image" in result.failures
         assert len(result.messages) == 1
         assert "valid JPEG or PNG" in result.messages[0]
 
-    def test_low_resolution_fails(self) -> None:
+    async def test_low_resolution_fails(self) -> None:
         """Small image should fail with low_resolution."""
         img = _make_image(500, 500)
         inp = ValidatePhotoInput(image_data=_image_to_bytes(img), photo_type="room")
-        result = validate_photo(inp)
+        result = await validate_photo(inp)
 
         assert result.passed is False
         assert "low_resolution" in result.failures
@@ -459,11 +733,11 @@ class TestValidatePhoto:
         "app.activities.validation._check_blur",
         return_value=(False, "This photo looks blurry. Please retake with a steady hand."),
     )
-    def test_blurry_image_fails(self, _mock_blur: MagicMock) -> None:
+    async def test_blurry_image_fails(self, _mock_blur: MagicMock) -> None:
         """Image failing blur check should return blurry failure."""
         img = _make_sharp_image(2048, 2048)
         inp = ValidatePhotoInput(image_data=_image_to_bytes(img), photo_type="room")
-        result = validate_photo(inp)
+        result = await validate_photo(inp)
 
         assert result.passed is False
         assert "blurry" in result.failures
@@ -472,50 +746,119 @@ class TestValidatePhoto:
         "app.activities.validation._check_blur",
         return_value=(False, "This photo looks blurry. Please retake with a steady hand."),
     )
-    def test_both_resolution_and_blur_can_fail(self, _mock_blur: MagicMock) -> None:
+    async def test_both_resolution_and_blur_can_fail(self, _mock_blur: MagicMock) -> None:
         """Small blurry image should report both failures."""
         img = _make_image(500, 500)
         inp = ValidatePhotoInput(image_data=_image_to_bytes(img), photo_type="room")
-        result = validate_photo(inp)
+        result = await validate_photo(inp)
 
         assert result.passed is False
         assert "low_resolution" in result.failures
         assert "blurry" in result.failures
 
     @patch("app.activities.validation.settings")
-    def test_skips_content_check_when_no_api_key(self, mock_settings: MagicMock) -> None:
+    async def test_skips_content_check_when_no_api_key(self, mock_settings: MagicMock) -> None:
         """Content check should be skipped when anthropic_api_key is not set."""
         mock_settings.anthropic_api_key = ""
         img = _make_sharp_image()
         inp = ValidatePhotoInput(image_data=_image_to_bytes(img), photo_type="room")
-        result = validate_photo(inp)
+        result = await validate_photo(inp)
 
         assert result.passed is True
         assert "Photo looks great!" in result.messages
 
     @patch("app.activities.validation.settings")
-    def test_skips_content_check_when_basic_checks_fail(self, mock_settings: MagicMock) -> None:
-        """Content classification should not run if resolution/blur failed."""
+    async def test_cancels_content_check_when_basic_checks_fail(
+        self, mock_settings: MagicMock
+    ) -> None:
+        """Speculative content classification is cancelled if resolution/blur failed."""
+        import asyncio
+
         mock_settings.anthropic_api_key = "sk-test"
         img = _make_image(500, 500)  # fails resolution
         inp = ValidatePhotoInput(image_data=_image_to_bytes(img), photo_type="room")
+        cancelled = asyncio.Event()
 
-        with patch("app.activities.validation._check_content") as mock_content:
-            result = validate_photo(inp)
-            mock_content.assert_not_called()
+        async def _slow_content(*_args: object) -> tuple[bool, str]:
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return False, "Not a room"
+
+        with patch("app.activities.validation._check_content", side_effect=_slow_content):
+            result = await asyncio.wait_for(validate_photo(inp), timeout=5)
 
         assert result.passed is False
+        assert "content_rejected" not in result.failures
+        assert cancelled.is_set()
+
+    @patch("app.activities.validation.settings")
+    async def test_content_check_runs_concurrently_with_local_checks(
+        self, mock_settings: MagicMock
+    ) -> None:
+        """Content classification starts before the local checks finish."""
+        import asyncio
+
+        mock_settings.anthropic_api_key = "sk-test"
+        img = _make_sharp_image()
+        inp = ValidatePhotoInput(image_data=_image_to_bytes(img), photo_type="room")
+        content_started = asyncio.Event()
+        seen_started: list[bool] = []
+
+        async def _content(*_args: object) -> tuple[bool, str]:
+            content_started.set()
+            return True, ""
+
+        def _blur(*_args: object) -> tuple[bool, str]:
+            seen_started.append(content_started.is_set())
+            return True, ""
+
+        with (
+            patch("app.activities.validation._check_content", side_effect=_content),
+            patch("app.activities.validation._check_blur", side_effect=_blur),
+        ):
+            result = await validate_photo(inp)
+
+        assert result.passed is True
+        assert seen_started == [True]
+
+    @patch("app.activities.validation._check_content", return_value=(True, ""))
+    @patch("app.activities.validation.settings")
+    async def test_logs_per_check_timings(
+        self, mock_settings: MagicMock, _mock_content: MagicMock
+    ) -> None:
+        """photo_validation event carries a timing for every check that ran."""
+        mock_settings.anthropic_api_key = "sk-test"
+        img = _make_sharp_image()
+        inp = ValidatePhotoInput(image_data=_image_to_bytes(img), photo_type="room")
+        with patch("app.activities.validation.logger") as mock_logger:
+            await validate_photo(inp)
+
+        kwargs = next(
+            c.kwargs for c in mock_logger.info.call_args_list if c.args == ("photo_validation",)
+        )
+        assert set(kwargs["timings_ms"]) == {
+            "resolution",
+            "decode",
+            "blur",
+            "phash",
+            "content",
+            "total",
+        }
+        assert kwargs["content_cancelled"] is False
 
     @patch("app.activities.validation._check_content", return_value=(True, ""))
     @patch("app.activities.validation.settings")
-    def test_happy_path_all_checks_pass(
+    async def test_happy_path_all_checks_pass(
         self, mock_settings: MagicMock, mock_content: MagicMock
     ) -> None:
         """Sharp, high-res image with passing content check should succeed."""
         mock_settings.anthropic_api_key = "sk-test"
         img = _make_sharp_image()
         inp = ValidatePhotoInput(image_data=_image_to_bytes(img), photo_type="room")
-        result = validate_photo(inp)
+        result = await validate_photo(inp)
 
         assert result.passed is True
         assert result.failures == []
@@ -524,27 +867,29 @@ class TestValidatePhoto:
 
     @patch("app.activities.validation._check_content", return_value=(False, "Not a room"))
     @patch("app.activities.validation.settings")
-    def test_content_rejection(self, mock_settings: MagicMock, mock_content: MagicMock) -> None:
+    async def test_content_rejection(
+        self, mock_settings: MagicMock, mock_content: MagicMock
+    ) -> None:
         """Passing basic checks but failing content should report content_rejected."""
         mock_settings.anthropic_api_key = "sk-test"
         img = _make_sharp_image()
         inp = ValidatePhotoInput(image_data=_image_to_bytes(img), photo_type="room")
-        result = validate_photo(inp)
+        result = await validate_photo(inp)
 
         assert result.passed is False
         assert "content_rejected" in result.failures
         assert "Not a room" in result.messages
 
-    def test_output_model_structure(self) -> None:
+    async def test_output_model_structure(self) -> None:
         """validate_photo should always return a ValidatePhotoOutput."""
         inp = ValidatePhotoInput(image_data=b"garbage", photo_type="inspiration")
-        result = validate_photo(inp)
+        result = await validate_photo(inp)
         assert isinstance(result, ValidatePhotoOutput)
         assert isinstance(result.passed, bool)
         assert isinstance(result.failures, list)
         assert isinstance(result.messages, list)
 
-    def test_truncated_image_returns_invalid(self) -> None:
+    async def test_truncated_image_returns_invalid(self) -> None:
         """Truncated JPEG (valid header, incomplete body) returns invalid_image.
 
         Image.open() succeeds lazily on truncated images, but img.load()
@@ -556,17 +901,320 @@ class TestValidatePhoto:
         truncated = full_bytes[: len(full_bytes) // 4]  # Keep only header + partial body
 
         inp = ValidatePhotoInput(image_data=truncated, photo_type="room")
-        result = validate_photo(inp)
+        result = await validate_photo(inp)
 
         assert result.passed is False
         assert "invalid_image" in result.failures
 
-    def test_png_format_accepted(self) -> None:
+    async def test_png_format_accepted(self) -> None:
         """PNG images should be parsed correctly (not just JPEG)."""
         img = _make_sharp_image()
         inp = ValidatePhotoInput(image_data=_image_to_bytes(img, fmt="PNG"), photo_type="room")
         with patch("app.activities.validation.settings") as mock_settings:
             mock_settings.anthropic_api_key = ""
-            result = validate_photo(inp)
+            result = await validate_photo(inp)
+
+        assert result.passed is True
+
+    async def test_resolution_checked_against_header_size(self) -> None:
+        """Draft decode shrinks the working image, but resolution uses original dims."""
+        data = (_FIXTURES / "room_photo.jpg").read_bytes()  # 3213x5712 iPhone photo
+        inp = ValidatePhotoInput(image_data=data, photo_type="room")
+        with patch("app.activities.validation.settings") as mock_settings:
+            mock_settings.anthropic_api_key = ""
+            result = await validate_photo(inp)
+
+        assert result.passed is True
+
+    async def test_logs_decoded_memory(self) -> None:
+        """photo_validation event reports header size, working size and decoded bytes."""
+        data = (_FIXTURES / "room_photo.jpg").read_bytes()
+        inp = ValidatePhotoInput(image_data=data, photo_type="room")
+        with (
+            patch("app.activities.validation.settings") as mock_settings,
+            patch("app.activities.validation.logger") as mock_logger,
+        ):
+            mock_settings.anthropic_api_key = ""
+            await validate_photo(inp)
+
+        kwargs = next(
+            c.kwargs for c in mock_logger.info.call_args_list if c.args == ("photo_validation",)
+        )
+        assert kwargs["header_size"] == (3213, 5712)
+        assert kwargs["working_size"] == (1607, 2856)
+        assert kwargs["working_image_bytes"] == 1607 * 2856
+
+
+# ── Verdict cache ───────────────────────────────────────────────────
+
+
+class TestVerdictCache:
+    """Tests for the content-hash verdict cache in validate_photo."""
+
+    @patch("app.activities.validation._check_content", return_value=(True, ""))
+    @patch("app.activities.validation.settings")
+    async def test_repeat_upload_served_from_cache(
+        self, mock_settings: MagicMock, mock_content: MagicMock
+    ) -> None:
+        """Second upload of the same bytes skips decoding and the content check."""
+        mock_settings.anthropic_api_key = "sk-test"
+        mock_settings.validation_cache_persist = False
+        inp = ValidatePhotoInput(image_data=_image_to_bytes(_make_sharp_image()), photo_type="room")
+
+        first = await validate_photo(inp)
+        with patch("app.activities.validation._run_local_checks") as mock_local:
+            second = await validate_photo(inp)
+            mock_local.assert_not_called()
+
+        assert second == first
+        assert mock_content.call_count == 1
+        assert _verdict_cache.hits == 1
+
+    @patch("app.activities.validation._check_content", return_value=(True, ""))
+    @patch("app.activities.validation.settings")
+    async def test_key_includes_photo_type(
+        self, mock_settings: MagicMock, mock_content: MagicMock
+    ) -> None:
+        """Same bytes uploaded as room vs inspiration are validated separately."""
+        mock_settings.anthropic_api_key = "sk-test"
+        mock_settings.validation_cache_persist = False
+        data = _image_to_bytes(_make_sharp_image())
+
+        await validate_photo(ValidatePhotoInput(image_data=data, photo_type="room"))
+        await validate_photo(ValidatePhotoInput(image_data=data, photo_type="inspiration"))
+
+        assert mock_content.call_count == 2
+
+    @patch("app.activities.validation.settings")
+    async def test_fail_open_verdict_not_cached(self, mock_settings: MagicMock) -> None:
+        """A pass produced by a failed content check is not remembered."""
+        from app.activities.validation import _FAIL_OPEN
+
+        mock_settings.anthropic_api_key = "sk-test"
+        mock_settings.validation_cache_persist = False
+        inp = ValidatePhotoInput(image_data=_image_to_bytes(_make_sharp_image()), photo_type="room")
+
+        with patch("app.activities.validation._check_content", return_value=_FAIL_OPEN):
+            result = await validate_photo(inp)
+
+        assert result.passed is True
+        assert len(_verdict_cache) == 0
+
+    @patch("app.activities.validation.settings")
+    async def test_skipped_content_check_not_cached(self, mock_settings: MagicMock) -> None:
+        """Without an API key the verdict is incomplete and must not be cached."""
+        mock_settings.anthropic_api_key = ""
+        mock_settings.validation_cache_persist = False
+        inp = ValidatePhotoInput(image_data=_image_to_bytes(_make_sharp_image()), photo_type="room")
+
+        await validate_photo(inp)
+
+        assert len(_verdict_cache) == 0
+
+    @patch("app.activities.validation.settings")
+    async def test_local_failure_cached(self, mock_settings: MagicMock) -> None:
+        """Deterministic local failures are cached."""
+        mock_settings.anthropic_api_key = ""
+        mock_settings.validation_cache_persist = False
+        inp = ValidatePhotoInput(
+            image_data=_image_to_bytes(_make_image(500, 500)), photo_type="room"
+        )
+
+        await validate_photo(inp)
+
+        assert len(_verdict_cache) == 1
+
+    @patch("app.activities.validation.settings")
+    async def test_persistent_tier_read_on_local_miss(self, mock_settings: MagicMock) -> None:
+        """With persistence enabled, a Postgres hit fills the in-process cache."""
+        mock_settings.anthropic_api_key = "sk-test"
+        mock_settings.validation_cache_persist = True
+        mock_settings.validation_cache_ttl_seconds = 3600
+        stored = ValidatePhotoOutput(passed=True, failures=[], messages=["Photo looks great!"])
+        pool = MagicMock()
+        pool.fetchrow = AsyncMock(return_value={"verdict": stored.model_dump_json()})
+        inp = ValidatePhotoInput(image_data=_image_to_bytes(_make_sharp_image()), photo_type="room")
+
+        with (
+            patch("app.activities.validation._get_pg_pool", AsyncMock(return_value=pool)),
+            patch("app.activities.validation._check_content") as mock_content,
+        ):
+            result = await validate_photo(inp)
+            mock_content.assert_not_called()
+
+        assert result == stored
+        assert len(_verdict_cache) == 1
+
+    @patch("app.activities.validation._check_content", return_value=(True, ""))
+    @patch("app.activities.validation.settings")
+    async def test_persistent_tier_failure_is_a_miss(
+        self, mock_settings: MagicMock, mock_content: MagicMock
+    ) -> None:
+        """Postgres errors degrade to a normal validation, never a failed upload."""
+        mock_settings.anthropic_api_key = "sk-test"
+        mock_settings.validation_cache_persist = True
+        mock_settings.validation_cache_ttl_seconds = 3600
+        inp = ValidatePhotoInput(image_data=_image_to_bytes(_make_sharp_image()), photo_type="room")
+
+        with patch(
+            "app.activities.validation._get_pg_pool",
+            AsyncMock(side_effect=OSError("connection refused")),
+        ):
+            result = await validate_photo(inp)
+
+        assert result.passed is True
+        mock_content.assert_called_once()
+        assert len(_verdict_cache) == 1
+
+    @patch("app.activities.validation.asyncpg.create_pool")
+    async def test_pg_connect_failure_backs_off(self, mock_create: AsyncMock) -> None:
+        """A failed connect is not retried by the next uploads during the backoff."""
+        import app.activities.validation as validation
+
+        mock_create.side_effect = OSError("connection refused")
+        with (
+            patch.object(validation, "_pg_pool", None),
+            patch.object(validation, "_pg_retry_at", 0.0),
+        ):
+            for _ in range(3):
+                with pytest.raises((OSError, ConnectionError)):
+                    await _get_pg_pool()  # the real one, not the fixture's stub
+
+        mock_create.assert_called_once()
+        assert mock_create.call_args.kwargs["timeout"] == validation.PG_CONNECT_TIMEOUT_SECONDS
+
+    @patch("app.activities.validation.asyncpg.create_pool", new_callable=AsyncMock)
+    async def test_pg_connect_cancelled_does_not_back_off(self, mock_create: AsyncMock) -> None:
+        """A cancelled upload is not a connect failure; the next caller tries again."""
+        import asyncio
+
+        import app.activities.validation as validation
+
+        mock_create.side_effect = [asyncio.CancelledError(), MagicMock()]
+        with (
+            patch.object(validation, "_pg_pool", None),
+            patch.object(validation, "_pg_retry_at", 0.0),
+        ):
+            with pytest.raises(asyncio.CancelledError):
+                await _get_pg_pool()
+            assert await _get_pg_pool() is not None
+
+        assert mock_create.call_count == 2
+
+    @patch("app.activities.validation.settings")
+    async def test_store_prunes_expired_rows_once_per_interval(
+        self, mock_settings: MagicMock
+    ) -> None:
+        """Writes delete expired rows, throttled to one DELETE per interval."""
+        import app.activities.validation as validation
+
+        mock_settings.validation_cache_persist = True
+        mock_settings.validation_cache_ttl_seconds = 3600
+        pool = MagicMock()
+        pool.execute = AsyncMock(return_value="DELETE 0")
+        verdict = ValidatePhotoOutput(passed=True, failures=[], messages=[])
+        with (
+            patch.object(validation, "_get_pg_pool", AsyncMock(return_value=pool)),
+            patch.object(validation, "_pg_last_prune", 0.0),
+        ):
+            await validation._store_verdict("k1", verdict)
+            await validation._store_verdict("k2", verdict)
+
+        deletes = [c for c in pool.execute.call_args_list if c.args[0].startswith("DELETE")]
+        assert len(deletes) == 1
+        assert deletes[0].args[1] == 3600.0
+
+    async def test_close_verdict_store(self) -> None:
+        """Shutdown closes an open pool and is a no-op otherwise."""
+        import app.activities.validation as validation
+
+        pool = MagicMock()
+        pool.close = AsyncMock()
+        with patch.object(validation, "_pg_pool", pool):
+            await validation.close_verdict_store()
+            assert validation._pg_pool is None
+            await validation.close_verdict_store()
+        pool.close.assert_awaited_once()
+
+
+class TestImagePoolAdmission:
+    """validate_photo runs its CPU work through the admission-controlled image pool."""
+
+    async def test_saturated_pool_raises(self) -> None:
+        """No free slot -> ImagePoolSaturatedError, local checks never run."""
+        pool = ImageWorkPool(workers=0, max_pending=0, retry_after_seconds=3)
+        inp = ValidatePhotoInput(image_data=_image_to_bytes(_make_sharp_image()), photo_type="room")
+        with (
+            patch("app.activities.validation.get_image_pool", return_value=pool),
+            patch("app.activities.validation._run_local_checks") as mock_local,
+            pytest.raises(ImagePoolSaturatedError) as exc_info,
+        ):
+            await validate_photo(inp)
+
+        assert exc_info.value.retry_after_seconds == 3
+        assert pool.rejected == 1
+        mock_local.assert_not_called()
+
+    async def test_cache_hit_bypasses_pool(self) -> None:
+        """A cached verdict is served even while the pool is saturated."""
+        inp = ValidatePhotoInput(image_data=b"garbage", photo_type="room")
+        await validate_photo(inp)  # invalid_image isn't cached — seed a verdict directly
+        from app.activities.validation import _store_verdict, _verdict_cache_key
+
+        verdict = ValidatePhotoOutput(passed=False, failures=["blurry"], messages=["Blurry"])
+        await _store_verdict(await _verdict_cache_key(inp.image_data, "room"), verdict)
+
+        full = ImageWorkPool(workers=0, max_pending=0, retry_after_seconds=2)
+        with patch("app.activities.validation.get_image_pool", return_value=full):
+            result = await validate_photo(inp)
+        assert result == verdict
+
+    async def test_slot_released_after_validation(self) -> None:
+        """In-flight counters return to zero, and stats are logged."""
+        pool = ImageWorkPool(workers=0, max_pending=1, retry_after_seconds=2)
+        img = _make_image(400, 300)
+        inp = ValidatePhotoInput(image_data=_image_to_bytes(img), photo_type="room")
+        with (
+            patch("app.activities.validation.get_image_pool", return_value=pool),
+            patch("app.activities.validation._check_content", return_value=(True, "")),
+            patch("app.activities.validation.logger") as mock_logger,
+        ):
+            await validate_photo(inp)
+
+        assert pool.in_flight == 0
+        assert pool.peak_in_flight == 1
+        kwargs = next(
+            c.kwargs for c in mock_logger.info.call_args_list if c.args == ("photo_validation",)
+        )
+        assert kwargs["pool_rejected"] == 0
+        assert "pool_queue_depth" in kwargs
+
+    async def test_no_slot_held_while_content_check_waits(self) -> None:
+        """Only CPU work occupies the pool — a slow Haiku call leaves it free."""
+        import asyncio
+
+        pool = ImageWorkPool(workers=0, max_pending=1, retry_after_seconds=2)
+        inp = ValidatePhotoInput(image_data=_image_to_bytes(_make_sharp_image()), photo_type="room")
+        release = asyncio.Event()
+        during_content: list[bool] = []
+
+        async def _slow_content(_data: bytes, _photo_type: str) -> tuple[bool, str]:
+            await release.wait()
+            return True, ""
+
+        with (
+            patch("app.activities.validation.get_image_pool", return_value=pool),
+            patch("app.activities.validation._check_content", side_effect=_slow_content),
+            patch("app.activities.validation.settings") as mock_settings,
+        ):
+            mock_settings.anthropic_api_key = "sk-test"
+            mock_settings.validation_cache_persist = False
+            task = asyncio.create_task(validate_photo(inp))
+            while pool.peak_in_flight == 0 or pool.in_flight:
+                await asyncio.sleep(0.01)
+            during_content.append(pool.saturated)
+            release.set()
+            result = await task
 
         assert result.passed is True
+        assert during_content == [False]
@@ -13,7 +13,7 @@ from app.activities.mock_stubs import (
     generate_designs,
     generate_shopping_list,
 )
-from app.activities.purge import purge_project_data
+from app.activities.purge import purge_project_data, purge_projects
 from app.worker import ACTIVITIES, WORKFLOWS, _load_activities, create_temporal_client, run_worker
 from app.workflows.design_project import DesignProjectWorkflow
 
@@ -22,8 +22,8 @@ class TestActivityRegistration:
     """Verify that the correct activities are registered with the worker."""
 
     def test_all_activities_registered(self) -> None:
-        """All 6 activities (5 mock + 1 real purge) should be in the ACTIVITIES list."""
-        assert len(ACTIVITIES) == 6
+        """All 7 activities (5 mock + 2 real purge) should be in the ACTIVITIES list."""
+        assert len(ACTIVITIES) == 7
 
     def test_generate_designs_registered(self) -> None:
         """generate_designs activity should be registered."""
@@ -45,6 +45,10 @@ class TestActivityRegistration:
         """purge_project_data activity should be registered."""
         assert purge_project_data in ACTIVITIES
 
+    def test_purge_projects_registered(self) -> None:
+        """Bulk purge_projects activity should be registered."""
+        assert purge_projects in ACTIVITIES
+
 
 class TestWorkflowRegistration:
     """Verify that the correct workflows are registered with the worker."""
@@ -158,7 +162,7 @@ class TestLoadActivities:
         with patch("app.worker.settings") as mock_settings:
             mock_settings.use_mock_activities = True
             activities = _load_activities()
-        assert len(activities) == 6
+        assert len(activities) == 7
         # Check all loaded activities have @activity.defn names
         names = [getattr(a, "__temporal_activity_definition").name for a in activities]
         assert "generate_designs" in names
@@ -167,13 +171,14 @@ class TestLoadActivities:
         assert "analyze_room_photos" in names
         assert "load_style_skill" in names
         assert "purge_project_data" in names
+        assert "purge_projects" in names
 
     def test_real_branch_loads_real_modules(self) -> None:
         """use_mock_activities=False loads from real T2/T3 modules."""
         with patch("app.worker.settings") as mock_settings:
             mock_settings.use_mock_activities = False
             activities = _load_activities()
-        assert len(activities) == 6
+        assert len(activities) == 7
         names = [getattr(a, "__temporal_activity_definition").name for a in activities]
         assert "generate_designs" in names
         assert "edit_design" in names
@@ -181,6 +186,7 @@ class TestLoadActivities:
         assert "analyze_room_photos" in names
         assert "load_style_skill" in names
         assert "purge_project_data" in names
+        assert "purge_projects" in names
         # Verify these come from the real modules, not mock_stubs
         from app.activities import analyze_room, edit, generate, shopping
 
@@ -1055,6 +1055,24 @@ class TestPhotoPhase:
             assert state.step == "scan"
             assert len(state.photos) == 2
 
+    async def test_add_photos_batch_signal(self, workflow_env, tq):
+        """Verifies a single add_photos signal delivers every photo, in order."""
+
+        async with Worker(
+            workflow_env.client,
+            task_queue=tq,
+            workflows=[DesignProjectWorkflow],
+            activities=ALL_ACTIVITIES,
+        ):
+            handle = await _start_workflow(workflow_env, tq)
+            await handle.signal(DesignProjectWorkflow.add_photos, [_photo(0), _photo(1)])
+            await handle.signal(DesignProjectWorkflow.confirm_photos)
+            await asyncio.sleep(0.5)
+
+            state = await handle.query(DesignProjectWorkflow.get_state)
+            assert state.step == "scan"
+            assert [p.photo_id for p in state.photos] == [_photo(0).photo_id, _photo(1).photo_id]
+
     async def test_mixed_photo_types_stored_correctly(self, workflow_env, tq):
         """Verifies room and inspiration photos are stored with correct types.
 
@@ -0,0 +1,115 @@
+"""Output format benchmark — encode time, file size and download time per format.
+
+Encodes each spike image the way generate/edit store their results
+(app.utils.image.encode_output_image) as PNG, WebP and JPEG at a few
+qualities, then reports per format:
+
+  encode_ms    median wall time of one encode (what the activity waits for)
+  decode_ms    median time for the client to decode it again
+  KB           encoded size
+  dl_ms        transfer time at --mbps (size only; add your RTT on top)
+  psnr_db      fidelity vs the source pixels (PNG is lossless: inf)
+
+By default the images are the spike's real Gemini outputs
+(spike/results/*.png) plus spike/test_images, upscaled to the 2K long edge
+generate/edit receive from Gemini (--no-upscale keeps source sizes).
+
+Usage:
+    backend/.venv/bin/python spike/output_format_benchmark.py
+    backend/.venv/bin/python spike/output_format_benchmark.py --mbps 5 --repeat 5
+    backend/.venv/bin/python spike/output_format_benchmark.py path/to/*.png
+"""
+
+import argparse
+import io
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from PIL import Image, ImageChops, ImageStat
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from app.utils.image import encode_output_image  # noqa: E402
+
+SPIKE_DIR = Path(__file__).resolve().parent
+TARGET_LONG_EDGE = 2048  # Gemini image_size="2K"
+CANDIDATES = [("png", 0), ("webp", 80), ("webp", 90), ("jpeg", 85), ("jpeg", 90)]
+
+
+def _load(path: Path, upscale: bool) -> Image.Image:
+    img = Image.open(path).convert("RGB")
+    scale = TARGET_LONG_EDGE / max(img.size)
+    if upscale and scale > 1:
+        size = (round(img.width * scale), round(img.height * scale))
+        img = img.resize(size, Image.Resampling.LANCZOS)
+    return img
+
+
+def _psnr(a: Image.Image, b: Image.Image) -> float:
+    mse = statistics.fmean(v**2 for v in ImageStat.Stat(ImageChops.difference(a, b)).rms)
+    return math.inf if mse == 0 else 20 * math.log10(255 / math.sqrt(mse))
+
+
+def _timed(fn, repeat: int) -> tuple[float, object]:
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("images", nargs="*", type=Path)
+    parser.add_argument("--mbps", type=float, default=20.0, help="download bandwidth")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-upscale", action="store_true")
+    args = parser.parse_args()
+
+    paths = args.images or sorted(
+        [*SPIKE_DIR.glob("results/*.png"), *SPIKE_DIR.glob("test_images/*.png")]
+    )
+    if not paths:
+        parser.error("no images found")
+
+    rows: dict[str, list[tuple[float, float, int, float]]] = {}
+    for path in paths:
+        source = _load(path, upscale=not args.no_upscale)
+        for fmt, quality in CANDIDATES:
+            label = fmt if fmt == "png" else f"{fmt} q{quality}"
+            encode_ms, encoded = _timed(
+                lambda source=source, fmt=fmt, quality=quality: encode_output_image(
+                    source, fmt, quality
+                ),
+                args.repeat,
+            )
+            data = encoded.data  # type: ignore[attr-defined]
+
+            def decode(data=data):
+                with Image.open(io.BytesIO(data)) as img:
+                    return img.convert("RGB")
+
+            decode_ms, decoded = _timed(decode, args.repeat)
+            psnr = _psnr(source, decoded)  # type: ignore[arg-type]
+            rows.setdefault(label, []).append((encode_ms, decode_ms, len(data), psnr))
+
+    print(f"images={len(paths)} repeat={args.repeat} bandwidth={args.mbps} Mbit/s")
+    print(f"{'format':<10}{'encode_ms':>10}{'decode_ms':>10}{'KB':>9}{'dl_ms':>8}{'psnr_db':>9}")
+    for label, samples in rows.items():
+        encode_ms = statistics.median(s[0] for s in samples)
+        decode_ms = statistics.median(s[1] for s in samples)
+        size = statistics.median(s[2] for s in samples)
+        psnr = statistics.median(s[3] for s in samples)
+        dl_ms = size * 8 / (args.mbps * 1_000_000) * 1000
+        print(
+            f"{label:<10}{encode_ms:>10.0f}{decode_ms:>10.0f}{size / 1024:>9.0f}"
+            f"{dl_ms:>8.0f}{psnr:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
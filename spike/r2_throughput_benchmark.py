@@ -0,0 +1,233 @@
+"""R2 client throughput benchmark — boto3 in threads vs the async client.
+
+Uploads, heads, downloads and deletes N objects with C concurrent requests
+through both storage paths:
+
+  threaded  boto3 client calls via asyncio.to_thread (the default executor);
+            the app no longer has sync object helpers, so this baseline
+            lives here
+  async     app.utils.r2_async (one pooled httpx client, no thread hops)
+
+By default both talk to a local S3-compatible stand-in (path-style
+PUT/GET/HEAD/DELETE kept in memory, signatures not verified) running in a
+separate process. --latency-ms adds a per-request delay standing in for the
+R2 round trip: at 0 the run measures client CPU cost per request, at
+realistic RTTs it shows the default executor capping in-flight requests.
+Point --endpoint at MinIO or a real bucket for real network numbers.
+--local runs the async path against the local filesystem storage backend
+(STORAGE_BACKEND=local) instead, as a no-network baseline.
+
+Usage:
+    backend/.venv/bin/python spike/r2_throughput_benchmark.py
+    backend/.venv/bin/python spike/r2_throughput_benchmark.py -n 500 -c 64 --size-kb 512
+    R2_ACCESS_KEY_ID=... R2_SECRET_ACCESS_KEY=... \\
+        backend/.venv/bin/python spike/r2_throughput_benchmark.py --endpoint http://localhost:9000
+    backend/.venv/bin/python spike/r2_throughput_benchmark.py --local
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from app.config import settings  # noqa: E402
+from app.utils import r2, r2_async  # noqa: E402
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Minimal path-style S3 object API backed by a dict."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like R2
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    objects: dict[str, bytes] = {}
+    latency_seconds = 0.0
+
+    def log_message(self, *args):  # silence per-request logging
+        pass
+
+    def _reply(
+        self, status: int, body: bytes = b"", headers: dict | None = None
+    ) -> None:
+        time.sleep(self.latency_seconds)
+        headers = {"Content-Length": str(len(body)), **(headers or {})}
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_PUT(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.objects[self.path] = self.rfile.read(length)
+        self._reply(
+            200, headers={"ETag": f'"{hash(self.objects[self.path]) & 0xFFFFFFFF:x}"'}
+        )
+
+    def do_GET(self):
+        data = self.objects.get(self.path)
+        if data is None:
+            self._reply(404, b"<Error><Code>NoSuchKey</Code></Error>")
+        else:
+            self._reply(200, data)
+
+    def do_HEAD(self):
+        data = self.objects.get(self.path)
+        self._reply(
+            404 if data is None else 200,
+            headers={"Content-Length": str(len(data or b""))},
+        )
+
+    def do_DELETE(self):
+        self.objects.pop(self.path, None)
+        self._reply(204)
+
+
+def _serve_stand_in(port, latency_seconds: float) -> None:
+    _StandInHandler.latency_seconds = latency_seconds
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    port.value = server.server_address[1]
+    server.serve_forever()
+
+
+def _start_stand_in(latency_seconds: float) -> str:
+    """Run the stand-in in its own process so it doesn't share our GIL."""
+    port = multiprocessing.Value("i", 0)
+    multiprocessing.Process(
+        target=_serve_stand_in, args=(port, latency_seconds), daemon=True
+    ).start()
+    while not port.value:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port.value}"
+
+
+async def _run_phase(label: str, calls, concurrency: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(call):
+        async with sem:
+            await call()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(c) for c in calls))
+    return time.perf_counter() - start
+
+
+async def _bench_threaded(
+    keys: list[str], payload: bytes, concurrency: int
+) -> dict[str, float]:
+    client = r2._get_client()
+    bucket = settings.r2_bucket_name
+
+    def put(k):
+        return lambda: asyncio.to_thread(
+            client.put_object, Bucket=bucket, Key=k, Body=payload, ContentType="image/jpeg"
+        )
+
+    def head(k):
+        return lambda: asyncio.to_thread(client.head_object, Bucket=bucket, Key=k)
+
+    def get(k):
+        return lambda: asyncio.to_thread(
+            lambda: client.get_object(Bucket=bucket, Key=k)["Body"].read()
+        )
+
+    def delete(k):
+        return lambda: asyncio.to_thread(client.delete_object, Bucket=bucket, Key=k)
+
+    return {
+        op: await _run_phase(op, [make(k) for k in keys], concurrency)
+        for op, make in (("put", put), ("head", head), ("get", get), ("delete", delete))
+    }
+
+
+async def _bench_async(
+    keys: list[str], payload: bytes, concurrency: int
+) -> dict[str, float]:
+    def put(k):
+        return lambda: r2_async.upload_object(k, payload, "image/jpeg")
+
+    def head(k):
+        return lambda: r2_async.head_object(k)
+
+    def get(k):
+        return lambda: r2_async.get_object(k)
+
+    def delete(k):
+        return lambda: r2_async.delete_object(k)
+
+    try:
+        return {
+            op: await _run_phase(op, [make(k) for k in keys], concurrency)
+            for op, make in (
+                ("put", put),
+                ("head", head),
+                ("get", get),
+                ("delete", delete),
+            )
+        }
+    finally:
+        await r2_async.close_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("-n", "--objects", type=int, default=200)
+    parser.add_argument("-c", "--concurrency", type=int, default=32)
+    parser.add_argument("--size-kb", type=int, default=256)
+    parser.add_argument(
+        "--latency-ms", type=float, default=25.0, help="stand-in RTT per request"
+    )
+    parser.add_argument(
+        "--endpoint", help="S3-compatible endpoint (default: local stand-in)"
+    )
+    parser.add_argument("--local", action="store_true", help="local filesystem backend")
+    args = parser.parse_args()
+
+    if args.local:
+        settings.storage_backend = "local"
+        settings.local_storage_dir = tempfile.mkdtemp(prefix="remo-bench-")
+        paths = (("local", _bench_async),)
+        target = settings.local_storage_dir
+    else:
+        settings.r2_endpoint_url = args.endpoint or _start_stand_in(
+            args.latency_ms / 1000
+        )
+        paths = (("threaded", _bench_threaded), ("async", _bench_async))
+        target = settings.r2_endpoint_url
+    settings.r2_access_key_id = os.environ.get("R2_ACCESS_KEY_ID", "bench")
+    settings.r2_secret_access_key = os.environ.get("R2_SECRET_ACCESS_KEY", "bench")
+    settings.r2_max_connections = args.concurrency
+    r2.reset_client()
+    r2_async.reset_client()
+
+    # structlog's per-call logging would dominate at these op rates
+    import structlog
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+
+    payload = os.urandom(args.size_kb * 1024)
+    print(
+        f"endpoint={target} objects={args.objects} "
+        f"concurrency={args.concurrency} size={args.size_kb} KB latency={args.latency_ms} ms "
+        f"default executor threads={min(32, (os.cpu_count() or 1) + 4)}"
+    )
+    print(f"{'path':<10}{'op':<8}{'seconds':>9}{'ops/s':>10}{'MB/s':>9}")
+    for label, bench in paths:
+        keys = [f"bench/{label}/{i:06d}.jpg" for i in range(args.objects)]
+        timings = asyncio.run(bench(keys, payload, args.concurrency))
+        for op, seconds in timings.items():
+            ops = args.objects / seconds
+            mb = ops * args.size_kb / 1024 if op in ("put", "get") else 0.0
+            print(f"{label:<10}{op:<8}{seconds:>9.3f}{ops:>10.0f}{mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()